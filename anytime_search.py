@@ -0,0 +1,153 @@
+"""
+Anytime Repairing A* (ARA*) for per-frame search budgets.
+
+A weighted A* with an inflated heuristic (f = g + epsilon * h) reaches the
+goal after far fewer expansions than plain A* and its path costs at most
+epsilon times the optimum. ARA* then lowers epsilon step by step, reusing
+every g value found so far: only the nodes whose g improved since they were
+expanded (the INCONS set) are re-opened, instead of starting over.
+
+The search is resumable. run() stops when the node or deadline budget is
+spent and continues where it left off on the next call, so the game can
+publish a usable path in the first frame and refine it in later frames
+until epsilon reaches 1 (optimal).
+"""
+
+import heapq
+import time
+
+
+class AnytimeSearch:
+    """
+    Resumable ARA* over a GridGraph.
+
+    Attributes:
+        key: identity of the query (set by the caller, used to decide reuse)
+        path: node ids of the best published path, or None
+        cost: cost of that path
+        epsilon: suboptimality bound of the published path (None before the first)
+        done: True once the path is optimal or the goal is known unreachable
+        expanded: total expansions over every run() call
+    """
+
+    def __init__(self, graph, source, target, bounds, blocked=None, node_penalty=None,
+                 epsilon=2.5, epsilon_step=0.5, key=None):
+        self.graph = graph
+        self.source = source
+        self.target = target
+        self.bounds = bounds  # Consistent lower bound per node id (ALT or Manhattan)
+        self.blocked = blocked or set()
+        self.node_penalty = node_penalty
+        self.epsilon_step = epsilon_step
+        self.key = key
+
+        self.path = None
+        self.cost = float('inf')
+        self.epsilon = None
+        self.done = False
+        self.expanded = 0
+
+        self._eps = max(1.0, float(epsilon))  # Epsilon of the iteration in progress
+        self._g = {source: 0}
+        self._prev = {source: -1}
+        self._open = [(self._eps * bounds[source], 0, source)]
+        self._closed = set()
+        self._incons = set()
+
+    def run(self, max_nodes=None, deadline_ns=None):
+        """
+        Continue the search within a budget (expansions / absolute
+        perf_counter_ns deadline). Returns the number of nodes expanded.
+        """
+        spent = 0
+        while not self.done:
+            finished, used = self._improve(max_nodes - spent if max_nodes is not None else None, deadline_ns)
+            spent += used
+            if not finished:
+                break
+            if self.target in self._g:
+                self._publish()
+            if self._eps <= 1.0 or self.target not in self._g:
+                self.done = True
+                break
+            self._eps = max(1.0, self._eps - self.epsilon_step)
+            self._reopen()
+        return spent
+
+    def partial_path(self):
+        """Path to the lowest-key open node (best guess while no path has been published)."""
+        open_list = self._open
+        while open_list:
+            _, g, node = open_list[0]
+            if node not in self._closed and g == self._g.get(node):
+                return self._trace(node)
+            heapq.heappop(open_list)
+        return None
+
+    def _improve(self, max_nodes, deadline_ns):
+        """One weighted-A* pass at the current epsilon. Returns (finished, expansions)."""
+        g_values, prev, closed = self._g, self._prev, self._closed
+        open_list = self._open
+        adjacency = self.graph.adjacency
+        bounds = self.bounds
+        blocked = self.blocked
+        node_penalty = self.node_penalty
+        eps = self._eps
+        target = self.target
+        used = 0
+
+        while open_list:
+            f, g, node = open_list[0]
+            if node in closed or g != g_values.get(node):
+                heapq.heappop(open_list)  # Stale entry
+                continue
+            if g_values.get(target, float('inf')) <= f:
+                return True, used
+            if max_nodes is not None and used >= max_nodes:
+                return False, used
+            if deadline_ns is not None and not used & 31 and time.perf_counter_ns() >= deadline_ns:
+                return False, used
+
+            heapq.heappop(open_list)
+            closed.add(node)
+            used += 1
+            self.expanded += 1
+
+            for nb in adjacency[node]:
+                if nb in blocked:
+                    continue
+                ng = g + 1 + (node_penalty[nb] if node_penalty is not None else 0)
+                if ng < g_values.get(nb, float('inf')):
+                    g_values[nb] = ng
+                    prev[nb] = node
+                    if nb in closed:
+                        self._incons.add(nb)  # Re-opened at the next epsilon
+                    else:
+                        heapq.heappush(open_list, (ng + eps * bounds[nb], ng, nb))
+        return True, used
+
+    def _publish(self):
+        cost = self._g[self.target]
+        if self.path is None or cost <= self.cost:
+            self.path = self._trace(self.target)
+            self.cost = cost
+        self.epsilon = self._eps
+
+    def _reopen(self):
+        """OPEN := OPEN + INCONS re-keyed with the new epsilon; CLOSED := empty."""
+        g_values, eps, bounds = self._g, self._eps, self.bounds
+        nodes = {node for _, g, node in self._open
+                 if node not in self._closed and g == g_values.get(node)}
+        nodes |= self._incons
+        self._open = [(g_values[n] + eps * bounds[n], g_values[n], n) for n in nodes]
+        heapq.heapify(self._open)
+        self._closed = set()
+        self._incons = set()
+
+    def _trace(self, node):
+        path = []
+        while node != -1:
+            path.append(node)
+            node = self._prev[node]
+        path.reverse()
+        return path
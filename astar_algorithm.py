@@ -4,7 +4,11 @@ Thuật toán A* tìm đường đi ngắn nhất sử dụng heuristic (Manhatt
 """
 
 import heapq
-from datetime import datetime
+import time
+
+import config
+from metrics import instrumented
+from search_buffers import SearchBuffers
 
 
 class AStarAlgorithm:
@@ -15,13 +19,19 @@ class AStarAlgorithm:
     
     def __init__(self, maze_generator):
         self.maze_gen = maze_generator
-        self.maze = maze_generator.maze
         
         # Statistics tracking
         self.nodes_explored = 0
         self.computation_time_ms = 0.0
         self.path_length = 0
+        self.engine = 'astar'  # 'jps' / 'bidirectional' / 'alt' theo engine đã dùng
+        self.search_buffers = None  # Mảng g_score / came_from dùng lại giữa các truy vấn
         
+    @property
+    def maze(self):
+        """Ma trận mê cung hiện tại (luôn đọc từ maze_generator, kể cả sau generate_maze)"""
+        return self.maze_gen.maze
+    
     def manhattan_distance(self, pos1, pos2):
         """
         Heuristic function: Manhattan distance
@@ -37,19 +47,13 @@ class AStarAlgorithm:
     
     def get_neighbors(self, position):
         """Lấy các vị trí kề hợp lệ (up, down, left, right)"""
-        row, col = position
-        neighbors = []
-        
-        # 4 hướng: lên, xuống, trái, phải
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if self.is_valid_position(new_row, new_col):
-                neighbors.append((new_row, new_col))
-        
-        return neighbors
+        graph = self.maze_gen.get_graph()
+        node = graph.node_id(position)
+        if node < 0:
+            return []
+        return graph.to_coords(graph.neighbors(node))
     
+    @instrumented('astar', 'shortest_path', nodes=lambda astar: astar.nodes_explored)
     def shortest_path(self, start, goal, obstacles=None):
         """
         Tìm đường đi ngắn nhất từ start đến goal sử dụng A*
@@ -65,70 +69,112 @@ class AStarAlgorithm:
         """
         # Reset statistics
         self.nodes_explored = 0
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
+        
+        # Chạy trên đồ thị đã biên dịch (node id nguyên, danh sách kề CSR)
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start)
+        target = graph.node_id(goal)
+        if source < 0 or target < 0:
+            self.computation_time_ms = (time.perf_counter_ns() - start_time) / 1e6
+            return None, float('inf')
         
-        # Chuyển đổi obstacles thành set để tìm kiếm nhanh
-        obstacles_set = set(obstacles) if obstacles else set()
+        # Chuyển đổi obstacles thành set node id để tìm kiếm nhanh
+        obstacles_set = graph.ids_for(obstacles)
         
-        # Priority queue: (f_score, counter, current_pos, g_score, path)
+        # Mọi bước cost = 1 nên có thể dùng Jump Point Search (chỉ đưa jump point vào open list)
+        # hoặc BFS hai chiều (gặp nhau ở giữa)
+        self.engine = 'astar'
+        engine = None
+        if getattr(config, 'USE_JPS', False):
+            self.engine = 'jps'
+            engine = self.maze_gen.get_jump_point_search()
+        elif getattr(config, 'USE_BIDIRECTIONAL', False):
+            self.engine = 'bidirectional'
+            engine = self.maze_gen.get_bidirectional_search()
+        if engine is not None:
+            path, distance, self.nodes_explored = engine.shortest_path(source, target, obstacles_set)
+            self.computation_time_ms = (time.perf_counter_ns() - start_time) / 1e6
+            if path is None:
+                return None, float('inf')
+            self.path_length = len(path)
+            return graph.to_coords(path), distance
+        adjacency = graph.adjacency
+        rows, cols = graph.rows, graph.cols
+        goal_row, goal_col = goal
+        
+        # Priority queue: (f_score, counter, node, g_score)
         # f_score = g_score + h_score
         # counter để đảm bảo thứ tự ổn định khi f_score bằng nhau
+        # Đường đi được lưu bằng bảng cha (came_from), dựng lại một lần ở đích
+        # Heuristic: cận dưới ALT từ landmark (luôn >= Manhattan) nếu có
+        landmarks = self.maze_gen.get_landmarks()
+        bounds = landmarks.bounds_to(target) if landmarks is not None else None
+        if bounds is not None:
+            self.engine = 'alt'
         counter = 0
-        h_score = self.manhattan_distance(start, goal)
-        pq = [(h_score, counter, start, 0, [start])]
-        
-        # Dictionary lưu g_score tốt nhất đến mỗi node
-        g_scores = {start: 0}
+        h_score = bounds[source] if bounds is not None else self.manhattan_distance(start, goal)
+        pq = [(h_score, counter, source, 0)]
         
-        # Set các node đã thăm
-        visited = set()
+        # g_score / came_from / visited: mảng cấp sẵn theo maze, reset bằng generation stamp
+        # (không tạo dict / set mới cho mỗi truy vấn)
+        buffers = self.search_buffers = SearchBuffers.for_graph(self.search_buffers, graph)
+        gen = buffers.begin(source)
+        g_scores, came_from = buffers.dist, buffers.prev
+        seen, visited = buffers.seen, buffers.closed
         
         while pq:
-            f_score, _, current_pos, g_score, path = heapq.heappop(pq)
+            f_score, _, current, g_score = heapq.heappop(pq)
             
             # Nếu đã thăm node này với g_score tốt hơn, bỏ qua
-            if current_pos in visited:
+            if visited[current] == gen:
                 continue
             
-            visited.add(current_pos)
+            visited[current] = gen
             self.nodes_explored += 1
             
             # Kiểm tra đã đến đích chưa
-            if current_pos == goal:
-                self.computation_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+            if current == target:
+                path = buffers.trace(current)
+                self.computation_time_ms = (time.perf_counter_ns() - start_time) / 1e6
                 self.path_length = len(path)
-                return path, g_score
+                return graph.to_coords(path), g_score
             
             # Explore các node kề
-            for neighbor in self.get_neighbors(current_pos):
+            for neighbor in adjacency[current]:
                 # Bỏ qua nếu là obstacle
                 if neighbor in obstacles_set:
                     continue
                 
                 # Bỏ qua nếu đã thăm
-                if neighbor in visited:
+                if visited[neighbor] == gen:
                     continue
                 
                 # Tính g_score mới (mỗi bước có cost = 1)
                 new_g_score = g_score + 1
                 
                 # Chỉ xử lý nếu tìm được đường tốt hơn
-                if neighbor not in g_scores or new_g_score < g_scores[neighbor]:
+                if seen[neighbor] != gen or new_g_score < g_scores[neighbor]:
+                    seen[neighbor] = gen
                     g_scores[neighbor] = new_g_score
+                    came_from[neighbor] = current
                     
                     # Tính f_score = g_score + h_score
-                    h_score = self.manhattan_distance(neighbor, goal)
+                    if bounds is not None:
+                        h_score = bounds[neighbor]
+                    else:
+                        h_score = abs(rows[neighbor] - goal_row) + abs(cols[neighbor] - goal_col)
                     new_f_score = new_g_score + h_score
                     
                     # Thêm vào priority queue
                     counter += 1
-                    new_path = path + [neighbor]
-                    heapq.heappush(pq, (new_f_score, counter, neighbor, new_g_score, new_path))
+                    heapq.heappush(pq, (new_f_score, counter, neighbor, new_g_score))
         
         # Không tìm thấy đường đi
-        self.computation_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+        self.computation_time_ms = (time.perf_counter_ns() - start_time) / 1e6
         return None, float('inf')
     
+    @instrumented('astar', 'ghost_avoidance', nodes=lambda astar: astar.nodes_explored)
     def shortest_path_avoiding_ghosts(self, start, goal, ghost_positions, 
                                       avoidance_radius=3, bomb_positions=None):
         """
@@ -192,7 +238,11 @@ class AStarAlgorithm:
     def get_statistics(self):
         """Lấy thống kê thuật toán"""
         return {
-            'algorithm': 'A* (Manhattan)',
+            'algorithm': {
+                'jps': 'JPS (4-connected)',
+                'bidirectional': 'Bidirectional BFS',
+                'alt': 'A* (ALT landmarks)',
+            }.get(self.engine, 'A* (Manhattan)'),
             'nodes_explored': self.nodes_explored,
             'computation_time_ms': self.computation_time_ms,
             'path_length': self.path_length
@@ -14,8 +14,12 @@ BFS là công cụ phân tích chiến thuật để hỗ trợ AI decision maki
 
 import pygame
 from collections import deque
-from datetime import datetime
-import math
+from wavefront import distance_dict
+from metrics import instrumented
+
+
+def _explored_total(bfs):
+    return bfs.stats['total_nodes_explored']
 
 
 class BFSUtilities:
@@ -51,6 +55,7 @@ class BFSUtilities:
     # FLOOD FILL - Phân tích vùng có thể di chuyển
     # ============================================================================
     
+    @instrumented('bfs', 'flood_fill', counter=_explored_total)
     def flood_fill_reachable_area(self, start_pos, max_distance=12, 
                                    obstacles=None, return_distances=True):
         """
@@ -71,43 +76,24 @@ class BFSUtilities:
             nếu return_distances=True: dict {position: distance}
             nếu return_distances=False: set của positions
         """
-        obstacles = obstacles or set()
-        queue = deque([(start_pos, 0)])
-        visited = {start_pos: 0} if return_distances else {start_pos}
-        nodes_explored = 0
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start_pos)
+        if source < 0:
+            return {start_pos: 0} if return_distances else {start_pos}
         
-        while queue:
-            current, distance = queue.popleft()
-            nodes_explored += 1
-            
-            # Limit search depth
-            if distance >= max_distance:
-                continue
-            
-            # Explore neighbors
-            for neighbor in self._get_valid_neighbors(current):
-                # Skip obstacles
-                if neighbor in obstacles:
-                    continue
-                
-                # Skip if already visited
-                if return_distances:
-                    if neighbor in visited:
-                        continue
-                    visited[neighbor] = distance + 1
-                else:
-                    if neighbor in visited:
-                        continue
-                    visited.add(neighbor)
-                
-                queue.append((neighbor, distance + 1))
+        # BFS theo tầng (engine chọn theo config.DISTANCE_FIELD_ENGINE)
+        distances = distance_dict(graph, [start_pos], max_distance, obstacles)
+        nodes_explored = len(distances)
         
         # Update stats
         self.stats['flood_fills'] += 1
         self.stats['total_nodes_explored'] += nodes_explored
         
-        return visited
+        if return_distances:
+            return distances
+        return set(distances)
     
+    @instrumented('bfs', 'movement_freedom', counter=_explored_total)
     def calculate_movement_freedom(self, pacman_pos, ghost_positions, 
                                    bomb_positions=None, radius=10):
         """
@@ -177,6 +163,7 @@ class BFSUtilities:
         
         return result
     
+    @instrumented('bfs', 'bomb_blockage', counter=_explored_total, success=lambda r: not r['is_blocked'])
     def check_area_blocked_by_bombs(self, start, goal, bomb_positions):
         """
         Kiểm tra xem bom có HOÀN TOÀN chặn đường từ start → goal không
@@ -224,6 +211,7 @@ class BFSUtilities:
     # ESCAPE ROUTE ANALYSIS - Tìm lối thoát tối ưu
     # ============================================================================
     
+    @instrumented('bfs', 'escape_routes', counter=_explored_total)
     def find_all_escape_routes(self, pacman_pos, ghost_positions, 
                                bomb_positions=None, min_safe_distance=8,
                                max_search_depth=15, max_routes=5):
@@ -256,15 +244,21 @@ class BFSUtilities:
             }
         """
         bomb_positions = bomb_positions or []
-        bomb_set = set(bomb_positions)
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(pacman_pos)
+        if source < 0:
+            return []
+        bomb_ids = graph.ids_for(bomb_positions)
+        adjacency = graph.adjacency
         
-        queue = deque([(pacman_pos, 0, [pacman_pos])])
-        visited = {pacman_pos}
+        queue = deque([(source, 0)])
+        parents = {source: -1}
         escape_routes = []
         nodes_explored = 0
         
         while queue and len(escape_routes) < max_routes * 2:  # Explore more to find best
-            current, distance, path = queue.popleft()
+            node, distance = queue.popleft()
+            current = graph.coord(node)
             nodes_explored += 1
             
             # Calculate safety metrics for current position
@@ -298,26 +292,22 @@ class BFSUtilities:
                 
                 escape_routes.append({
                     'destination': current,
-                    'path': path.copy(),
+                    'path': self._trace_path(graph, parents, node),
                     'distance': distance,
                     'safety_score': safety_score,
                     'min_ghost_distance': min_ghost_dist,
                     'min_bomb_distance': min_bomb_dist,
                     'is_junction': is_junction,
                     'escape_directions': escape_dirs,
-                    'neighbor_count': len(self._get_valid_neighbors(current))
+                    'neighbor_count': len(adjacency[node])
                 })
             
-            # Continue exploring if not too deep
+            # Continue exploring if not too deep (bombs are skipped)
             if distance < max_search_depth:
-                for neighbor in self._get_valid_neighbors(current):
-                    # Skip bombs
-                    if neighbor in bomb_set:
-                        continue
-                    
-                    if neighbor not in visited:
-                        visited.add(neighbor)
-                        queue.append((neighbor, distance + 1, path + [neighbor]))
+                for neighbor in adjacency[node]:
+                    if neighbor not in bomb_ids and neighbor not in parents:
+                        parents[neighbor] = node
+                        queue.append((neighbor, distance + 1))
         
         # Sort by safety score (highest first)
         escape_routes.sort(key=lambda x: (
@@ -333,6 +323,7 @@ class BFSUtilities:
         # Return top routes
         return escape_routes[:max_routes]
     
+    @instrumented('bfs', 'escape_direction', counter=_explored_total)
     def find_best_escape_direction(self, pacman_pos, ghost_positions, 
                                    bomb_positions=None):
         """
@@ -384,6 +375,7 @@ class BFSUtilities:
             'reason': 'BFS escape route analysis'
         }
     
+    @instrumented('bfs', 'safe_waiting_position', counter=_explored_total)
     def find_safe_waiting_position(self, pacman_pos, ghost_positions, 
                                    bomb_positions=None, wait_radius=6):
         """
@@ -409,14 +401,20 @@ class BFSUtilities:
             } hoặc None
         """
         bomb_positions = bomb_positions or []
-        bomb_set = set(bomb_positions)
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(pacman_pos)
+        if source < 0:
+            return None
+        bomb_ids = graph.ids_for(bomb_positions)
+        adjacency = graph.adjacency
         
-        queue = deque([(pacman_pos, 0, [pacman_pos])])
-        visited = {pacman_pos}
+        queue = deque([(source, 0)])
+        parents = {source: -1}
         safe_positions = []
         
         while queue:
-            current, distance, path = queue.popleft()
+            node, distance = queue.popleft()
+            current = graph.coord(node)
             
             if distance > wait_radius:
                 continue
@@ -430,7 +428,7 @@ class BFSUtilities:
             # Safe position criteria
             if min_ghost_dist >= 5 and distance >= 2:
                 # Check có nhiều exits không (junction)
-                exits = self._get_valid_neighbors(current)
+                exits = adjacency[node]
                 has_multiple_exits = len(exits) >= 3
                 
                 safety_score = min_ghost_dist * 10
@@ -439,7 +437,7 @@ class BFSUtilities:
                 
                 safe_positions.append({
                     'position': current,
-                    'path': path.copy(),
+                    'path': self._trace_path(graph, parents, node),
                     'distance': distance,
                     'safety_score': safety_score,
                     'min_ghost_distance': min_ghost_dist,
@@ -448,10 +446,10 @@ class BFSUtilities:
                 })
             
             # Continue exploring
-            for neighbor in self._get_valid_neighbors(current):
-                if neighbor not in bomb_set and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, distance + 1, path + [neighbor]))
+            for neighbor in adjacency[node]:
+                if neighbor not in bomb_ids and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append((neighbor, distance + 1))
         
         if not safe_positions:
             return None
@@ -464,6 +462,7 @@ class BFSUtilities:
     # MULTI-TARGET SEARCH - Tìm mục tiêu gần nhất
     # ============================================================================
     
+    @instrumented('bfs', 'nearest_target', counter=_explored_total)
     def find_nearest_target(self, start_pos, targets, obstacles=None, max_distance=50):
         """
         BFS tìm target GẦN NHẤT trong một set targets
@@ -489,20 +488,26 @@ class BFSUtilities:
         if not targets:
             return None
         
-        target_set = set(targets) if not isinstance(targets, set) else targets
-        obstacles = obstacles or set()
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start_pos)
+        if source < 0:
+            return None
+        target_ids = graph.ids_for(targets)
+        blocked = graph.ids_for(obstacles)
+        adjacency = graph.adjacency
         
-        queue = deque([(start_pos, 0, [start_pos])])
-        visited = {start_pos}
+        queue = deque([(source, 0)])
+        parents = {source: -1}
         
         while queue:
-            current, distance, path = queue.popleft()
+            node, distance = queue.popleft()
             
             # Found a target!
-            if current in target_set:
+            if node in target_ids:
+                self.stats['total_nodes_explored'] += len(parents)
                 return {
-                    'target': current,
-                    'path': path,
+                    'target': graph.coord(node),
+                    'path': self._trace_path(graph, parents, node),
                     'distance': distance
                 }
             
@@ -511,13 +516,15 @@ class BFSUtilities:
                 continue
             
             # Explore neighbors
-            for neighbor in self._get_valid_neighbors(current):
-                if neighbor not in obstacles and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, distance + 1, path + [neighbor]))
+            for neighbor in adjacency[node]:
+                if neighbor not in blocked and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append((neighbor, distance + 1))
         
+        self.stats['total_nodes_explored'] += len(parents)
         return None
     
+    @instrumented('bfs', 'k_nearest_targets', counter=_explored_total)
     def find_k_nearest_targets(self, start_pos, targets, k=3, obstacles=None):
         """
         Tìm K targets GẦN NHẤT (thay vì chỉ 1)
@@ -539,50 +546,77 @@ class BFSUtilities:
         if not targets:
             return []
         
-        target_set = set(targets) if not isinstance(targets, set) else targets
-        obstacles = obstacles or set()
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start_pos)
+        if source < 0:
+            return []
+        target_ids = graph.ids_for(targets)
+        blocked = graph.ids_for(obstacles)
+        adjacency = graph.adjacency
         
-        queue = deque([(start_pos, 0, [start_pos])])
-        visited = {start_pos}
+        queue = deque([(source, 0)])
+        parents = {source: -1}
         found_targets = []
         
         while queue and len(found_targets) < k:
-            current, distance, path = queue.popleft()
+            node, distance = queue.popleft()
             
             # Found a target!
-            if current in target_set:
+            if node in target_ids:
                 found_targets.append({
-                    'target': current,
-                    'path': path.copy(),
+                    'target': graph.coord(node),
+                    'path': self._trace_path(graph, parents, node),
                     'distance': distance
                 })
-                # Remove from target set
-                target_set.discard(current)
             
             # Continue exploring
-            for neighbor in self._get_valid_neighbors(current):
-                if neighbor not in obstacles and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, distance + 1, path + [neighbor]))
+            for neighbor in adjacency[node]:
+                if neighbor not in blocked and neighbor not in parents:
+                    parents[neighbor] = node
+                    queue.append((neighbor, distance + 1))
         
+        self.stats['total_nodes_explored'] += len(parents)
         return found_targets
     
+    @instrumented('bfs', 'path_distance', counter=_explored_total, success=lambda d: d is not None)
+    def get_path_distance(self, start_pos, end_pos, max_distance=999):
+        """
+        Khoảng cách đường đi thực tế giữa 2 ô (bỏ qua bom)
+        
+        Tra O(1) từ distance oracle của level nếu có, nếu không thì flood fill
+        
+        Returns:
+            int hoặc None nếu không có đường / xa hơn max_distance
+        """
+        oracle = self.maze_gen.get_distance_oracle()
+        if oracle is not None:
+            distance = oracle.distance(start_pos, end_pos)
+            return distance if distance is not None and distance <= max_distance else None
+        
+        reachable = self.flood_fill_reachable_area(start_pos, max_distance=max_distance)
+        return reachable.get(end_pos)
+    
     # ============================================================================
     # HELPER METHODS
     # ============================================================================
     
     def _get_valid_neighbors(self, position):
-        """Lấy các vị trí láng giềng hợp lệ (không phải tường)"""
-        row, col = position
-        neighbors = []
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if self.game.is_valid_position(new_col, new_row):
-                neighbors.append((new_row, new_col))
-        
-        return neighbors
+        """Lấy các vị trí láng giềng hợp lệ (không phải tường) từ đồ thị đã biên dịch"""
+        graph = self.maze_gen.get_graph()
+        node = graph.node_id(position)
+        if node < 0:
+            return []
+        return graph.to_coords(graph.adjacency[node])
+    
+    @staticmethod
+    def _trace_path(graph, parents, node):
+        """Dựng lại đường đi start -> node từ bảng cha của BFS"""
+        path = []
+        while node != -1:
+            path.append(node)
+            node = parents[node]
+        path.reverse()
+        return graph.to_coords(path)
     
     def _is_junction(self, position):
         """Kiểm tra vị trí có phải là ngã rẽ không (≥3 hướng đi)"""
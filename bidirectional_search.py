@@ -0,0 +1,91 @@
+"""
+Bidirectional BFS for point-to-point unit-cost queries.
+
+Two BFS frontiers grow from start and goal, always expanding the smaller
+one a full layer at a time, and stop on the layer where they meet. For long
+start -> exit queries each side only covers about half the search depth,
+so far fewer nodes are expanded than by a one-directional search.
+"""
+
+
+class BidirectionalSearch:
+    """
+    Layered bidirectional BFS over a GridGraph.
+
+    Attributes:
+        graph: underlying GridGraph
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def shortest_path(self, source, target, blocked=None, use_astar=True):
+        """
+        Unit-cost shortest path between two node ids.
+
+        Args:
+            blocked: set of node ids treated as walls (the source itself may be
+                blocked - Pacman standing on a bomb can still leave it)
+            use_astar: unused, kept for the same signature as the other engines
+
+        Returns:
+            (path, distance, explored) - path is a list of node ids or None
+        """
+        blocked = blocked or set()
+        if target in blocked:
+            return None, float('inf'), 0
+        if source == target:
+            return [source], 0, 1
+
+        adjacency = self.graph.adjacency
+        dist_fwd, dist_bwd = {source: 0}, {target: 0}
+        parent_fwd, parent_bwd = {source: -1}, {target: -1}
+        frontier_fwd, frontier_bwd = [source], [target]
+        explored = 0
+
+        while frontier_fwd and frontier_bwd:
+            # Expand the smaller frontier by one full layer
+            forward = len(frontier_fwd) <= len(frontier_bwd)
+            if forward:
+                frontier, dist, parent, other = frontier_fwd, dist_fwd, parent_fwd, dist_bwd
+            else:
+                frontier, dist, parent, other = frontier_bwd, dist_bwd, parent_bwd, dist_fwd
+
+            best, meet = float('inf'), -1
+            next_frontier = []
+            for node in frontier:
+                explored += 1
+                depth = dist[node] + 1
+                for nb in adjacency[node]:
+                    if nb in dist or (nb in blocked and nb != source):
+                        continue
+                    dist[nb] = depth
+                    parent[nb] = node
+                    next_frontier.append(nb)
+                    if nb in other and depth + other[nb] < best:
+                        best, meet = depth + other[nb], nb
+
+            if meet >= 0:
+                return self._join(parent_fwd, parent_bwd, meet), best, explored
+
+            if forward:
+                frontier_fwd = next_frontier
+            else:
+                frontier_bwd = next_frontier
+
+        return None, float('inf'), explored
+
+    @staticmethod
+    def _join(parent_fwd, parent_bwd, meet):
+        """source -> meet from the forward tree, then meet -> target from the backward tree."""
+        path = []
+        node = meet
+        while node != -1:
+            path.append(node)
+            node = parent_fwd[node]
+        path.reverse()
+        node = parent_bwd[meet]
+        while node != -1:
+            path.append(node)
+            node = parent_bwd[node]
+        return path
@@ -15,8 +15,56 @@ USE_ASTAR = True
 USE_OBSTACLE_PENALTY = False
 NEAR_WALL_PENALTY = 0.1
 
-# Optional validation: Verify the returned path length equals the BFS shortest path
+# Optional validation: Verify the returned path length equals the BFS shortest path.
+# A sampled fraction of unit-cost results is re-checked on a background thread.
 VERIFY_OPTIMALITY_WITH_BFS = True
+VERIFY_SAMPLE_RATE = 0.02
+VERIFY_QUEUE_SIZE = 64  # Pending checks; further samples are skipped while the worker catches up
+
+# All-pairs distance oracle: uint16 table of walking distances built once per level
+USE_DISTANCE_ORACLE = True
+DISTANCE_ORACLE_MAX_MB = 16  # Larger mazes skip the table and use on-demand BFS
+DISTANCE_ORACLE_WORKERS = 0  # Build processes (0 = one per CPU, 1 = in-process)
+DISTANCE_ORACLE_PARALLEL_MIN_NODES = 2000  # Only use the process pool for mazes this large
+
+# Distance fields (flood fill, AI distance map): 'graph' = BFS on node ids, 'wavefront' = NumPy mask shifts
+DISTANCE_FIELD_ENGINE = 'graph'
+
+# Junction graph: unit-cost searches run on junctions / dead ends, corridors expanded on output
+USE_JUNCTION_GRAPH = True
+# Jump Point Search for unit-cost queries (takes precedence over the junction graph)
+USE_JPS = False
+# Bidirectional BFS for unit-cost point-to-point queries (after JPS, before the junction graph)
+USE_BIDIRECTIONAL = False
+# HPA*: cluster hierarchy used instead of flat search on very large mazes
+USE_HPA = True
+HPA_MIN_NODES = 20000  # Open cells needed before the hierarchy is used (~200x200 maze)
+HPA_CLUSTER_SIZE = 16
+# D* Lite: auto mode (ghost + bomb avoidance) repairs its previous search instead of replanning
+USE_INCREMENTAL_PLANNER = True
+# ALT: landmark lower bounds (triangle inequality) replace Manhattan distance as the A* heuristic
+USE_LANDMARKS = True
+LANDMARK_COUNT = 12
+
+# Dial's bucket queue replaces the binary heap when step costs are integers up to this bound
+USE_BUCKET_QUEUE = True
+BUCKET_QUEUE_MAX_STEP = 10000
+
+# Anytime search (shortest_path_anytime): ARA* epsilon schedule, refined across frames
+ANYTIME_INITIAL_EPSILON = 2.5
+ANYTIME_EPSILON_STEP = 0.5
+
+# Space-time A* (shortest_path_space_time): ghosts rolled forward with their movement policy
+USE_SPACE_TIME_ASTAR = True
+SPACE_TIME_HORIZON = 12  # Pacman steps checked against predicted ghost cells
+SPACE_TIME_MARGIN = 1    # Cells around a predicted ghost that count as a collision
+
+# LRU cache of unit-cost paths keyed on (maze version, start, goal, obstacles)
+USE_PATH_CACHE = True
+PATH_CACHE_SIZE = 256
+
+# Multi-objective pathfinding: one Dijkstra tree per strategy cost model instead of 3 searches per objective
+MULTI_OBJECTIVE_SINGLE_PASS = True
 
 # Enhanced validation settings for robust wall detection
 STRICT_PATH_VALIDATION = True
@@ -38,6 +86,13 @@ NORMAL_UPDATE_INTERVAL_MS = 250  # Reduced from 400ms for more frequent updates
 # Logging and Debugging
 ENABLE_GHOST_AVOIDANCE_LOGGING = True  # Log dual algorithm decisions
 LOG_PATH_EVERY_N_STEPS = 5  # Log progress every N steps
+# Search log: fixed-size ring buffer of compact records, flushed to JSONL by save_logs()
+SEARCH_LOG_CAPACITY = 2048
+SEARCH_LOG_SAMPLE_EVERY = 1  # Record every Nth successful search
+SEARCH_LOG_KEEP_PATHS = False  # Store full paths in every record
+SEARCH_LOG_PATH_KINDS = ('SUCCESSFUL_PATH',)  # Record types that always keep their path (get_training_data)
+# Metrics registry (metrics.REGISTRY): per-variant call counts, µs and nodes-explored histograms
+ENABLE_SEARCH_METRICS = True
 
 # Movement Speed Settings (blocks per second - independent of FPS)
 # These speeds represent how many grid blocks the character moves per second
@@ -0,0 +1,269 @@
+"""
+Articulation-point / bridge index of the open-cell graph.
+
+Tarjan's algorithm splits each connected component into biconnected blocks
+(a bridge is a 2-cell block) joined at articulation points, and the
+block-cut tree of those is rooted and indexed for O(1) ancestor tests and
+O(log n) LCA. A walk from A to B must cross exactly the blocks and cut
+cells on the tree path between them, so for a set of bombs (cells treated
+as walls):
+
+- a bomb on an on-path cut cell (or on B) disconnects A from B;
+- bombs off the path never matter;
+- a single bomb inside an on-path block cannot disconnect it (a block
+  stays connected after losing any one cell).
+
+Only when one on-path block holds two or more bombs is the answer not
+determined by the index; then a BFS settles it.
+"""
+
+
+class ConnectivityIndex:
+    """
+    Block-cut tree of a GridGraph.
+
+    Attributes:
+        graph: underlying GridGraph
+        component: connected component id per node id
+        is_cut: True for articulation points
+        cut_nodes: node ids of the articulation points
+        blocks: list of biconnected blocks (sets of node ids)
+        queries: connected() calls; fallbacks: how many of them needed a BFS
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.queries = 0
+        self.fallbacks = 0
+        self._find_blocks()
+        self._build_tree()
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def _find_blocks(self):
+        """Iterative Tarjan: articulation points and biconnected blocks."""
+        adjacency = self.graph.adjacency
+        n = self.graph.num_nodes
+        disc = [-1] * n
+        low = [0] * n
+        parent = [-1] * n
+        self.component = [-1] * n
+        self.is_cut = [False] * n
+        self.blocks = []
+        edge_stack = []
+        time = 0
+
+        for root in range(n):
+            if disc[root] >= 0:
+                continue
+            comp = root
+            self.component[root] = comp
+            disc[root] = low[root] = time
+            time += 1
+            if not adjacency[root]:
+                self.blocks.append({root})  # Isolated cell
+                continue
+
+            root_children = 0
+            stack = [(root, iter(adjacency[root]))]
+            while stack:
+                u, neighbors = stack[-1]
+                descended = False
+                for v in neighbors:
+                    if disc[v] < 0:
+                        parent[v] = u
+                        self.component[v] = comp
+                        disc[v] = low[v] = time
+                        time += 1
+                        edge_stack.append((u, v))
+                        stack.append((v, iter(adjacency[v])))
+                        if u == root:
+                            root_children += 1
+                        descended = True
+                        break
+                    if v != parent[u] and disc[v] < disc[u]:
+                        # Back edge
+                        if disc[v] < low[u]:
+                            low[u] = disc[v]
+                        edge_stack.append((u, v))
+                if descended:
+                    continue
+
+                stack.pop()
+                if not stack:
+                    break
+                p = stack[-1][0]
+                if low[u] < low[p]:
+                    low[p] = low[u]
+                if low[u] >= disc[p]:
+                    # p separates u's subtree: pop its block
+                    if p != root:
+                        self.is_cut[p] = True
+                    block = set()
+                    while True:
+                        a, b = edge_stack.pop()
+                        block.add(a)
+                        block.add(b)
+                        if a == p and b == u:
+                            break
+                    self.blocks.append(block)
+            if root_children > 1:
+                self.is_cut[root] = True
+        self.cut_nodes = [v for v in range(n) if self.is_cut[v]]
+
+    def _build_tree(self):
+        """Block-cut tree (blocks first, then one node per cut cell), rooted per component."""
+        num_blocks = len(self.blocks)
+        cut_node = {}
+        tree = [[] for _ in range(num_blocks)]
+        self.tree_node = [-1] * self.graph.num_nodes  # node id -> block-cut tree node
+        for b, block in enumerate(self.blocks):
+            for v in block:
+                if self.is_cut[v]:
+                    t = cut_node.get(v)
+                    if t is None:
+                        t = cut_node[v] = len(tree)
+                        tree.append([])
+                        self.tree_node[v] = t
+                    tree[t].append(b)
+                    tree[b].append(t)
+                else:
+                    self.tree_node[v] = b
+        self._tree = tree
+
+        # Euler tour (tin / tout) and binary lifting over the forest
+        size = len(tree)
+        self._tin = [0] * size
+        self._tout = [0] * size
+        depth = [0] * size
+        up = [-1] * size
+        seen = [False] * size
+        clock = 0
+        for root in range(size):
+            if seen[root]:
+                continue
+            seen[root] = True
+            up[root] = root
+            self._tin[root] = clock
+            clock += 1
+            stack = [(root, iter(tree[root]))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if not seen[child]:
+                        seen[child] = True
+                        up[child] = node
+                        depth[child] = depth[node] + 1
+                        self._tin[child] = clock
+                        clock += 1
+                        stack.append((child, iter(tree[child])))
+                        break
+                else:
+                    stack.pop()
+                    self._tout[node] = clock
+                    clock += 1
+        self._up = [up]
+        levels = max(depth).bit_length() if size else 0
+        for _ in range(levels):
+            prev = self._up[-1]
+            self._up.append([prev[prev[x]] for x in range(size)])
+
+    # ------------------------------------------------------------------
+    # Tree queries
+    # ------------------------------------------------------------------
+
+    def _is_ancestor(self, a, b):
+        return self._tin[a] <= self._tin[b] and self._tout[b] <= self._tout[a]
+
+    def _lca(self, a, b):
+        if self._is_ancestor(a, b):
+            return a
+        if self._is_ancestor(b, a):
+            return b
+        for level in reversed(self._up):
+            if not self._is_ancestor(level[a], b):
+                a = level[a]
+        return self._up[0][a]
+
+    def _on_path(self, node, a, b, lca):
+        return self._is_ancestor(lca, node) and (self._is_ancestor(node, a) or self._is_ancestor(node, b))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def connected(self, start, goal, bombs=None):
+        """
+        Can start reach goal with bombs as walls? Start itself may be a bomb
+        (Pacman standing on one can still leave it), goal may not.
+        """
+        graph = self.graph
+        source, target = graph.node_id(start), graph.node_id(goal)
+        if source < 0 or target < 0:
+            return False
+        self.queries += 1
+        if self.component[source] != self.component[target]:
+            return False
+        if source == target:
+            return True
+        blocked = graph.ids_for(bombs)
+        blocked.discard(source)
+        if not blocked:
+            return True
+        if target in blocked:
+            return False
+
+        x, y = self.tree_node[source], self.tree_node[target]
+        lca = self._lca(x, y)
+        bombs_in_block = {}
+        for v in blocked:
+            if self.component[v] != self.component[source]:
+                continue
+            t = self.tree_node[v]
+            if self.is_cut[v]:
+                if self._on_path(t, x, y, lca):
+                    return False  # Articulation point between start and goal
+                blocks = [b for b in self._tree[t] if self._on_path(b, x, y, lca)]
+            else:
+                blocks = [t] if self._on_path(t, x, y, lca) else []
+            for b in blocks:
+                bombs_in_block[b] = bombs_in_block.get(b, 0) + 1
+
+        if all(count < 2 for count in bombs_in_block.values()):
+            return True
+
+        # Two or more bombs inside one on-path block: settle it with a BFS
+        self.fallbacks += 1
+        return self._bfs_reaches(source, target, blocked)
+
+    def _bfs_reaches(self, source, target, blocked):
+        adjacency = self.graph.adjacency
+        seen = {source}
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for nb in adjacency[node]:
+                    if nb == target:
+                        return True
+                    if nb not in seen and nb not in blocked:
+                        seen.add(nb)
+                        next_frontier.append(nb)
+            frontier = next_frontier
+        return False
+
+    def critical_cells(self, start, goal):
+        """Cells that disconnect start from goal when a single bomb sits on them."""
+        graph = self.graph
+        source, target = graph.node_id(start), graph.node_id(goal)
+        if source < 0 or target < 0 or self.component[source] != self.component[target]:
+            return []
+        x, y = self.tree_node[source], self.tree_node[target]
+        lca = self._lca(x, y)
+        cells = [graph.coord(v) for v in self.cut_nodes
+                 if v != source and self._on_path(self.tree_node[v], x, y, lca)]
+        if target != source:
+            cells.append(graph.coord(target))
+        return cells
@@ -0,0 +1,106 @@
+"""
+Per-frame ghost penalty raster.
+
+Penalty-aware searches used to recompute "distance to the nearest ghost"
+for every neighbor they relaxed (or rebuild a dict with nested loops on
+every call). A CostLayer computes the whole penalty field once with NumPy
+from the ghost positions and radius; searches then read one list index per
+relaxation, and every search issued in the same tick with the same ghosts
+shares the layer.
+
+Profiles:
+- 'quadratic': (radius - d + 1) ** 2 * multiplier for d <= radius, where d
+  is the Manhattan distance to the nearest ghost (ghost avoidance).
+- 'linear': (peak * (radius - d + 1)) // radius for 0 < d <= radius; the
+  ghost cell itself is not penalised (ghost + bomb avoidance).
+- 'stepped': (radius - d + 1) * multiplier for 0 < d <= radius (bomb radius
+  avoidance; the centre cell itself is not penalised).
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CostLayer:
+    """
+    Ghost penalty raster over a GridGraph.
+
+    Attributes:
+        raster: int32 array (height, width) of penalties (0 on walls)
+        node_penalty: list node id -> penalty, indexed by the search kernels
+        penalties: dict node id -> penalty for nonzero cells only (HPA*, D* Lite)
+        max_penalty: largest penalty (bounds the step cost for the bucket queue)
+    """
+
+    def __init__(self, graph, ghost_positions, radius, multiplier=10, profile='quadratic'):
+        self.graph = graph
+        self.radius = radius
+        self.profile = profile
+
+        rows = graph.flat_index // graph.width
+        cols = graph.flat_index % graph.width
+        penalty = np.zeros(graph.num_nodes, dtype=np.int32)
+
+        ghosts = [(int(r), int(c)) for r, c in ghost_positions or ()]
+        if ghosts and radius > 0:
+            # Nearest ghost distance per node (d == 0 excluded unless quadratic)
+            nearest = np.full(graph.num_nodes, np.iinfo(np.int32).max, dtype=np.int64)
+            for gr, gc in ghosts:
+                d = np.abs(rows - gr) + np.abs(cols - gc)
+                if profile != 'quadratic':
+                    d = np.where(d == 0, nearest, d)
+                np.minimum(nearest, d, out=nearest)
+
+            near = nearest <= radius
+            closeness = radius - nearest[near] + 1
+            if profile == 'linear':
+                penalty[near] = (multiplier * closeness) // radius
+            elif profile == 'stepped':
+                penalty[near] = closeness * multiplier
+            else:
+                penalty[near] = closeness * closeness * multiplier
+
+        self.raster = np.zeros((graph.height, graph.width), dtype=np.int32)
+        self.raster.flat[graph.flat_index] = penalty
+        self.node_penalty = penalty.tolist()
+        self.max_penalty = int(penalty.max()) if graph.num_nodes else 0
+        nonzero = np.flatnonzero(penalty)
+        self.penalties = dict(zip(nonzero.tolist(), penalty[nonzero].tolist()))
+
+    def at(self, position):
+        """Penalty of a (row, col) cell (0 outside the maze)."""
+        row, col = position
+        if 0 <= row < self.graph.height and 0 <= col < self.graph.width:
+            return int(self.raster[row, col])
+        return 0
+
+
+class CostLayerCache:
+    """
+    Small LRU of CostLayers keyed on (graph, ghosts, radius, multiplier, profile).
+    Ghosts move every frame, so in practice this holds the layers of the
+    current tick and is reused by every search issued in it.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self._layers = OrderedDict()
+        self.builds = 0
+        self.reuses = 0
+
+    def get(self, graph, ghost_positions, radius, multiplier=10, profile='quadratic'):
+        key = (id(graph), tuple(sorted((int(r), int(c)) for r, c in ghost_positions or ())),
+               radius, multiplier, profile)
+        layer = self._layers.get(key)
+        if layer is not None and layer.graph is graph:
+            self._layers.move_to_end(key)
+            self.reuses += 1
+            return layer
+
+        layer = CostLayer(graph, ghost_positions, radius, multiplier, profile)
+        self._layers[key] = layer
+        self.builds += 1
+        while len(self._layers) > self.capacity:
+            self._layers.popitem(last=False)
+        return layer
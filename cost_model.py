@@ -0,0 +1,129 @@
+"""
+Composable cost model for the shortest_path_* variants.
+
+Each variant used to build its own blocked set or penalty dict and run its
+own copy of the search / clean-path / logging loop. A CostModel is a stack
+of layers over one GridGraph:
+
+- block(): cells treated as walls (bombs, obstacles);
+- block_radius(): every cell within a Manhattan radius of a position;
+- add_penalty(): a flat penalty for entering some cells;
+- add_layer(): a precomputed CostLayer raster (ghosts, bomb radius).
+
+The layers are compiled once, on first use, into a blocked node-id set and
+a single per-node penalty array (summed with NumPy). The compiled model
+exposes the same node_penalty / penalties / max_penalty attributes as a
+CostLayer, so the search kernels take it in place of one.
+"""
+
+import numpy as np
+
+
+class CostModel:
+    """
+    Stack of blocking and penalty layers over a GridGraph.
+
+    Attributes:
+        graph: GridGraph the layers refer to
+        unit_base: every step costs 1 before penalties (ignore near-wall cost)
+        blocked: set of node ids treated as walls
+        node_penalty: list node id -> penalty, or None without penalty layers
+        penalties: dict node id -> penalty for nonzero nodes only
+        max_penalty: largest penalty (a float when a flat penalty is a float)
+    """
+
+    def __init__(self, graph, unit_base=False):
+        self.graph = graph
+        self.unit_base = unit_base
+        self._blocked = set()
+        self._bans = []  # (positions, radius)
+        self._flat = []  # (node ids, penalty)
+        self._layers = []  # CostLayer
+        self._compiled = False
+
+    def block(self, positions):
+        """Treat positions as walls."""
+        self._blocked |= self.graph.ids_for(positions)
+        self._compiled = False
+        return self
+
+    def block_radius(self, positions, radius):
+        """Treat every cell within Manhattan distance radius of any position as a wall."""
+        if positions and radius >= 0:
+            self._bans.append(([(int(r), int(c)) for r, c in positions], radius))
+            self._compiled = False
+        return self
+
+    def add_penalty(self, positions, penalty):
+        """Add penalty to the cost of entering each of positions."""
+        ids = self.graph.ids_for(positions)
+        if ids and penalty:
+            self._flat.append((ids, penalty))
+            self._compiled = False
+        return self
+
+    def add_layer(self, layer):
+        """Add a CostLayer raster (ignored when it penalises nothing)."""
+        if layer is not None and layer.penalties:
+            self._layers.append(layer)
+            self._compiled = False
+        return self
+
+    @property
+    def blocked(self):
+        self._compile()
+        return self._blocked_ids
+
+    @property
+    def node_penalty(self):
+        self._compile()
+        return self._node_penalty
+
+    @property
+    def penalties(self):
+        self._compile()
+        return self._penalties
+
+    @property
+    def max_penalty(self):
+        self._compile()
+        return self._max_penalty
+
+    def _compile(self):
+        if self._compiled:
+            return
+        graph = self.graph
+
+        blocked = set(self._blocked)
+        if self._bans:
+            rows = graph.flat_index // graph.width
+            cols = graph.flat_index % graph.width
+            banned = np.zeros(graph.num_nodes, dtype=bool)
+            for positions, radius in self._bans:
+                for r, c in positions:
+                    banned |= (np.abs(rows - r) + np.abs(cols - c)) <= radius
+            blocked.update(np.flatnonzero(banned).tolist())
+        self._blocked_ids = blocked
+
+        if len(self._layers) == 1 and not self._flat:
+            # Single raster (the common ghost case): share its lists, no copy
+            layer = self._layers[0]
+            self._node_penalty = layer.node_penalty
+            self._penalties = layer.penalties
+            self._max_penalty = layer.max_penalty
+        elif self._layers or self._flat:
+            integral = all(isinstance(value, (int, np.integer)) for _, value in self._flat)
+            penalty = np.zeros(graph.num_nodes, dtype=np.int64 if integral else np.float64)
+            for layer in self._layers:
+                penalty += layer.raster.flat[graph.flat_index]
+            for ids, value in self._flat:
+                penalty[np.fromiter(ids, dtype=np.int64, count=len(ids))] += value
+            self._node_penalty = penalty.tolist()
+            self._max_penalty = penalty.max().item() if graph.num_nodes else 0
+            nonzero = np.flatnonzero(penalty)
+            self._penalties = dict(zip(nonzero.tolist(), penalty[nonzero].tolist()))
+        else:
+            self._node_penalty = None
+            self._penalties = {}
+            self._max_penalty = 0
+        self._compiled = True
@@ -1,202 +1,445 @@
 import heapq
-import json
 import os
+import time
 from datetime import datetime
-import hashlib
 from collections import deque
 import numpy as np
 import config
 from path_validator import PathValidator
-import math
+from incremental_planner import DStarLite
+from path_cache import PathCache
+from cost_layer import CostLayerCache
+from cost_model import CostModel
+from flow_field import FlowField
+from wavefront import distance_field
+from search_log import SearchLog
+from optimality_verifier import OptimalityVerifier
+from metrics import instrumented
+from anytime_search import AnytimeSearch
+from search_buffers import SearchBuffers
+from space_time_search import ReservationTable, space_time_astar
+
+
+def _explored_total(algorithm):
+    return algorithm.nodes_explored_total
 
 
 class DijkstraAlgorithm:
     def __init__(self, maze_generator):
         self.maze_gen = maze_generator
-        self.log_data = []
-        self.run_history = []  # Add missing run_history attribute
+        self.search_log = SearchLog(
+            capacity=getattr(config, 'SEARCH_LOG_CAPACITY', 2048),
+            sample_every=getattr(config, 'SEARCH_LOG_SAMPLE_EVERY', 1),
+            keep_paths=getattr(config, 'SEARCH_LOG_KEEP_PATHS', False),
+            path_kinds=getattr(config, 'SEARCH_LOG_PATH_KINDS', ('SUCCESSFUL_PATH',)),
+        )  # Bounded ring buffer of compact search records
+        self.run_history = deque(maxlen=100)  # Recent multi-objective decisions
+        self.verifier = None  # Sampled background BFS re-check of unit-cost results
+        if getattr(config, 'VERIFY_OPTIMALITY_WITH_BFS', False):
+            self.verifier = OptimalityVerifier(
+                sample_rate=getattr(config, 'VERIFY_SAMPLE_RATE', 0.02),
+                queue_size=getattr(config, 'VERIFY_QUEUE_SIZE', 64),
+                on_mismatch=lambda record: self.search_log.record_error('OPTIMALITY_MISMATCH', record),
+            )
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self._height, self._width = self.maze_gen.maze.shape
         self.last_run_stats = None
         self.last_nodes_explored = 0  # Quick access to nodes explored
+        self.nodes_explored_total = 0  # Cumulative over every search kernel call (metrics, multi-objective)
+        self.last_engine = None  # Search engine used by the last _search call
+        self.incremental_planner = None  # D* Lite state reused by auto mode replans
+        self.last_partial = False  # Last _search ran out of budget and returned a partial path
+        self.anytime_search = None  # ARA* state refined across frames by shortest_path_anytime
+        self.search_buffers = None  # Generation-stamped dist / prev slots of the grid kernels
         self.validator = PathValidator(maze_generator)
         
         # Advanced pathfinding state
         self.ghost_memory = {}  # Remember ghost positions and movements
-        self.path_cache = {}    # Cache calculated paths
+        self.path_cache = PathCache(getattr(config, 'PATH_CACHE_SIZE', 256))  # LRU cache of unit-cost paths
+        self.cost_layers = CostLayerCache()  # Ghost penalty rasters shared by the searches of one tick
+        self.flow_fields = {}  # (goal, obstacle fingerprint) -> FlowField for the current maze
         self.danger_zones = set()  # Track dangerous areas
         self.safe_zones = set()    # Track known safe areas
 
-    def shortest_path(self, start, goal, enable_logging=True):
-        """A*/Dijkstra on grid; enforces no-wall moves and shortest path cost."""
-        self.last_run_stats = None
-        if not self._validate_positions(start, goal):
-            self.last_run_stats = {
-                'nodes_explored': 0,
-                'computation_time_ms': 0.0,
-                'success': False,
-            }
-            return None, float('inf')
-
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
-
-        dist = {start: 0}
-        visited = set()
-        prev = {start: None}
-
+    def _search(self, start, goal, blocked=None, extra_cost=None, unit_base=False, penalties=None, cost_layer=None,
+                max_nodes=None, deadline_ns=None):
+        """
+        Shared A*/Dijkstra kernel used by every shortest_path_* variant.
+
+        Runs on the compiled GridGraph (integer node ids, CSR adjacency).
+        Heap entries are (f, g, node) only; the route is kept in a predecessor
+        table and rebuilt once when the goal is popped.
+
+        Args:
+            blocked: set of node ids treated as walls (bombs, obstacles)
+            extra_cost: callable(node_id) -> penalty for entering that node
+            penalties: dict node_id -> penalty for entering that node (same as
+                extra_cost, but usable by the hierarchical engine)
+            unit_base: base step cost is always 1 (ignore near-wall penalty)
+            cost_layer: CostLayer whose per-node penalty is added on entering a node
+            max_nodes: stop after expanding this many nodes
+            deadline_ns: stop once time.perf_counter_ns() reaches this value
+
+        When a budget runs out, the path leads to the lowest-f frontier node
+        instead of the goal and self.last_partial is set. Budgeted searches
+        always run on the grid kernel (the other engines cannot stop early).
+
+        Returns:
+            (path, g, explored, reached) - path is a list of (row, col),
+            or None when goal is unreachable; reached counts the nodes labelled
+        """
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start)
+        target = graph.node_id(goal)
+        base_costs = None if unit_base else self._node_base_costs(graph)
+        if cost_layer is not None and not cost_layer.penalties:
+            cost_layer = None  # No ghost in range: plain query (cacheable, fast engines)
+        self.last_partial = False
+        budget = (max_nodes, deadline_ns) if max_nodes is not None or deadline_ns is not None else None
+
+        # Unit-cost results only depend on (maze, start, goal, obstacles): serve them from the LRU cache
+        if extra_cost is None and not penalties and cost_layer is None and base_costs is None \
+                and source >= 0 and target >= 0 \
+                and getattr(config, 'USE_PATH_CACHE', True):
+            version = self.maze_gen.maze_version
+            start, goal = tuple(start), tuple(goal)
+            fingerprint = PathCache.fingerprint(blocked)
+            hit, path = self.path_cache.get(version, start, goal, fingerprint)
+            if hit:
+                self.last_engine = 'cache'
+                if path is None:
+                    return None, float('inf'), 0, 0
+                return path, len(path) - 1, 0, 2
+            result = self._search_uncached(graph, start, goal, source, target, blocked, None, None, None, None,
+                                           budget)
+            if not self.last_partial:
+                self.path_cache.put(version, start, goal, fingerprint, result[0])
+        else:
+            result = self._search_uncached(graph, start, goal, source, target, blocked,
+                                           extra_cost, penalties, base_costs, cost_layer, budget)
+        self.nodes_explored_total += result[2]
+        return result
+
+    def _search_uncached(self, graph, start, goal, source, target, blocked, extra_cost, penalties, base_costs,
+                         cost_layer, budget=None):
+        """Engine dispatch + grid kernel behind _search (no cache lookup)."""
+        use_astar = getattr(config, 'USE_ASTAR', False)
+
+        self.last_engine = 'astar' if use_astar else 'dijkstra'
+        uniform = extra_cost is None and base_costs is None and source >= 0 and target >= 0 and budget is None
+        node_penalty = None
+        if cost_layer is not None:
+            if penalties:
+                # Rare mix of both: fold into one dict
+                layer_penalty = cost_layer.node_penalty
+                penalties = {n: penalties.get(n, 0) + layer_penalty[n]
+                             for n in set(penalties) | set(cost_layer.penalties)}
+            else:
+                node_penalty = cost_layer.node_penalty  # Single list index per relaxation
+                penalties = cost_layer.penalties  # Sparse view for HPA*
+
+        # Uniform step cost: JPS, bidirectional BFS or the corridor-contracted graph instead of the grid
+        if uniform and not penalties:
+            engine = None
+            if getattr(config, 'USE_JPS', False):
+                engine = self.maze_gen.get_jump_point_search()
+                self.last_engine = 'jps'
+            elif getattr(config, 'USE_BIDIRECTIONAL', False):
+                engine = self.maze_gen.get_bidirectional_search()
+                self.last_engine = 'bidirectional'
+            elif getattr(config, 'USE_JUNCTION_GRAPH', True):
+                engine = self.maze_gen.get_junction_graph()
+                self.last_engine = 'junction'
+            if engine is not None:
+                nodes, g, explored = engine.shortest_path(source, target, blocked, use_astar)
+                if nodes is None:
+                    return None, float('inf'), explored, 0
+                return graph.to_coords(nodes), g, explored, 2
+
+        # Very large mazes: HPA* cluster hierarchy (penalty dicts, or unit cost without the junction graph)
+        if uniform and getattr(config, 'USE_HPA', True) \
+                and graph.num_nodes >= getattr(config, 'HPA_MIN_NODES', 20000):
+            hpa = self.maze_gen.get_hierarchical_pathfinder()
+            nodes, g, explored = hpa.shortest_path(source, target, blocked, penalties, use_astar)
+            self.last_engine = 'hpa'
+            if nodes is None:
+                return None, float('inf'), explored, 0
+            return graph.to_coords(nodes), g, explored, 2
+
+        adjacency = graph.adjacency
+        rows, cols = graph.rows, graph.cols
+        goal_row, goal_col = goal
+
+        # ALT landmark bound (>= Manhattan) when available
+        bounds = None
+        if use_astar and target >= 0:
+            landmarks = self.maze_gen.get_landmarks()
+            if landmarks is not None:
+                bounds = landmarks.bounds_to(target)
+                self.last_engine = 'alt'
+
+        if bounds is not None:
+            h0 = bounds[source]
+        else:
+            h0 = abs(start[0] - goal_row) + abs(start[1] - goal_col) if use_astar else 0
+
+        # Integer step costs: Dial's bucket queue instead of the binary heap
+        if extra_cost is None and self._bucket_queue_step(base_costs, penalties, cost_layer, node_penalty):
+            return self._bucket_kernel(graph, source, target, goal, h0, blocked, base_costs, penalties,
+                                       node_penalty, bounds, use_astar, budget)
+
+        # Preallocated per-maze slots, reset by a generation stamp (no dict / set per query)
+        buffers = self.search_buffers = SearchBuffers.for_graph(self.search_buffers, graph)
+        gen = buffers.begin(source)
+        dist, prev, seen, closed = buffers.dist, buffers.prev, buffers.seen, buffers.closed
+        pq = [(h0, 0, source)]
         explored = 0
-        t0 = datetime.now()
+        reached = 1
 
         while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
+            f, g, node = heapq.heappop(pq)
+            if closed[node] == gen:
                 continue
-            visited.add(node)
+            closed[node] = gen
             explored += 1
 
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                
-                # Strict validation: remove any wall positions from path
-                clean_path = []
-                for pos in path:
-                    row, col = pos
-                    if (0 <= row < self.maze_gen.height and 
-                        0 <= col < self.maze_gen.width and 
-                        self.maze_gen.maze[row, col] == 0):  # Only open paths
-                        clean_path.append(pos)
-                
-                if not clean_path:
-                    if enable_logging:
-                        self._log_error('INVALID_PATH', {'start': start, 'goal': goal, 'path': path, 'distance': g})
-                    self.last_run_stats = {
-                        'nodes_explored': explored,
-                        'computation_time_ms': dt_ms,
-                        'success': False,
-                    }
-                    return None, float('inf')
-                
-                if enable_logging:
-                    self._log_successful_path(start, goal, clean_path, g, explored, dt_ms)
-                self.last_run_stats = {
-                    'nodes_explored': explored,
-                    'computation_time_ms': dt_ms,
-                    'success': True,
-                }
-                self.last_nodes_explored = explored  # Quick access
-                return clean_path, len(clean_path) - 1  # Return step count as distance
-
-            if g > dist.get(node, float('inf')):
-                continue
+            if node == target:
+                return graph.to_coords(buffers.trace(target)), g, explored, reached
 
-            for nb in self._get_valid_neighbors(node):
-                ng = g + self._calculate_move_cost(node, nb)
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    prev[nb] = node
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
+            if budget is not None and self._budget_spent(budget, explored):
+                self.last_partial = True  # node is the lowest-f frontier node
+                return graph.to_coords(buffers.trace(node)), g, explored, reached
 
-        if enable_logging:
-            self._log_error('GOAL_UNREACHABLE', {'start': start, 'goal': goal, 'nodes_explored': explored, 'reachable_positions': len(dist)})
-        self.last_run_stats = {
-            'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
-            'success': False,
-        }
-        self.last_nodes_explored = explored  # Quick access
-        return None, float('inf')
-
-    def shortest_path_with_ghost_avoidance(self, start, goal, ghost_positions, avoidance_radius=3, enable_logging=True):
-        """A*/Dijkstra with dynamic ghost avoidance - dual algorithm approach"""
-        self.last_run_stats = None
-        if not self._validate_positions(start, goal):
-            self.last_run_stats = {
-                'nodes_explored': 0,
-                'computation_time_ms': 0.0,
-                'success': False,
-            }
-            return None, float('inf')
+            for nb in adjacency[node]:
+                if blocked and nb in blocked:
+                    continue
+                ng = g + (base_costs[nb] if base_costs is not None else 1)
+                if extra_cost is not None:
+                    ng += extra_cost(nb)
+                if node_penalty is not None:
+                    ng += node_penalty[nb]
+                elif penalties:
+                    ng += penalties.get(nb, 0)
+                if seen[nb] != gen:
+                    seen[nb] = gen
+                    reached += 1
+                elif ng >= dist[nb]:
+                    continue
+                dist[nb] = ng
+                prev[nb] = node
+                if bounds is not None:
+                    nf = ng + bounds[nb]
+                else:
+                    nf = ng + (abs(rows[nb] - goal_row) + abs(cols[nb] - goal_col) if use_astar else 0)
+                heapq.heappush(pq, (nf, ng, nb))
 
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
+        return None, float('inf'), explored, reached
 
-        dist = {start: 0}
-        visited = set()
-        prev = {start: None}
+    @staticmethod
+    def _budget_spent(budget, explored):
+        """True once max_nodes expansions are done or the deadline passed (clock read every 32 pops)."""
+        max_nodes, deadline_ns = budget
+        if max_nodes is not None and explored >= max_nodes:
+            return True
+        return deadline_ns is not None and explored & 31 == 1 and time.perf_counter_ns() >= deadline_ns
 
+    def _bucket_queue_step(self, base_costs, penalties, cost_layer, node_penalty):
+        """
+        Largest step cost when every cost is an integer and within
+        config.BUCKET_QUEUE_MAX_STEP (bucket queue usable), else None.
+        """
+        if not getattr(config, 'USE_BUCKET_QUEUE', True):
+            return None
+        step = 1
+        if base_costs is not None:
+            step = 1 + int(getattr(config, 'NEAR_WALL_PENALTY', 0.1) * 8)  # 8 wall neighbours at most
+        if node_penalty is not None:
+            if type(cost_layer.max_penalty) is not int:
+                return None
+            step += cost_layer.max_penalty
+        elif penalties:
+            values = penalties.values()
+            if not all(type(v) is int for v in values):
+                return None
+            step += max(values)
+        return step if step <= getattr(config, 'BUCKET_QUEUE_MAX_STEP', 10000) else None
+
+    def _bucket_kernel(self, graph, source, target, goal, h0, blocked, base_costs, penalties, node_penalty,
+                       bounds, use_astar, budget=None):
+        """
+        Grid kernel of _search_uncached on a bucket queue (Dial's algorithm).
+
+        With integer step costs and a consistent integer heuristic (Manhattan,
+        ALT) the popped f = g + h never decreases, so nodes are kept in one list
+        per f value and a cursor walks the f values upwards: no (f, g, node)
+        tuple per push and no heap sift. Buckets are a dict rather than a
+        circular array, so nothing is allocated per empty f value; when the
+        cursor and the next value are both empty (wide penalty gaps) it jumps
+        with min() over the few live buckets. Ties pop last-in first-out,
+        which favours the deeper node for A*.
+        """
+        adjacency = graph.adjacency
+        rows, cols = graph.rows, graph.cols
+        goal_row, goal_col = goal
+
+        # Inlined on purpose: push / pop method calls cost as much as the heap they replace
+        buckets = {h0: [source]}  # f -> nodes
+        cursor = h0
+        buffers = self.search_buffers = SearchBuffers.for_graph(self.search_buffers, graph)
+        gen = buffers.begin(source)
+        dist, prev, seen, closed = buffers.dist, buffers.prev, buffers.seen, buffers.closed
         explored = 0
-        t0 = datetime.now()
-
-        while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
+        reached = 1
+
+        while buckets:
+            bucket = buckets.get(cursor)
+            if bucket is None:
+                cursor += 1
+                bucket = buckets.get(cursor)
+                if bucket is None:
+                    cursor = min(buckets)
+                    bucket = buckets[cursor]
+            node = bucket.pop()
+            if not bucket:
+                del buckets[cursor]
+            if closed[node] == gen:
                 continue
-            visited.add(node)
+            closed[node] = gen
             explored += 1
+            g = dist[node]
 
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                
-                # Clean path validation
-                clean_path = []
-                for pos in path:
-                    row, col = pos
-                    if (0 <= row < self.maze_gen.height and 
-                        0 <= col < self.maze_gen.width and 
-                        self.maze_gen.maze[row, col] == 0):
-                        clean_path.append(pos)
-                
-                if not clean_path:
-                    if enable_logging:
-                        self._log_error('INVALID_PATH_GHOST_AVOIDANCE', {'start': start, 'goal': goal, 'path': path, 'distance': g})
-                    self.last_run_stats = {
-                        'nodes_explored': explored,
-                        'computation_time_ms': dt_ms,
-                        'success': False,
-                    }
-                    return None, float('inf')
-                
-                if enable_logging:
-                    self._log_successful_path_avoidance(start, goal, clean_path, g, explored, dt_ms, ghost_positions)
-                self.last_run_stats = {
-                    'nodes_explored': explored,
-                    'computation_time_ms': dt_ms,
-                    'success': True,
-                }
-                return clean_path, len(clean_path) - 1
+            if node == target:
+                return graph.to_coords(buffers.trace(target)), g, explored, reached
 
-            if g > dist.get(node, float('inf')):
-                continue
+            if budget is not None and self._budget_spent(budget, explored):
+                self.last_partial = True
+                return graph.to_coords(buffers.trace(node)), g, explored, reached
 
-            for nb in self._get_valid_neighbors(node):
-                # Calculate move cost with ghost avoidance
-                base_cost = self._calculate_move_cost(node, nb)
-                ghost_penalty = self._calculate_ghost_penalty(nb, ghost_positions, avoidance_radius)
-                ng = g + base_cost + ghost_penalty
-                
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    prev[nb] = node
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
+            for nb in adjacency[node]:
+                if blocked and nb in blocked:
+                    continue
+                ng = g + (base_costs[nb] if base_costs is not None else 1)
+                if node_penalty is not None:
+                    ng += node_penalty[nb]
+                elif penalties:
+                    ng += penalties.get(nb, 0)
+                if seen[nb] != gen:
+                    seen[nb] = gen
+                    reached += 1
+                elif ng >= dist[nb]:
+                    continue
+                dist[nb] = ng
+                prev[nb] = node
+                if bounds is not None:
+                    f = ng + bounds[nb]
+                elif use_astar:
+                    f = ng + abs(rows[nb] - goal_row) + abs(cols[nb] - goal_col)
+                else:
+                    f = ng
+                nb_bucket = buckets.get(f)
+                if nb_bucket is None:
+                    buckets[f] = [nb]
+                else:
+                    nb_bucket.append(nb)
+
+        return None, float('inf'), explored, reached
+
+    def get_path_cache_stats(self):
+        """Hit / miss / suffix-reuse counters of the path cache."""
+        return self.path_cache.stats()
+
+    def get_flow_field(self, goal, obstacles=None):
+        """
+        Flow field toward goal with obstacles (bombs) as walls. Built once per
+        (maze, goal, bomb layout); a new bomb layout or level rebuilds it.
+        """
+        graph = self.maze_gen.get_graph()
+        key = (tuple(goal), PathCache.fingerprint(obstacles))
+        field = self.flow_fields.get(key)
+        if field is None or field.graph is not graph:
+            if len(self.flow_fields) >= 4 or any(f.graph is not graph for f in self.flow_fields.values()):
+                self.flow_fields.clear()
+            field = self.flow_fields[key] = FlowField(graph, goal, obstacles)
+        return field
+
+    def get_ghost_cost_layer(self, ghost_positions, avoidance_radius, multiplier=None, profile='quadratic'):
+        """
+        Ghost penalty raster for the current maze, shared by every search
+        issued with the same ghosts in this tick.
+        """
+        if multiplier is None:
+            multiplier = getattr(config, 'GHOST_PENALTY_MULTIPLIER', 10)
+        return self.cost_layers.get(self.maze_gen.get_graph(), ghost_positions,
+                                    avoidance_radius, multiplier, profile)
+
+    def _get_incremental_planner(self, graph):
+        """D* Lite planner for the current maze (state survives between auto-mode frames)."""
+        planner = self.incremental_planner
+        if planner is None or planner.graph is not graph:
+            planner = self.incremental_planner = DStarLite(graph)
+        return planner
 
-        if enable_logging:
-            self._log_error('GOAL_UNREACHABLE_GHOST_AVOIDANCE', {'start': start, 'goal': goal, 'nodes_explored': explored, 'ghost_positions': ghost_positions})
-        self.last_run_stats = {
-            'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
-            'success': False,
-        }
-        return None, float('inf')
+    @staticmethod
+    def _reconstruct_path(prev, goal):
+        """Walk the predecessor table back from goal and return start->goal node ids."""
+        path = []
+        node = goal
+        while node != -1:
+            path.append(node)
+            node = prev[node]
+        path.reverse()
+        return path
+
+    def _node_base_costs(self, graph):
+        """
+        Per-node base cost of entering each node, or None when every step costs 1.
+        Mirrors _calculate_move_cost (near-wall penalty only depends on the target cell).
+        """
+        if getattr(config, 'PURE_SHORTEST_PATH', True) or not getattr(config, 'USE_OBSTACLE_PENALTY', False):
+            return None
+        weight = getattr(config, 'NEAR_WALL_PENALTY', 0.1)
+        key = (graph, weight)
+        cached = getattr(self, '_base_cost_cache', None)
+        if cached is None or cached[0] != key:
+            costs = [1 + int(weight * cnt) for cnt in graph.wall_count_8().tolist()]
+            self._base_cost_cache = (key, costs)
+        return self._base_cost_cache[1]
+
+    def cost_model(self, unit_base=False):
+        """Empty CostModel over the current maze (stack layers, then pass it to shortest_path_with_cost_model)."""
+        return CostModel(self.maze_gen.get_graph(), unit_base)
+
+    @instrumented('dijkstra', 'cost_model', counter=_explored_total)
+    def shortest_path_with_cost_model(self, start, goal, model, kind=None, enable_logging=True, log_extra=None,
+                                      max_nodes=None, deadline_ns=None):
+        """
+        Shortest path under a CostModel (walls + blocked cells + summed penalties).
+        Every shortest_path_* variant is a thin wrapper around this.
+        """
+        return self._run_cost_model(start, goal, model, kind, enable_logging, log_extra,
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
 
-    def shortest_path_with_bomb_avoidance(self, start, goal, bomb_positions=None, cell_size=23, bomb_positions_are_grid=True, enable_logging=True):
-        """A*/Dijkstra on grid with bomb avoidance - bombs are treated as walls"""
+    def _run_cost_model(self, start, goal, model, kind=None, enable_logging=True, log_extra=None,
+                        incremental=False, clean=True, max_nodes=None, deadline_ns=None):
+        """
+        Shared body of the shortest_path_* variants: search, clean path,
+        logging, sampled verification and last_run_stats.
+
+        Args:
+            model: CostModel of the query
+            kind: log suffix ('GHOST_AVOIDANCE', 'BOMB_AVOIDANCE', ...); records
+                are SUCCESSFUL_PATH_<kind>, INVALID_PATH_<kind>, GOAL_UNREACHABLE_<kind>
+            log_extra: dict added to every log record of the query
+            incremental: run on the D* Lite planner (kept between frames) when
+                config.USE_INCREMENTAL_PLANNER allows and there is no budget
+            clean: drop the start cell from the path when it is blocked
+                (Pacman standing on a bomb), as the strict validation always did
+
+        Returns:
+            (path, distance) - distance is the step count. A search cut off by
+            its budget returns (partial path, inf) with last_run_stats
+            'success' False and 'partial' True: the path does not reach goal.
+        """
         self.last_run_stats = None
         if not self._validate_positions(start, goal):
             self.last_run_stats = {
@@ -206,392 +449,381 @@ class DijkstraAlgorithm:
             }
             return None, float('inf')
 
-        # Convert bomb positions to grid coordinates if needed
-        bomb_set = set()
-        if bomb_positions:
-            if bomb_positions_are_grid:
-                bomb_set = set(bomb_positions)
-            else:
-                for bomb in bomb_positions:
-                    bomb_x, bomb_y = bomb
-                    # Convert screen center to maze grid position
-                    col = round(bomb_x / cell_size - 0.5)
-                    row = round(bomb_y / cell_size - 0.5)
-                    if 0 <= row < self.maze_gen.height and 0 <= col < self.maze_gen.width:
-                        bomb_set.add((int(row), int(col)))
-        
-        # Debug output (disabled by default)
-        # if bomb_set and enable_logging:
-        #     print(f" Pathfinding from {start} to {goal} avoiding {len(bomb_set)} bombs: {list(bomb_set)[:3]}...")
-
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
-
-        dist = {start: 0}
-        visited = set()
-        prev = {start: None}
+        suffix = '_' + kind if kind else ''
+        log_extra = log_extra or {}
+        t0 = time.perf_counter_ns()
+        graph = model.graph
+        blocked = model.blocked
+        if incremental and getattr(config, 'USE_INCREMENTAL_PLANNER', True) \
+                and max_nodes is None and deadline_ns is None:
+            # D* Lite: giữ cây tìm kiếm giữa các frame, chỉ sửa phần bị ảnh hưởng
+            planner = self._get_incremental_planner(graph)
+            nodes, g = planner.plan(graph.node_id(start), graph.node_id(goal), blocked, model.penalties)
+            path = graph.to_coords(nodes) if nodes is not None else None
+            explored = planner.last_expanded
+            reachable = None
+            self.last_partial = False
+            self.nodes_explored_total += explored
+            self.last_engine = 'dstar_lite'
+        else:
+            path, g, explored, reachable = self._search(start, goal, blocked=blocked, cost_layer=model,
+                                                        unit_base=model.unit_base,
+                                                        max_nodes=max_nodes, deadline_ns=deadline_ns)
+        self.last_nodes_explored = explored  # Quick access
 
-        explored = 0
-        t0 = datetime.now()
+        if path is not None:
+            dt_ms = (time.perf_counter_ns() - t0) / 1e6
 
-        while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
-                continue
-            visited.add(node)
-            explored += 1
+            # The search never enters a wall or blocked cell: only the start can be one (standing on a bomb)
+            clean_path = path
+            if clean and blocked and graph.node_id(path[0]) in blocked:
+                clean_path = path[1:]
 
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                
-                # Strict validation: remove any wall or bomb positions from path
-                clean_path = []
-                for pos in path:
-                    row, col = pos
-                    if (0 <= row < self.maze_gen.height and 
-                        0 <= col < self.maze_gen.width and 
-                        self.maze_gen.maze[row, col] == 0 and  # Only open paths
-                        pos not in bomb_set):  # Avoid bombs
-                        clean_path.append(pos)
-                
-                if not clean_path:
-                    if enable_logging:
-                        self._log_error('INVALID_PATH_BOMB_AVOIDANCE', {'start': start, 'goal': goal, 'path': path, 'distance': g, 'bombs': list(bomb_set)})
-                    self.last_run_stats = {
-                        'nodes_explored': explored,
-                        'computation_time_ms': dt_ms,
-                        'success': False,
-                    }
-                    return None, float('inf')
-                
+            if not clean_path:
                 if enable_logging:
-                    self._log_successful_path_bomb_avoidance(start, goal, clean_path, g, explored, dt_ms, list(bomb_set))
+                    self._log_error('INVALID_PATH' + suffix,
+                                    dict(start=start, goal=goal, path=path, distance=g, **log_extra))
                 self.last_run_stats = {
                     'nodes_explored': explored,
+                    'engine': self.last_engine,
                     'computation_time_ms': dt_ms,
-                    'success': True,
+                    'success': False,
                 }
-                return clean_path, len(clean_path) - 1  # Return step count as distance
+                return None, float('inf')
 
-            if g > dist.get(node, float('inf')):
-                continue
+            if self.last_partial:
+                # Budget ran out: the path ends at a frontier node, not at goal
+                if enable_logging:
+                    self._record_path('PARTIAL_PATH' + suffix, start, goal, clean_path, g, explored, dt_ms,
+                                      **log_extra)
+                self.last_run_stats = {
+                    'nodes_explored': explored,
+                    'engine': self.last_engine,
+                    'computation_time_ms': dt_ms,
+                    'success': False,
+                    'partial': True,
+                }
+                return clean_path, float('inf')
 
-            for nb in self._get_valid_neighbors_with_bomb_avoidance(node, bomb_set):
-                ng = g + self._calculate_move_cost(node, nb)
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    prev[nb] = node
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
+            if enable_logging:
+                self._record_path('SUCCESSFUL_PATH' + suffix, start, goal, clean_path, g, explored, dt_ms,
+                                  **log_extra)
+            if not model.penalties:
+                self._submit_for_verification(path, blocked, 'SUCCESSFUL_PATH' + suffix, unit_cost=model.unit_base)
+            self.last_run_stats = {
+                'nodes_explored': explored,
+                'engine': self.last_engine,
+                'computation_time_ms': dt_ms,
+                'success': True,
+                'partial': False,
+            }
+            return clean_path, len(clean_path) - 1  # Return step count as distance
 
         if enable_logging:
-            self._log_error('GOAL_UNREACHABLE_BOMB_AVOIDANCE', {'start': start, 'goal': goal, 'nodes_explored': explored, 'bombs': list(bomb_set)})
+            error = dict(start=start, goal=goal, nodes_explored=explored, **log_extra)
+            if reachable is not None:
+                error['reachable_positions'] = reachable
+            self._log_error('GOAL_UNREACHABLE' + suffix, error)
         self.last_run_stats = {
             'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
+            'engine': self.last_engine,
+            'computation_time_ms': (time.perf_counter_ns() - t0) / 1e6,
             'success': False,
         }
         return None, float('inf')
 
-    def shortest_path_with_bomb_penalty(self, start, goal, bomb_positions=None, bomb_penalty=50, enable_logging=True):
-        """A*/Dijkstra with bomb penalty instead of complete avoidance"""
-        self.last_run_stats = None
-        if not self._validate_positions(start, goal):
-            self.last_run_stats = {
-                'nodes_explored': 0,
-                'computation_time_ms': 0.0,
-                'success': False,
-            }
-            return None, float('inf')
-
-        # Convert bomb positions to set for fast lookup
-        bomb_set = set()
-        if bomb_positions:
-            bomb_set = set(bomb_positions)
+    @instrumented('dijkstra', 'shortest_path', counter=_explored_total)
+    def shortest_path(self, start, goal, enable_logging=True, max_nodes=None, deadline_ns=None):
+        """
+        A*/Dijkstra on grid; enforces no-wall moves and shortest path cost.
+        max_nodes / deadline_ns (absolute perf_counter_ns) bound the search; a
+        cut-off search returns (partial path, inf), flagged in last_run_stats['partial'].
+        """
+        return self._run_cost_model(start, goal, self.cost_model(), enable_logging=enable_logging,
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
 
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
+    @instrumented('dijkstra', 'batch', counter=_explored_total)
+    def shortest_paths_many(self, starts, goals, obstacles=None, ghost_positions=None, avoidance_radius=4):
+        """
+        Batch of independent point-to-point queries issued in the same frame.
 
-        dist = {start: 0}
-        visited = set()
-        prev = {start: None}
+        Queries are grouped by start; each group shares one search tree that
+        stops once all of its goals are settled. A start with a single goal
+        goes through _search (path cache, fast engines).
 
-        explored = 0
-        t0 = datetime.now()
+        Args:
+            starts, goals: sequences of (row, col) of equal length
+            obstacles: cells treated as walls for every query (bombs)
+            ghost_positions: same ghost penalty as shortest_path_with_ghost_avoidance
+                with avoidance_radius (None = plain shortest path)
 
-        while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
+        Returns:
+            list of (path, distance, stats) in input order; distance is the
+            step count like the shortest_path_* variants
+        """
+        graph = self.maze_gen.get_graph()
+        layer = self.get_ghost_cost_layer(ghost_positions, avoidance_radius) if ghost_positions else None
+        model = self.cost_model().block(obstacles).add_layer(layer)
+        blocked = model.blocked
+
+        results = [None] * len(starts)
+        groups = {}
+        for i, (start, goal) in enumerate(zip(starts, goals)):
+            start, goal = tuple(start), tuple(goal)
+            if not self._validate_positions(start, goal):
+                results[i] = (None, float('inf'), {'nodes_explored': 0, 'computation_time_ms': 0.0,
+                                                   'shared_by': 0, 'success': False})
                 continue
-            visited.add(node)
-            explored += 1
+            groups.setdefault(start, []).append((i, goal))
 
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                
-                # Clean path validation
-                clean_path = []
-                for pos in path:
-                    row, col = pos
-                    if (0 <= row < self.maze_gen.height and 
-                        0 <= col < self.maze_gen.width and 
-                        self.maze_gen.maze[row, col] == 0):
-                        clean_path.append(pos)
-                
-                if not clean_path:
-                    if enable_logging:
-                        self._log_error('INVALID_PATH_BOMB_PENALTY', {'start': start, 'goal': goal, 'path': path, 'distance': g})
-                    self.last_run_stats = {
-                        'nodes_explored': explored,
-                        'computation_time_ms': dt_ms,
-                        'success': False,
-                    }
-                    return None, float('inf')
-                
-                if enable_logging:
-                    self._log_successful_path_bomb_penalty(start, goal, clean_path, g, explored, dt_ms, list(bomb_set))
-                self.last_run_stats = {
+        t0 = time.perf_counter_ns()
+        searches = 0
+        total_explored = 0
+        for start, queries in groups.items():
+            t_group = time.perf_counter_ns()
+            searches += 1
+            if len(queries) == 1:
+                i, goal = queries[0]
+                path, _, explored, _ = self._search(start, goal, blocked=blocked, cost_layer=model)
+                found = [(i, path)]
+            else:
+                source = graph.node_id(start)
+                _, prev, explored = self._search_tree(
+                    source, model if model.penalties else None, blocked, targets=[graph.node_id(goal) for _, goal in queries]
+                )
+                found = []
+                for i, goal in queries:
+                    target = graph.node_id(goal)
+                    path = graph.to_coords(self._reconstruct_path(prev, target)) if target in prev else None
+                    found.append((i, path))
+
+            total_explored += explored
+            dt_ms = (time.perf_counter_ns() - t_group) / 1e6
+            for i, path in found:
+                stats = {
                     'nodes_explored': explored,
                     'computation_time_ms': dt_ms,
-                    'success': True,
+                    'shared_by': len(queries),
+                    'success': path is not None,
                 }
-                return clean_path, len(clean_path) - 1
-
-            if g > dist.get(node, float('inf')):
-                continue
+                results[i] = (path, len(path) - 1, stats) if path is not None else (None, float('inf'), stats)
 
-            for nb in self._get_valid_neighbors(node):
-                # Calculate move cost with bomb penalty
-                base_cost = self._calculate_move_cost(node, nb)
-                bomb_cost = bomb_penalty if nb in bomb_set else 0
-                ng = g + base_cost + bomb_cost
-                
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    prev[nb] = node
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
-
-        if enable_logging:
-            self._log_error('GOAL_UNREACHABLE_BOMB_PENALTY', {'start': start, 'goal': goal, 'nodes_explored': explored, 'bombs': list(bomb_set)})
         self.last_run_stats = {
-            'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
-            'success': False,
+            'queries': len(starts),
+            'searches_run': searches,
+            'nodes_explored': total_explored,
+            'computation_time_ms': (time.perf_counter_ns() - t0) / 1e6,
+            'success': any(path is not None for path, _, _ in results),
         }
-        return None, float('inf')
+        return results
 
-    def shortest_path_with_bomb_radius_avoidance(self, start, goal, bomb_positions=None, avoidance_radius=2, enable_logging=True):
-        """A*/Dijkstra with bomb avoidance radius - penalizes positions near bombs"""
+    @instrumented('dijkstra', 'anytime', counter=_explored_total)
+    def shortest_path_anytime(self, start, goal, obstacles=None, ghost_positions=None, avoidance_radius=3,
+                              max_nodes=None, deadline_ns=None):
+        """
+        ARA*-style anytime search for per-frame budgets.
+
+        The first call publishes a weighted-A* path (cost within epsilon of the
+        optimum); repeated calls with the same query keep refining it with a
+        lower epsilon until it is optimal. A new start, goal, obstacle set or
+        ghost layer starts a new search. Until a first path exists, the path
+        to the most promising frontier node is returned, flagged as partial.
+
+        Returns:
+            (path, distance) like the other variants ((partial path, inf) when
+            no path to goal is known yet); last_run_stats carries 'epsilon',
+            'optimal' and 'partial'
+        """
         self.last_run_stats = None
         if not self._validate_positions(start, goal):
-            self.last_run_stats = {
-                'nodes_explored': 0,
-                'computation_time_ms': 0.0,
-                'success': False,
-            }
             return None, float('inf')
 
-        # Create bomb danger zones
-        danger_zones = {}
-        if bomb_positions:
-            for bomb in bomb_positions:
-                bomb_row, bomb_col = bomb
-                for dr in range(-avoidance_radius, avoidance_radius + 1):
-                    for dc in range(-avoidance_radius, avoidance_radius + 1):
-                        r, c = bomb_row + dr, bomb_col + dc
-                        if (0 <= r < self.maze_gen.height and 
-                            0 <= c < self.maze_gen.width and
-                            self.maze_gen.maze[r, c] == 0):  # Only penalize valid paths
-                            distance = abs(dr) + abs(dc)
-                            if distance <= avoidance_radius and distance > 0:  # Don't penalize bomb itself if it's a wall
-                                penalty = max(1, avoidance_radius - distance + 1) * 10  # Higher penalty closer to bomb
-                                danger_zones[(r, c)] = penalty
-
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
-
-        dist = {start: 0}
-        visited = set()
-        prev = {start: None}
-
-        explored = 0
-        t0 = datetime.now()
-
-        while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
-                continue
-            visited.add(node)
-            explored += 1
-
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                
-                # Clean path validation
-                clean_path = []
-                for pos in path:
-                    row, col = pos
-                    if (0 <= row < self.maze_gen.height and 
-                        0 <= col < self.maze_gen.width and 
-                        self.maze_gen.maze[row, col] == 0):
-                        clean_path.append(pos)
-                
-                if not clean_path:
-                    if enable_logging:
-                        self._log_error('INVALID_PATH_BOMB_RADIUS', {'start': start, 'goal': goal, 'path': path, 'distance': g})
-                    self.last_run_stats = {
-                        'nodes_explored': explored,
-                        'computation_time_ms': dt_ms,
-                        'success': False,
-                    }
-                    return None, float('inf')
-                
-                if enable_logging:
-                    self._log_successful_path_bomb_radius(start, goal, clean_path, g, explored, dt_ms, list(bomb_positions) if bomb_positions else [])
-                self.last_run_stats = {
-                    'nodes_explored': explored,
-                    'computation_time_ms': dt_ms,
-                    'success': True,
-                }
-                return clean_path, len(clean_path) - 1
-
-            if g > dist.get(node, float('inf')):
-                continue
-
-            for nb in self._get_valid_neighbors(node):
-                # Calculate move cost with bomb radius penalty
-                base_cost = self._calculate_move_cost(node, nb)
-                danger_penalty = danger_zones.get(nb, 0)
-                ng = g + base_cost + danger_penalty
-                
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    prev[nb] = node
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
+        t0 = time.perf_counter_ns()
+        graph = self.maze_gen.get_graph()
+        source, target = graph.node_id(start), graph.node_id(goal)
+        layer = self.get_ghost_cost_layer(ghost_positions, avoidance_radius) if ghost_positions else None
+        model = self.cost_model().block(obstacles).add_layer(layer)
+        blocked = model.blocked
+        key = (graph, source, target, PathCache.fingerprint(blocked), layer if model.penalties else None)
+
+        search = self.anytime_search
+        if search is None or search.key != key:
+            search = self.anytime_search = AnytimeSearch(
+                graph, source, target, self._goal_bounds(graph, target), blocked, model.node_penalty,
+                epsilon=getattr(config, 'ANYTIME_INITIAL_EPSILON', 2.5),
+                epsilon_step=getattr(config, 'ANYTIME_EPSILON_STEP', 0.5),
+                key=key,
+            )
 
-        if enable_logging:
-            self._log_error('GOAL_UNREACHABLE_BOMB_RADIUS', {'start': start, 'goal': goal, 'nodes_explored': explored, 'bombs': list(bomb_positions) if bomb_positions else []})
+        explored = search.run(max_nodes, deadline_ns)
+        self.nodes_explored_total += explored
+        self.last_engine = 'ara'
+        nodes = search.path
+        partial = nodes is None and not search.done
+        if partial:
+            nodes = search.partial_path()
+        self.last_partial = partial
         self.last_run_stats = {
             'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
-            'success': False,
+            'engine': self.last_engine,
+            'computation_time_ms': (time.perf_counter_ns() - t0) / 1e6,
+            'success': nodes is not None and not partial,
+            'partial': partial,
+            'epsilon': search.epsilon,
+            'optimal': search.done and search.path is not None,
         }
-        return None, float('inf')
-
-    def shortest_path_with_ghost_and_bomb_avoidance(self, start, goal, ghost_positions, bomb_positions, avoidance_radius=5, enable_logging=False):
+        if nodes is None:
+            return None, float('inf')
+        path = graph.to_coords(nodes)
+        if partial:
+            return path, float('inf')  # Ends at a frontier node, not at goal
+        return path, len(path) - 1
+
+    def _goal_bounds(self, graph, target):
+        """Consistent lower bound to target per node id: ALT landmarks when A* is on, else Manhattan."""
+        landmarks = self.maze_gen.get_landmarks() if getattr(config, 'USE_ASTAR', False) else None
+        if landmarks is not None:
+            return landmarks.bounds_to(target)
+        rows, cols = graph.rows, graph.cols
+        return [abs(rows[n] - rows[target]) + abs(cols[n] - cols[target]) for n in range(graph.num_nodes)]
+
+    @instrumented('dijkstra', 'space_time', counter=_explored_total)
+    def shortest_path_space_time(self, start, goal, ghosts, bomb_positions=None, avoidance_radius=0,
+                                 horizon=None, margin=None, allow_wait=True, enable_logging=False, max_nodes=None):
         """
-        CRITICAL: Path tránh CẢ bomb (as walls) VÀ ghost (penalty-based)
-        - Bomb: Coi như tường, KHÔNG BAO GIỜ đi qua
-        - Ghost: Thêm penalty cao cho các cell gần ghost
+        Space-time A* (cell, t) against predicted ghost trajectories.
+
+        Args:
+            ghosts: dicts with 'pos' (row, col) and 'direction' [dx, dy] of the
+                dangerous ghosts (see space_time_search.ReservationTable)
+            bomb_positions: cells treated as walls
+            avoidance_radius: also add the static ghost penalty raster of
+                shortest_path_with_ghost_and_bomb_avoidance (0 = hard constraints only)
+            horizon / margin: Pacman steps simulated and cells kept around a
+                predicted ghost (config.SPACE_TIME_HORIZON / SPACE_TIME_MARGIN)
+            allow_wait: the path may stand still for a step (a repeated cell);
+                False also forbids revisiting a cell, so the path is simple
+
+        Returns:
+            (path, distance) - distance is the number of steps (waits included)
         """
         self.last_run_stats = None
         if not self._validate_positions(start, goal):
             return None, float('inf')
-        
-        # Convert bombs to set for fast lookup
-        bomb_set = set()
-        if bomb_positions:
-            if isinstance(bomb_positions, set):
-                bomb_set = bomb_positions
-            else:
-                bomb_set = set(bomb_positions)
-        
-        # Build ghost penalty map
-        ghost_penalty_map = {}
-        if ghost_positions:
-            for ghost_pos in ghost_positions:
-                gr, gc = ghost_pos
-                # Add penalty in radius around ghost
-                for dr in range(-avoidance_radius, avoidance_radius + 1):
-                    for dc in range(-avoidance_radius, avoidance_radius + 1):
-                        check_r = gr + dr
-                        check_c = gc + dc
-                        if 0 <= check_r < self.maze_gen.height and 0 <= check_c < self.maze_gen.width:
-                            manhattan_dist = abs(dr) + abs(dc)
-                            if manhattan_dist <= avoidance_radius and manhattan_dist > 0:
-                                penalty = int(100 * (avoidance_radius - manhattan_dist + 1) / avoidance_radius)
-                                check_pos = (check_r, check_c)
-                                if check_pos not in ghost_penalty_map:
-                                    ghost_penalty_map[check_pos] = penalty
-                                else:
-                                    ghost_penalty_map[check_pos] = max(ghost_penalty_map[check_pos], penalty)
-        
-        # A* pathfinding
-        pq = []
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
-        
-        dist = {start: 0}
-        visited = set()
-        explored = 0
-        t0 = datetime.now()
-        
-        while pq:
-            f, g, node, path = heapq.heappop(pq)
-            if node in visited:
-                continue
-            visited.add(node)
-            explored += 1
-            
-            if node == goal:
-                dt_ms = (datetime.now() - t0).total_seconds() * 1000
-                self.last_run_stats = {
-                    'nodes_explored': explored,
-                    'computation_time_ms': dt_ms,
-                    'success': True,
-                }
-                return path, len(path) - 1
-            
-            if g > dist.get(node, float('inf')):
-                continue
-            
-            # Get neighbors avoiding bombs
-            for nb in self._get_valid_neighbors_with_bomb_avoidance(node, bomb_set):
-                # Base cost + ghost penalty
-                base_cost = 1
-                ghost_penalty = ghost_penalty_map.get(nb, 0)
-                ng = g + base_cost + ghost_penalty
-                
-                if ng < dist.get(nb, float('inf')):
-                    dist[nb] = ng
-                    npath = path + [nb]
-                    nf = ng + (self._heuristic(nb, goal) if getattr(config, 'USE_ASTAR', False) else 0)
-                    heapq.heappush(pq, (nf, ng, nb, npath))
-        
-        # No path found
-        self.last_run_stats = {
-            'nodes_explored': explored,
-            'computation_time_ms': (datetime.now() - t0).total_seconds() * 1000,
-            'success': False,
-        }
-        return None, float('inf')
 
-    def _log_successful_path_bomb_radius(self, start, goal, path, distance, explored, dt_ms, bomb_positions):
-        """Log successful path with bomb radius avoidance"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'session_id': self.session_id,
-            'algorithm': 'Dijkstra_with_Bomb_Radius',
-            'start': start,
-            'goal': goal,
-            'path': path,
-            'distance': distance,
+        t0 = time.perf_counter_ns()
+        graph = self.maze_gen.get_graph()
+        if horizon is None:
+            horizon = getattr(config, 'SPACE_TIME_HORIZON', 12)
+        if margin is None:
+            margin = getattr(config, 'SPACE_TIME_MARGIN', 1)
+        speed_ratio = getattr(config, 'GHOST_SPEED', 3.0) / getattr(config, 'PACMAN_SPEED', 4.0)
+
+        model = self.cost_model(unit_base=True).block(bomb_positions)
+        if avoidance_radius > 0:
+            model.add_layer(self.get_ghost_cost_layer([g['pos'] for g in ghosts], avoidance_radius,
+                                                      multiplier=100, profile='linear'))
+        table = ReservationTable.from_ghosts(graph, ghosts, horizon, margin, speed_ratio)
+        target = graph.node_id(goal)
+        nodes, cost, explored = space_time_astar(
+            graph, graph.node_id(start), target, table, self._goal_bounds(graph, target),
+            model.blocked, model.node_penalty, allow_wait, max_nodes,
+        )
+        self.nodes_explored_total += explored
+        self.last_nodes_explored = explored
+        self.last_partial = False
+        self.last_engine = 'space_time'
+        dt_ms = (time.perf_counter_ns() - t0) / 1e6
+        self.last_run_stats = {
             'nodes_explored': explored,
+            'engine': self.last_engine,
             'computation_time_ms': dt_ms,
-            'bomb_positions': bomb_positions,
-            'success': True
+            'success': nodes is not None,
+            'horizon': horizon,
+            'waits': sum(1 for a, b in zip(nodes, nodes[1:]) if a == b) if nodes else 0,
         }
-        self.log_data.append(log_entry)
-        self.run_history.append(log_entry)
+        if nodes is None:
+            if enable_logging:
+                self._log_error('GOAL_UNREACHABLE_SPACE_TIME', {'start': start, 'goal': goal,
+                                                                'nodes_explored': explored, 'horizon': horizon})
+            return None, float('inf')
 
+        path = graph.to_coords(nodes)
+        if enable_logging:
+            self._record_path('SUCCESSFUL_PATH_SPACE_TIME', start, goal, path, cost, explored, dt_ms,
+                              ghost_positions=[g['pos'] for g in ghosts])
+        return path, len(path) - 1
+
+    @instrumented('dijkstra', 'ghost_avoidance', counter=_explored_total)
+    def shortest_path_with_ghost_avoidance(self, start, goal, ghost_positions, avoidance_radius=3, enable_logging=True,
+                                           max_nodes=None, deadline_ns=None):
+        """A*/Dijkstra with dynamic ghost avoidance - dual algorithm approach"""
+        # Move cost with ghost avoidance: penalty raster built once per tick
+        model = self.cost_model().add_layer(self.get_ghost_cost_layer(ghost_positions, avoidance_radius))
+        return self._run_cost_model(start, goal, model, 'GHOST_AVOIDANCE', enable_logging,
+                                    {'ghost_positions': ghost_positions},
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
+
+    @instrumented('dijkstra', 'bomb_avoidance', counter=_explored_total)
+    def shortest_path_with_bomb_avoidance(self, start, goal, bomb_positions=None, cell_size=23, bomb_positions_are_grid=True, enable_logging=True,
+                                          max_nodes=None, deadline_ns=None):
+        """A*/Dijkstra on grid with bomb avoidance - bombs are treated as walls"""
+        # Convert bomb positions to grid coordinates if needed
+        bomb_set = set()
+        if bomb_positions:
+            if bomb_positions_are_grid:
+                bomb_set = set(bomb_positions)
+            else:
+                for bomb in bomb_positions:
+                    bomb_x, bomb_y = bomb
+                    # Convert screen center to maze grid position
+                    col = round(bomb_x / cell_size - 0.5)
+                    row = round(bomb_y / cell_size - 0.5)
+                    if 0 <= row < self.maze_gen.height and 0 <= col < self.maze_gen.width:
+                        bomb_set.add((int(row), int(col)))
+
+        model = self.cost_model().block(bomb_set)
+        return self._run_cost_model(start, goal, model, 'BOMB_AVOIDANCE', enable_logging,
+                                    {'bomb_positions': list(bomb_set)},
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
+
+    @instrumented('dijkstra', 'bomb_penalty', counter=_explored_total)
+    def shortest_path_with_bomb_penalty(self, start, goal, bomb_positions=None, bomb_penalty=50, enable_logging=True,
+                                        max_nodes=None, deadline_ns=None):
+        """A*/Dijkstra with bomb penalty instead of complete avoidance"""
+        bomb_set = set(bomb_positions) if bomb_positions else set()
+        model = self.cost_model().add_penalty(bomb_set, bomb_penalty)
+        return self._run_cost_model(start, goal, model, 'BOMB_PENALTY', enable_logging,
+                                    {'bomb_positions': list(bomb_set)},
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
+
+    @instrumented('dijkstra', 'bomb_radius', counter=_explored_total)
+    def shortest_path_with_bomb_radius_avoidance(self, start, goal, bomb_positions=None, avoidance_radius=2, enable_logging=True,
+                                                 max_nodes=None, deadline_ns=None):
+        """A*/Dijkstra with bomb avoidance radius - penalizes positions near bombs"""
+        # Bomb danger zones: 10 per step of closeness to the nearest bomb (the bomb cell itself is free)
+        layer = self.cost_layers.get(self.maze_gen.get_graph(), bomb_positions, avoidance_radius, 10, 'stepped')
+        model = self.cost_model().add_layer(layer)
+        return self._run_cost_model(start, goal, model, 'BOMB_RADIUS', enable_logging,
+                                    {'bomb_positions': list(bomb_positions) if bomb_positions else []},
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
+
+    @instrumented('dijkstra', 'ghost_and_bomb', counter=_explored_total)
+    def shortest_path_with_ghost_and_bomb_avoidance(self, start, goal, ghost_positions, bomb_positions, avoidance_radius=5, enable_logging=False,
+                                                    max_nodes=None, deadline_ns=None):
+        """
+        CRITICAL: Path tránh CẢ bomb (as walls) VÀ ghost (penalty-based)
+        - Bomb: Coi như tường, KHÔNG BAO GIỜ đi qua
+        - Ghost: Thêm penalty cao cho các cell gần ghost
+        """
+        # Ghost penalty raster (peak 100 next to a ghost, the ghost cell itself is free)
+        layer = self.get_ghost_cost_layer(ghost_positions, avoidance_radius, multiplier=100, profile='linear')
+        model = self.cost_model(unit_base=True).block(bomb_positions).add_layer(layer)
+        return self._run_cost_model(start, goal, model, 'GHOST_AND_BOMB', enable_logging,
+                                    {'ghost_positions': ghost_positions}, incremental=True, clean=False,
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
+
+    @instrumented('dijkstra', 'multi_objective', counter=_explored_total)
     def shortest_path_with_multi_objectives(self, start, objectives, ghost_positions, 
                                                    ghost_velocities=None, power_pellet_positions=None, 
                                                    dots_positions=None, exit_gate=None, enable_logging=True):
@@ -616,8 +848,22 @@ class DijkstraAlgorithm:
         best_score = float('-inf')
         chosen_objective = None
         
-        t0 = datetime.now()
-        total_explored = 0
+        t0 = time.perf_counter_ns()
+        explored_before = self.nodes_explored_total
+        search_stats = {}
+        
+        if getattr(config, 'MULTI_OBJECTIVE_SINGLE_PASS', True):
+            # Một cây Dijkstra cho mỗi cost model, chấm điểm mọi objective từ đó
+            candidates, _, search_stats = self._score_objectives_single_pass(
+                start, prioritized_objectives, ghost_positions
+            )
+            prioritized_objectives = []
+            for candidate in candidates:
+                obj_type, target, best_strategy_path, best_strategy_score = candidate
+                if best_strategy_path and best_strategy_score > best_score:
+                    best_path = best_strategy_path
+                    best_score = best_strategy_score
+                    chosen_objective = (obj_type, target)
         
         # Try each objective with different strategies
         for obj_type, target, priority_weight in prioritized_objectives:
@@ -648,7 +894,8 @@ class DijkstraAlgorithm:
                 best_score = best_strategy_score
                 chosen_objective = (obj_type, target)
         
-        dt_ms = (datetime.now() - t0).total_seconds() * 1000
+        dt_ms = (time.perf_counter_ns() - t0) / 1e6
+        total_explored = self.nodes_explored_total - explored_before  # Single pass và từng strategy
         
         if best_path:
             if enable_logging:
@@ -662,6 +909,7 @@ class DijkstraAlgorithm:
                 'strategy_used': 'multi_objective',
                 'chosen_objective': chosen_objective
             }
+            self.last_run_stats.update(search_stats)
             return best_path, len(best_path) - 1
         
         if enable_logging:
@@ -674,8 +922,181 @@ class DijkstraAlgorithm:
             'computation_time_ms': dt_ms,
             'success': False,
         }
+        self.last_run_stats.update(search_stats)
         return None, float('inf')
 
+    def _score_objectives_single_pass(self, start, prioritized_objectives, ghost_positions):
+        """
+        Score every objective from one-to-all Dijkstra trees instead of
+        running each strategy once per objective.
+
+        ghost_avoidance and tactical_detour share one cost model (radius 5);
+        emergency_escape needs a tree from start (radius 6) plus one from each
+        safe zone (radius 4), only when a ghost is within 3 cells.
+
+        Returns:
+            (candidates, explored, stats) - candidates are
+            (obj_type, target, best path, best score) per objective
+        """
+        graph = self.maze_gen.get_graph()
+        source = graph.node_id(start)
+        searches = 0
+        explored = 0
+
+        def tree_path(prev, node):
+            return graph.to_coords(self._reconstruct_path(prev, node)) if node in prev else None
+
+        # Strategy 1 + 2: direct ghost-avoidance tree
+        _, direct_prev, n = self._search_tree(source, self.get_ghost_cost_layer(ghost_positions, 5))
+        searches += 1
+        explored += n
+
+        # Strategy 3: start -> safe zone -> objective, only when in immediate danger
+        escape_legs = []  # (path to safe zone, prev tree from safe zone)
+        in_danger = bool(ghost_positions) and min(
+            self._manhattan_distance(start, ghost_pos) for ghost_pos in ghost_positions) <= 3
+        safe_positions = self._find_safe_zones(start, ghost_positions)[:3] if in_danger else []
+        if safe_positions:
+            _, escape_prev, n = self._search_tree(source, self.get_ghost_cost_layer(ghost_positions, 6))
+            searches += 1
+            explored += n
+            layer = self.get_ghost_cost_layer(ghost_positions, 4)
+            for safe_pos in safe_positions:
+                path1 = tree_path(escape_prev, graph.node_id(safe_pos)) if safe_pos != start else None
+                if path1 is None:
+                    continue
+                _, safe_prev, n = self._search_tree(graph.node_id(safe_pos), layer)
+                searches += 1
+                explored += n
+                escape_legs.append((safe_pos, path1, safe_prev))
+
+        candidates = []
+        for obj_type, target, priority_weight in prioritized_objectives:
+            target_node = graph.node_id(target)
+            if target_node < 0 or target == start:
+                candidates.append((obj_type, target, None, float('-inf')))
+                continue
+
+            # Same scoring as _ghost_avoidance_strategy
+            direct_path = tree_path(direct_prev, target_node)
+            direct_score = float('-inf')
+            if direct_path:
+                cost = len(direct_path) - 1
+                direct_score = priority_weight + self._calculate_path_safety(direct_path, ghost_positions) * 10 - cost * 0.5
+
+            # Same scoring as _emergency_escape_strategy
+            escape_path, escape_score = direct_path, direct_score
+            if safe_positions:
+                escape_path, escape_score = None, float('-inf')
+                for safe_pos, path1, safe_prev in escape_legs:
+                    path2 = tree_path(safe_prev, target_node) if safe_pos != target else None
+                    if not path2:
+                        continue
+                    full_path = path1 + path2[1:]
+                    total_cost = (len(path1) - 1) + (len(path2) - 1)
+                    score = priority_weight + self._calculate_path_safety(full_path, ghost_positions) * 20 - total_cost * 0.3
+                    if score > escape_score:
+                        escape_path, escape_score = full_path, score
+
+            best_strategy_path, best_strategy_score = max(
+                [(direct_path, direct_score), (escape_path, escape_score)],
+                key=lambda x: x[1] if x[0] else float('-inf')
+            )
+            candidates.append((obj_type, target, best_strategy_path, best_strategy_score))
+
+        # Per-objective strategy searches: 2 direct + 1 (or 2 per safe zone in an emergency)
+        per_objective = 2 + (2 * len(safe_positions) if safe_positions else 1)
+        legacy_searches = per_objective * len(prioritized_objectives)
+        stats = {
+            'searches_run': searches,
+            'searches_saved': max(0, legacy_searches - searches),
+        }
+        return candidates, explored, stats
+
+    def _search_tree(self, source, cost_layer=None, blocked=None, targets=None):
+        """
+        One-to-all Dijkstra from a node id with the same step cost as
+        shortest_path_with_ghost_avoidance (near-wall base cost + layer penalty).
+
+        Args:
+            blocked: set of node ids treated as walls
+            targets: stop once every one of these node ids is settled
+
+        Returns:
+            (dist, prev, explored) keyed by node id
+        """
+        graph = self.maze_gen.get_graph()
+        adjacency = graph.adjacency
+        base_costs = self._node_base_costs(graph)
+        node_penalty = cost_layer.node_penalty if cost_layer is not None else None
+        if source < 0:
+            return {}, {}, 0
+        remaining = set(targets) if targets is not None else None
+        dist = {source: 0}
+        prev = {source: -1}
+        explored = 0
+        if self._bucket_queue_step(base_costs, None, cost_layer, node_penalty):
+            # Integer costs: Dial's bucket queue keyed by g (see _bucket_kernel)
+            buckets = {0: [source]}
+            g = 0
+            while buckets:
+                bucket = buckets.get(g)
+                if bucket is None:
+                    g += 1
+                    bucket = buckets.get(g)
+                    if bucket is None:
+                        g = min(buckets)
+                        bucket = buckets[g]
+                node = bucket.pop()
+                if not bucket:
+                    del buckets[g]
+                if g > dist[node]:
+                    continue
+                explored += 1
+                if remaining is not None:
+                    remaining.discard(node)
+                    if not remaining:
+                        break
+                for nb in adjacency[node]:
+                    if blocked and nb in blocked:
+                        continue
+                    ng = g + (base_costs[nb] if base_costs is not None else 1)
+                    if node_penalty is not None:
+                        ng += node_penalty[nb]
+                    if ng < dist.get(nb, float('inf')):
+                        dist[nb] = ng
+                        prev[nb] = node
+                        nb_bucket = buckets.get(ng)
+                        if nb_bucket is None:
+                            buckets[ng] = [nb]
+                        else:
+                            nb_bucket.append(nb)
+            self.nodes_explored_total += explored
+            return dist, prev, explored
+
+        pq = [(0, source)]
+        while pq:
+            g, node = heapq.heappop(pq)
+            if g > dist[node]:
+                continue
+            explored += 1
+            if remaining is not None:
+                remaining.discard(node)
+                if not remaining:
+                    break
+            for nb in adjacency[node]:
+                if blocked and nb in blocked:
+                    continue
+                ng = g + (base_costs[nb] if base_costs is not None else 1)
+                if node_penalty is not None:
+                    ng += node_penalty[nb]
+                if ng < dist.get(nb, float('inf')):
+                    dist[nb] = ng
+                    prev[nb] = node
+                    heapq.heappush(pq, (ng, nb))
+        self.nodes_explored_total += explored
+        return dist, prev, explored
+
     def _update_ghost_memory(self, ghost_positions, ghost_velocities=None):
         """Update ghost movement patterns and prediction memory"""
         current_time = datetime.now()
@@ -1038,9 +1459,6 @@ class DijkstraAlgorithm:
         }
         
         self.run_history.append(log_entry)
-        
-        if len(self.run_history) > 100:
-            self.run_history = self.run_history[-100:]
 
     def _manhattan_distance(self, pos1, pos2):
         """Calculate Manhattan distance between two positions"""
@@ -1062,59 +1480,67 @@ class DijkstraAlgorithm:
         if min_distance <= avoidance_radius:
             # Exponential penalty for being close to ghosts
             # Closer = higher penalty
-            penalty = (avoidance_radius - min_distance + 1) ** 2 * 10
+            penalty = (avoidance_radius - min_distance + 1) ** 2 * getattr(config, 'GHOST_PENALTY_MULTIPLIER', 10)
             return penalty
         
         return 0
 
-    def _log_successful_path_avoidance(self, start, goal, path, distance, nodes_explored, computation_time, ghost_positions):
-        """Log successful path with ghost avoidance"""
-        entry = {
-            'session_id': self.session_id,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'SUCCESSFUL_PATH_GHOST_AVOIDANCE',
-            'maze_info': {
-                'size': f"{self.maze_gen.height}x{self.maze_gen.width}",
-                'maze_hash': self._get_maze_hash(),
-            },
-            'path_info': {
-                'start': start,
-                'goal': goal,
-                'path': path,
-                'distance': distance,
-                'path_length': len(path),
-                'nodes_explored': nodes_explored,
-                'computation_time_ms': computation_time,
-                'efficiency': len(path) / nodes_explored if nodes_explored > 0 else 0,
-                'ghost_positions': ghost_positions,
-            },
-            'validation': {
-                'path_valid': self._validate_path(path),
-                'no_wall_crossing': True,
-                'optimal_path': True,
-                'ghost_avoidance': True,
-            },
-        }
-        self.log_data.append(entry)
-
+    @instrumented('dijkstra', 'all_shortest_paths', counter=_explored_total, success=lambda r: bool(r[0]))
     def get_all_shortest_paths(self, start):
-        if not self._validate_positions(start, start):
+        if self.maze_gen.is_wall(start):
             return {}, {}
-        distances = {start: 0}
-        previous = {start: None}
-        pq = [(0, start)]
+        graph = self.maze_gen.get_graph()
+        adjacency = graph.adjacency
+        base_costs = self._node_base_costs(graph)
+        source = graph.node_id(start)
+        coord = graph.coord
+
+        if base_costs is None:
+            # Unit cost: one BFS distance field, predecessors read back from it
+            field = distance_field(graph, [start])
+            flat = field[graph.cell_ids >= 0].tolist()
+            distances, previous = {}, {}
+            for node, d in enumerate(flat):
+                if d < 0:
+                    continue
+                pos = coord(node)
+                distances[pos] = d
+                previous[pos] = None
+                if d > 0:
+                    for nb in adjacency[node]:
+                        if flat[nb] == d - 1:
+                            previous[pos] = coord(nb)
+                            break
+            self.nodes_explored_total += len(distances)
+            return distances, previous
+
+        dist = {source: 0}
+        prev = {source: -1}
+        pq = [(0, source)]
         while pq:
             g, node = heapq.heappop(pq)
-            if g > distances.get(node, float('inf')):
+            if g > dist.get(node, float('inf')):
                 continue
-            for nb in self._get_valid_neighbors(node):
-                ng = g + self._calculate_move_cost(node, nb)
-                if ng < distances.get(nb, float('inf')):
-                    distances[nb] = ng
-                    previous[nb] = node
+            for nb in adjacency[node]:
+                ng = g + (base_costs[nb] if base_costs is not None else 1)
+                if ng < dist.get(nb, float('inf')):
+                    dist[nb] = ng
+                    prev[nb] = node
                     heapq.heappush(pq, (ng, nb))
+
+        distances = {coord(node): d for node, d in dist.items()}
+        previous = {coord(node): (coord(p) if p != -1 else None) for node, p in prev.items()}
+        self.nodes_explored_total += len(dist)
         return distances, previous
 
+    @instrumented('dijkstra', 'path_length', success=lambda d: d is not None)
+    def find_path_length(self, start, goal):
+        """Walking distance (bombs ignored) from the level's distance oracle; None if unavailable or unreachable"""
+        oracle = self.maze_gen.get_distance_oracle()
+        if oracle is None:
+            return None
+        return oracle.distance(start, goal)
+
     def _validate_positions(self, start, goal):
         # Use maze_generator's is_wall method for consistency
         if self.maze_gen.is_wall(start) or self.maze_gen.is_wall(goal):
@@ -1173,13 +1599,18 @@ class DijkstraAlgorithm:
         return cnt
 
     def _bfs_shortest_path_length(self, start, goal):
-        q = deque([start])
-        dist = {start: 1}
+        graph = self.maze_gen.get_graph()
+        adjacency = graph.adjacency
+        source, target = graph.node_id(start), graph.node_id(goal)
+        if source < 0 or target < 0:
+            return None
+        q = deque([source])
+        dist = {source: 1}
         while q:
             cur = q.popleft()
-            if cur == goal:
+            if cur == target:
                 return dist[cur]
-            for nb in self._get_valid_neighbors(cur):
+            for nb in adjacency[cur]:
                 if nb not in dist:
                     dist[nb] = dist[cur] + 1
                     q.append(nb)
@@ -1201,102 +1632,19 @@ class DijkstraAlgorithm:
         
         return True
 
-    def _log_successful_path(self, start, goal, path, distance, nodes_explored, computation_time):
-        entry = {
-            'session_id': self.session_id,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'SUCCESSFUL_PATH',
-            'maze_info': {
-                'size': f"{self.maze_gen.height}x{self.maze_gen.width}",
-                'maze_hash': self._get_maze_hash(),
-            },
-            'path_info': {
-                'start': start,
-                'goal': goal,
-                'path': path,
-                'distance': distance,
-                'path_length': len(path),
-                'nodes_explored': nodes_explored,
-                'computation_time_ms': computation_time,
-                'efficiency': len(path) / nodes_explored if nodes_explored > 0 else 0,
-            },
-            'validation': {
-                'path_valid': self._validate_path(path),
-                'no_wall_crossing': True,
-                'optimal_path': True,
-            },
-        }
-        self.log_data.append(entry)
-
-    def _log_successful_path_bomb_avoidance(self, start, goal, path, distance, nodes_explored, computation_time, bomb_positions):
-        """Log successful path with bomb avoidance"""
-        entry = {
-            'session_id': self.session_id,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'SUCCESSFUL_PATH_BOMB_AVOIDANCE',
-            'maze_info': {
-                'size': f"{self.maze_gen.height}x{self.maze_gen.width}",
-                'maze_hash': self._get_maze_hash(),
-            },
-            'path_info': {
-                'start': start,
-                'goal': goal,
-                'path': path,
-                'distance': distance,
-                'path_length': len(path),
-                'nodes_explored': nodes_explored,
-                'computation_time_ms': computation_time,
-                'efficiency': len(path) / nodes_explored if nodes_explored > 0 else 0,
-                'bomb_positions': bomb_positions,
-            },
-            'validation': {
-                'path_valid': self._validate_path(path),
-                'no_wall_crossing': True,
-                'optimal_path': True,
-                'bomb_avoidance': True,
-            },
-        }
-        self.log_data.append(entry)
+    @property
+    def log_data(self):
+        """Records currently held by the search log, oldest first"""
+        return self.search_log.entries()
 
-    def _log_successful_path_bomb_penalty(self, start, goal, path, distance, nodes_explored, computation_time, bomb_positions):
-        """Log successful path with bomb penalty"""
-        entry = {
-            'session_id': self.session_id,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'SUCCESSFUL_PATH_BOMB_PENALTY',
-            'maze_info': {
-                'size': f"{self.maze_gen.height}x{self.maze_gen.width}",
-                'maze_hash': self._get_maze_hash(),
-            },
-            'path_info': {
-                'start': start,
-                'goal': goal,
-                'path': path,
-                'distance': distance,
-                'path_length': len(path),
-                'nodes_explored': nodes_explored,
-                'computation_time_ms': computation_time,
-                'efficiency': len(path) / nodes_explored if nodes_explored > 0 else 0,
-                'bomb_positions': bomb_positions,
-            },
-            'validation': {
-                'path_valid': self._validate_path(path),
-                'no_wall_crossing': True,
-                'optimal_path': True,
-                'bomb_penalty': True,
-            },
-        }
-        self.log_data.append(entry)
+    def _record_path(self, kind, start, goal, path, distance, nodes_explored, computation_time, **extra):
+        # Path đã được lọc tường ở caller: không validate lại, không hash lại maze
+        self.search_log.record(kind, start, goal, path, distance, nodes_explored, computation_time,
+                               self.maze_gen.get_maze_hash(), **extra)
 
     def _log_error(self, error_type, error_data):
         """Log error and display warning for bomb-related path blocking (rate limited)"""
-        self.log_data.append({
-            'session_id': self.session_id,
-            'timestamp': datetime.now().isoformat(),
-            'type': 'ERROR',
-            'error_type': error_type,
-            'error_data': error_data,
-        })
+        self.search_log.record_error(error_type, error_data)
         
         # Rate limit warnings to avoid spam (1 warning per 2 seconds per type)
         if not hasattr(self, '_last_warning_time'):
@@ -1313,10 +1661,12 @@ class DijkstraAlgorithm:
         # Warnings silently logged (removed print to prevent spam)
         pass
 
+    @instrumented('dijkstra', 'bomb_blockage', success=lambda r: not r[0])
     def check_bomb_blockage_status(self, start, goal, bomb_positions=None):
         """
         Kiểm tra và cảnh báo về tình trạng bị bom chặn đường
         Returns: (is_blocked, blockage_level, alternative_count)
+        Lỗi của chỉ mục khớp nối được ném ra cho caller, không trả về 'SAFE'
         """
         if not bomb_positions:
             return False, 'SAFE', 0
@@ -1325,65 +1675,89 @@ class DijkstraAlgorithm:
         if not self._validate_positions(start, goal):
             return False, 'SAFE', 0
             
-        try:
-            # Thử pathfinding thông thường (không tránh bom)
-            normal_path, _ = self.shortest_path(start, goal, enable_logging=False)
+        # Chỉ cần biết có đường hay không: trả lời bằng chỉ mục khớp nối (block-cut tree),
+        # không chạy search
+        index = self.maze_gen.get_connectivity_index()
+        
+        # Đường thông thường (không tránh bom)
+        normal_path = index.connected(start, goal)
+        
+        # Đường với bomb avoidance (bom như tường)
+        safe_path = index.connected(start, goal, bomb_positions)
+        
+        # Bomb radius avoidance chỉ cộng penalty (không chặn ô nào):
+        # có đường khi và chỉ khi đường thường có
+        radius_path = normal_path
+        
+        # Phân tích mức độ chặn
+        if not normal_path and not safe_path and not radius_path:
+            return True, 'COMPLETE_BLOCKAGE', 0
             
-            # Thử pathfinding với bomb avoidance
-            safe_path, _ = self.shortest_path_with_bomb_avoidance(start, goal, bomb_positions, enable_logging=False)
+        elif normal_path and not safe_path:
+            return True, 'DANGEROUS_PATH_ONLY', 1
             
-            # Thử pathfinding với bomb radius avoidance  
-            radius_path, _ = self.shortest_path_with_bomb_radius_avoidance(start, goal, bomb_positions, enable_logging=False)
+        elif safe_path and not normal_path:
+            return False, 'SAFE_DETOUR', 1
             
-            # Phân tích mức độ chặn
-            if not normal_path and not safe_path and not radius_path:
-                return True, 'COMPLETE_BLOCKAGE', 0
-                
-            elif normal_path and not safe_path:
-                return True, 'DANGEROUS_PATH_ONLY', 1
-                
-            elif safe_path and not normal_path:
-                return False, 'SAFE_DETOUR', 1
-                
-            else:
-                alternative_count = sum([1 for path in [normal_path, safe_path, radius_path] if path])
-                if alternative_count > 1:
-                    pass
-                return False, 'MULTIPLE_OPTIONS', alternative_count
-                
-        except Exception as e:
-            # Nếu có lỗi, trả về SAFE để không block game
-            print(f"check_bomb_blockage_status error: {e}")
-            return False, 'SAFE', 0
+        else:
+            alternative_count = sum([1 for path in [normal_path, safe_path, radius_path] if path])
+            return False, 'MULTIPLE_OPTIONS', alternative_count
+
+    def _submit_for_verification(self, path, blocked=None, kind='SUCCESSFUL_PATH', unit_cost=False):
+        """Offer a unit-cost result to the background BFS check (penalty-weighted paths are not BFS-optimal)"""
+        if self.verifier is None or self.last_partial:
+            return
+        graph = self.maze_gen.get_graph()
+        if unit_cost or self._node_base_costs(graph) is None:
+            self.verifier.submit(graph, path, blocked, kind)
+
+    def get_verification_stats(self):
+        """Counters of the sampled optimality check, or None when it is disabled"""
+        return self.verifier.stats() if self.verifier is not None else None
 
     def _get_maze_hash(self):
-        return hashlib.md5(self.maze_gen.maze.tobytes()).hexdigest()
+        return self.maze_gen.get_maze_hash()
 
-    def save_logs(self, filename=None):
+    def save_logs(self, filename=None, wait=False):
+        """
+        Append the search records logged since the last save to logs/<filename>
+        as JSONL. Writing happens on the search log's writer thread unless wait=True.
+        """
         if not filename:
-            filename = f"pathfinding_log_{self.session_id}.json"
-        os.makedirs('logs', exist_ok=True)
+            filename = f"pathfinding_log_{self.session_id}.jsonl"
         fp = os.path.join('logs', filename)
-        with open(fp, 'w') as f:
-            json.dump(self.log_data, f, indent=2, default=str)
+        self.search_log.flush(fp, session_id=self.session_id, wait=wait)
         print(f'Logs saved to: {fp}')
         return fp
 
     def get_training_data(self):
+        """
+        Training samples from the plain shortest paths logged on the current
+        maze. Raises RuntimeError when the search log is configured not to
+        keep the paths of SUCCESSFUL_PATH records (SEARCH_LOG_KEEP_PATHS /
+        SEARCH_LOG_PATH_KINDS).
+        """
+        if not self.search_log.keeps_path('SUCCESSFUL_PATH'):
+            raise RuntimeError("get_training_data needs SUCCESSFUL_PATH records with their path: "
+                               "enable config.SEARCH_LOG_KEEP_PATHS or list 'SUCCESSFUL_PATH' "
+                               "in config.SEARCH_LOG_PATH_KINDS")
         out = []
-        for e in self.log_data:
-            if e.get('type') == 'SUCCESSFUL_PATH':
-                feats = self._maze_to_features(e['maze_info']['size'])
-                p = e['path_info']
-                out.append({
-                    'maze_features': feats,
-                    'start': p['start'],
-                    'goal': p['goal'],
-                    'optimal_path': p['path'],
-                    'path_length': p['path_length'],
-                    'distance': p['distance'],
-                    'efficiency': p['efficiency'],
-                })
+        feats = None
+        maze_hash = self.maze_gen.get_maze_hash()
+        for e in self.search_log.entries('SUCCESSFUL_PATH'):
+            if 'path' not in e or e['maze_hash'] != maze_hash:
+                continue  # Logged on an earlier maze
+            if feats is None:
+                feats = self._maze_to_features(f"{self.maze_gen.height}x{self.maze_gen.width}")
+            out.append({
+                'maze_features': feats,
+                'start': e['start'],
+                'goal': e['goal'],
+                'optimal_path': e['path'],
+                'path_length': e['path_length'],
+                'distance': e['distance'],
+                'efficiency': e['path_length'] / e['nodes_explored'] if e['nodes_explored'] > 0 else 0,
+            })
         return out
 
     def _maze_to_features(self, size_str):
@@ -1396,61 +1770,10 @@ class DijkstraAlgorithm:
             'maze_pattern': self.maze_gen.maze.tolist(),
         }
 
-    def shortest_path_with_obstacles(self, start, goal, obstacles=None):
+    @instrumented('dijkstra', 'obstacles', counter=_explored_total)
+    def shortest_path_with_obstacles(self, start, goal, obstacles=None, max_nodes=None, deadline_ns=None):
         """Find shortest path while treating obstacles as walls"""
-        if obstacles is None:
-            obstacles = set()
-            
-        if not self._validate_positions(start, goal):
-            return None, float('inf')
-
-        pq = []  # (f, g, node, path)
-        h0 = self._heuristic(start, goal) if getattr(config, 'USE_ASTAR', False) else 0
-        heapq.heappush(pq, (h0, 0, start, [start]))
-
-        dist = {start: 0}
-        visited = set()
-
-        while pq:
-            f, g, current, path = heapq.heappop(pq)
-
-            if current in visited:
-                continue
-            visited.add(current)
-
-            if current == goal:
-                return path, g
-
-            row, col = current
-            neighbors = [
-                (row - 1, col), (row + 1, col),
-                (row, col - 1), (row, col + 1)
-            ]
-
-            for nr, nc in neighbors:
-                neighbor = (nr, nc)
-                
-                # Skip if out of bounds
-                if not (0 <= nr < self._height and 0 <= nc < self._width):
-                    continue
-                
-                # Skip if wall
-                if self.maze_gen.maze[nr, nc] == 1:
-                    continue
-                
-                # Skip if obstacle (bomb)
-                if neighbor in obstacles:
-                    continue
-                
-                if neighbor in visited:
-                    continue
-
-                new_cost = g + 1
-                if neighbor not in dist or new_cost < dist[neighbor]:
-                    dist[neighbor] = new_cost
-                    h = self._heuristic(neighbor, goal) if getattr(config, 'USE_ASTAR', False) else 0
-                    f = new_cost + h
-                    new_path = path + [neighbor]
-                    heapq.heappush(pq, (f, new_cost, neighbor, new_path))
-
-        return None, float('inf')
+        # Obstacles (bombs) are treated exactly like walls; every step costs 1
+        model = self.cost_model(unit_base=True).block(obstacles)
+        return self._run_cost_model(start, goal, model, 'OBSTACLES', enable_logging=False, clean=False,
+                                    max_nodes=max_nodes, deadline_ns=deadline_ns)
@@ -0,0 +1,120 @@
+"""
+All-pairs shortest-distance oracle for the current maze.
+
+One BFS per open cell fills a uint16 matrix indexed by GridGraph node ids,
+so any walking distance (ignoring bombs) is a single array lookup. The
+table is built once per level; mazes whose table would exceed the
+configured memory ceiling get no oracle and callers fall back to their
+on-demand BFS.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+
+
+UNREACHABLE = np.iinfo(np.uint16).max
+
+
+def _bfs_rows(adjacency, sources):
+    """BFS from each source; returns a (len(sources), n) uint16 distance block."""
+    n = len(adjacency)
+    block = np.full((len(sources), n), UNREACHABLE, dtype=np.uint16)
+    for k, source in enumerate(sources):
+        dist = [-1] * n
+        dist[source] = 0
+        frontier = [source]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for nb in adjacency[node]:
+                    if dist[nb] < 0:
+                        dist[nb] = depth
+                        next_frontier.append(nb)
+            frontier = next_frontier
+        row = np.asarray(dist, dtype=np.int32)
+        block[k] = np.where(row < 0, UNREACHABLE, row)
+    return block
+
+
+class DistanceOracle:
+    """
+    O(1) walking-distance queries between any two open cells.
+
+    Attributes:
+        graph: GridGraph the table was built for
+        matrix: uint16 array (n, n); UNREACHABLE marks disconnected pairs
+    """
+
+    def __init__(self, graph, matrix):
+        self.graph = graph
+        self.matrix = matrix
+
+    @staticmethod
+    def table_bytes(graph):
+        """Memory needed by the uint16 table for this graph."""
+        return graph.num_nodes * graph.num_nodes * np.dtype(np.uint16).itemsize
+
+    @classmethod
+    def build(cls, graph, max_mb=None, workers=None):
+        """
+        Build the oracle, or return None when the table exceeds max_mb.
+
+        Args:
+            graph: compiled GridGraph of the maze
+            max_mb: memory ceiling (defaults to config.DISTANCE_ORACLE_MAX_MB)
+            workers: process count for the build (defaults to
+                config.DISTANCE_ORACLE_WORKERS; 0 = one per CPU, 1 = in-process)
+        """
+        if max_mb is None:
+            max_mb = getattr(config, 'DISTANCE_ORACLE_MAX_MB', 16)
+        if graph.num_nodes == 0 or cls.table_bytes(graph) > max_mb * 1024 * 1024:
+            return None
+
+        if workers is None:
+            workers = getattr(config, 'DISTANCE_ORACLE_WORKERS', 0)
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        min_nodes = getattr(config, 'DISTANCE_ORACLE_PARALLEL_MIN_NODES', 2000)
+
+        sources = list(range(graph.num_nodes))
+        if workers > 1 and graph.num_nodes >= min_nodes:
+            matrix = cls._build_parallel(graph.adjacency, sources, workers)
+        else:
+            matrix = _bfs_rows(graph.adjacency, sources)
+        return cls(graph, matrix)
+
+    @staticmethod
+    def _build_parallel(adjacency, sources, workers):
+        """Split sources into chunks and BFS them in a process pool."""
+        chunk_size = max(1, len(sources) // (workers * 4))
+        chunks = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                blocks = list(pool.map(_bfs_rows, [adjacency] * len(chunks), chunks))
+        except (OSError, RuntimeError) as e:
+            # No process support in this environment - build in-process instead
+            print(f"DistanceOracle: process pool unavailable ({e}), building in-process")
+            return _bfs_rows(adjacency, sources)
+        return np.vstack(blocks)
+
+    def distance(self, a, b):
+        """Walking distance between two (row, col) cells, or None if a wall / unreachable."""
+        i = self.graph.node_id(a)
+        j = self.graph.node_id(b)
+        if i < 0 or j < 0:
+            return None
+        d = self.matrix[i, j]
+        return None if d == UNREACHABLE else int(d)
+
+    def distances_from(self, position):
+        """uint16 row of distances from one cell to every node id (None for walls)."""
+        i = self.graph.node_id(position)
+        if i < 0:
+            return None
+        return self.matrix[i]
@@ -0,0 +1,117 @@
+"""
+Flow field toward a fixed target (the exit gate).
+
+One reverse BFS from the target gives, for every open cell, its walking
+distance to the target and the direction of the next step along a shortest
+path. The target stays fixed for a whole level, so the field is built once
+and only rebuilt when the bomb layout changes; after that a path from any
+cell is just a walk along the next-step pointers, with no search.
+"""
+
+import numpy as np
+
+from grid_graph import DIRECTIONS
+
+
+UNREACHED = -1
+
+
+class FlowField:
+    """
+    Distance / next-direction field toward one target.
+
+    Attributes:
+        graph: underlying GridGraph
+        target: (row, col) of the target
+        distance: int32 array (height, width), steps to target or UNREACHED
+        direction: int8 array (height, width), index into grid_graph.DIRECTIONS
+            of the next step, or UNREACHED (walls, target, unreachable cells)
+    """
+
+    def __init__(self, graph, target, obstacles=None):
+        self.graph = graph
+        self.target = tuple(target)
+        self.distance = np.full((graph.height, graph.width), UNREACHED, dtype=np.int32)
+        self.direction = np.full((graph.height, graph.width), UNREACHED, dtype=np.int8)
+        self._next = {}  # node id -> next node id toward target
+        self._dist = {}
+
+        root = graph.node_id(self.target)
+        if root < 0:
+            return
+        blocked = graph.ids_for(obstacles)
+        adjacency = graph.adjacency
+        dist = self._dist
+        dist[root] = 0
+        frontier = [root]
+        depth = 0
+        while frontier:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for nb in adjacency[node]:
+                    if nb not in dist and nb not in blocked:
+                        dist[nb] = depth
+                        self._next[nb] = node
+                        next_frontier.append(nb)
+            frontier = next_frontier
+
+        nodes = np.fromiter(dist.keys(), dtype=np.int64, count=len(dist))
+        self.distance.flat[graph.flat_index[nodes]] = np.fromiter(dist.values(), dtype=np.int64, count=len(dist))
+        if self._next:
+            # Step (d_row, d_col) -> DIRECTIONS index through a 3x3 lookup
+            lookup = np.full(9, UNREACHED, dtype=np.int8)
+            for i, (dr, dc) in enumerate(DIRECTIONS):
+                lookup[(dr + 1) * 3 + (dc + 1)] = i
+            src = np.fromiter(self._next.keys(), dtype=np.int64, count=len(self._next))
+            dst = np.fromiter(self._next.values(), dtype=np.int64, count=len(self._next))
+            flat_src, flat_dst = graph.flat_index[src], graph.flat_index[dst]
+            dr = flat_dst // graph.width - flat_src // graph.width
+            dc = flat_dst % graph.width - flat_src % graph.width
+            self.direction.flat[flat_src] = lookup[(dr + 1) * 3 + (dc + 1)]
+
+    def _step_from(self, node):
+        """Next node toward the target; a blocked start cell (Pacman on a bomb) steps to its best neighbor."""
+        nxt = self._next.get(node)
+        if nxt is None and node >= 0 and node not in self._dist:
+            best = None
+            for nb in self.graph.adjacency[node]:
+                d = self._dist.get(nb)
+                if d is not None and (best is None or d < self._dist[best]):
+                    best = nb
+            nxt = best
+        return nxt
+
+    def distance_at(self, position):
+        """Steps from position to the target, or None if unreachable."""
+        row, col = position
+        if 0 <= row < self.graph.height and 0 <= col < self.graph.width:
+            d = int(self.distance[row, col])
+            return d if d >= 0 else None
+        return None
+
+    def next_step(self, position):
+        """(d_row, d_col) of the next move toward the target, or None."""
+        node = self.graph.node_id(position)
+        nxt = self._step_from(node)
+        if nxt is None:
+            return None
+        return (self.graph.rows[nxt] - self.graph.rows[node], self.graph.cols[nxt] - self.graph.cols[node])
+
+    def path_from(self, position):
+        """Shortest path [position, ..., target] by following the field, or None."""
+        graph = self.graph
+        node = graph.node_id(position)
+        if node < 0:
+            return None
+        path = [node]
+        if node not in self._dist:
+            node = self._step_from(node)
+            if node is None:
+                return None
+            path.append(node)
+        following = self._next
+        while node in following:
+            node = following[node]
+            path.append(node)
+        return graph.to_coords(path)
@@ -131,10 +131,13 @@ class GhostAvoidanceVisualizer:
         
         ghost_data = []
         pacman_row, pacman_col = int(self.game.pacman_pos[1]), int(self.game.pacman_pos[0])
+        oracle = self.game.maze_gen.get_distance_oracle()
         
         for i, ghost in enumerate(self.game.ghosts):
             ghost_row, ghost_col = int(ghost['pos'][1]), int(ghost['pos'][0])
             distance = abs(pacman_row - ghost_row) + abs(pacman_col - ghost_col)
+            # Walking distance from the level's distance oracle (None if unavailable)
+            path_distance = oracle.distance((pacman_row, pacman_col), (ghost_row, ghost_col)) if oracle else None
             
             ghost_data.append({
                 'id': i,
@@ -143,6 +146,7 @@ class GhostAvoidanceVisualizer:
                 'scared': ghost.get('scared', False),
                 'is_eyes': self.game.can_pacman_pass_through_ghost(ghost),
                 'distance': distance,
+                'path_distance': path_distance,
                 'threat_level': self._calculate_threat_level(distance, ghost.get('scared', False)),
             })
         
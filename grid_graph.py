@@ -0,0 +1,107 @@
+"""
+Compiled grid graph for the Pacman maze.
+
+The maze is compiled once per generate_maze() into flat integer node ids
+(row-major order over open cells) with CSR-style adjacency, so searches can
+run on ints instead of building neighbor tuples and bounds-checking walls on
+every expansion.
+"""
+
+import numpy as np
+
+
+# Same neighbor order as MazeGenerator.get_neighbors: Up, Down, Left, Right
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+class GridGraph:
+    """
+    Open cells of a maze as integer nodes with CSR adjacency.
+
+    Attributes:
+        cell_ids: int32 array (height, width), node id per cell or -1 for walls
+        rows, cols: lists mapping node id -> row / col
+        flat_index: int array mapping node id -> row * width + col
+        offsets, targets: CSR arrays; neighbors of node i are
+            targets[offsets[i]:offsets[i + 1]]
+        adjacency: tuple of neighbor-id tuples per node (fast Python view of CSR)
+    """
+
+    def __init__(self, maze):
+        self.maze = maze
+        grid = np.asarray(maze)
+        self.height, self.width = grid.shape
+
+        open_mask = grid == 0
+        rows, cols = np.nonzero(open_mask)
+        self.num_nodes = len(rows)
+
+        self.cell_ids = np.full(grid.shape, -1, dtype=np.int32)
+        self.cell_ids[rows, cols] = np.arange(self.num_nodes, dtype=np.int32)
+
+        # Neighbor id per direction (-1 = wall / out of bounds)
+        padded = np.full((self.height + 2, self.width + 2), -1, dtype=np.int32)
+        padded[1:-1, 1:-1] = self.cell_ids
+        neighbor_ids = np.stack([
+            padded[rows + 1 + dr, cols + 1 + dc] for dr, dc in DIRECTIONS
+        ], axis=1)
+
+        valid = neighbor_ids >= 0
+        self.degree = valid.sum(axis=1).astype(np.int32)
+        self.offsets = np.zeros(self.num_nodes + 1, dtype=np.int32)
+        np.cumsum(self.degree, out=self.offsets[1:])
+        self.targets = neighbor_ids[valid].astype(np.int32)
+
+        self.flat_index = rows * self.width + cols  # Node id -> index into maze.ravel()
+        self.rows = rows.tolist()
+        self.cols = cols.tolist()
+        offsets = self.offsets.tolist()
+        targets = self.targets.tolist()
+        self.adjacency = tuple(
+            tuple(targets[offsets[i]:offsets[i + 1]]) for i in range(self.num_nodes)
+        )
+
+    def node_id(self, position):
+        """Return node id of (row, col), or -1 for walls / out of bounds."""
+        row, col = position
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return int(self.cell_ids[row, col])
+        return -1
+
+    def coord(self, node):
+        """Return (row, col) of a node id."""
+        return (self.rows[node], self.cols[node])
+
+    def neighbors(self, node):
+        """Return neighbor ids of a node (Up, Down, Left, Right order)."""
+        return self.adjacency[node]
+
+    def ids_for(self, positions):
+        """Convert an iterable of (row, col) to a set of node ids, skipping walls."""
+        ids = set()
+        if not positions:
+            return ids
+        for pos in positions:
+            node = self.node_id(pos)
+            if node >= 0:
+                ids.add(node)
+        return ids
+
+    def to_coords(self, nodes):
+        """Convert a sequence of node ids to a list of (row, col)."""
+        rows, cols = self.rows, self.cols
+        return [(rows[n], cols[n]) for n in nodes]
+
+    def wall_count_8(self):
+        """Number of wall / out-of-bounds cells in the 8-neighborhood of each node."""
+        walls = np.ones((self.height + 2, self.width + 2), dtype=np.int32)
+        walls[1:-1, 1:-1] = np.asarray(self.maze) != 0
+        rows = np.asarray(self.rows, dtype=np.int64) + 1
+        cols = np.asarray(self.cols, dtype=np.int64) + 1
+        count = np.zeros(self.num_nodes, dtype=np.int32)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                if dr == 0 and dc == 0:
+                    continue
+                count += walls[rows + dr, cols + dc]
+        return count
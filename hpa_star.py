@@ -0,0 +1,207 @@
+"""
+Hierarchical pathfinding (HPA*) for very large mazes.
+
+The grid is cut into square clusters. Every open cell with a neighbor in
+another cluster is an entrance; intra-cluster entrance-to-entrance
+distances are computed once per cluster (lazily, on first use) and cached
+for the maze. A query searches the abstract graph of entrances and only
+refines the clusters the abstract path crosses.
+
+Generated mazes cross cluster borders through 1-wide corridors, so keeping
+every crossing as an entrance stays small and makes the result exact
+(same cost as a flat search), not just near-optimal.
+"""
+
+import heapq
+
+
+class HierarchicalPathfinder:
+    """
+    Cluster hierarchy over a GridGraph.
+
+    Attributes:
+        graph: underlying GridGraph
+        cluster_size: cluster side length in cells
+        cluster_of: cluster id per node id
+        entrances: list of entrance node ids per cluster
+    """
+
+    def __init__(self, graph, cluster_size=16):
+        self.graph = graph
+        self.cluster_size = cluster_size
+        clusters_per_row = (graph.width + cluster_size - 1) // cluster_size
+        self.cluster_of = [
+            (r // cluster_size) * clusters_per_row + (c // cluster_size)
+            for r, c in zip(graph.rows, graph.cols)
+        ]
+        num_clusters = clusters_per_row * ((graph.height + cluster_size - 1) // cluster_size)
+        self.entrances = [[] for _ in range(num_clusters)]
+        self.is_entrance = [False] * graph.num_nodes
+        cluster_of = self.cluster_of
+        for node, neighbors in enumerate(graph.adjacency):
+            if any(cluster_of[nb] != cluster_of[node] for nb in neighbors):
+                self.is_entrance[node] = True
+                self.entrances[cluster_of[node]].append(node)
+        self._intra = {}  # entrance -> tuple of (entrance, unit cost), bomb/penalty free
+
+    # ------------------------------------------------------------------
+    # Cluster-local search
+    # ------------------------------------------------------------------
+
+    def _cluster_search(self, source, blocked, penalties, reverse=False, goal=-1):
+        """
+        Dijkstra restricted to the source's cluster.
+        Step cost is 1 + penalty of the entered cell; with reverse=True costs
+        are measured toward source (distance from each cell to source).
+        """
+        adjacency = self.graph.adjacency
+        cluster_of = self.cluster_of
+        cid = cluster_of[source]
+        dist = {source: 0}
+        prev = {source: -1}
+        pq = [(0, source)]
+        while pq:
+            d, node = heapq.heappop(pq)
+            if d > dist[node]:
+                continue
+            if node == goal:
+                break
+            step = 1 + penalties.get(node, 0) if reverse else 0
+            for nb in adjacency[node]:
+                if cluster_of[nb] != cid or nb in blocked:
+                    continue
+                nd = d + (step if reverse else 1 + penalties.get(nb, 0))
+                if nd < dist.get(nb, float('inf')):
+                    dist[nb] = nd
+                    prev[nb] = node
+                    heapq.heappush(pq, (nd, nb))
+        return dist, prev
+
+    def _intra_edges(self, entrance, dirty, blocked, penalties, scratch):
+        """Entrance -> [(entrance, cost)] inside its cluster, cached unless the cluster is dirty."""
+        cid = self.cluster_of[entrance]
+        if cid in dirty:
+            edges = scratch.get(entrance)
+            if edges is None:
+                dist, _ = self._cluster_search(entrance, blocked, penalties)
+                edges = scratch[entrance] = tuple(
+                    (e, dist[e]) for e in self.entrances[cid] if e != entrance and e in dist
+                )
+            return edges
+        edges = self._intra.get(entrance)
+        if edges is None:
+            dist, _ = self._cluster_search(entrance, (), {})
+            edges = self._intra[entrance] = tuple(
+                (e, dist[e]) for e in self.entrances[cid] if e != entrance and e in dist
+            )
+        return edges
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def shortest_path(self, source, target, blocked=None, penalties=None, use_astar=True):
+        """
+        Shortest path between two node ids.
+
+        Args:
+            blocked: set of node ids treated as walls
+            penalties: dict node id -> extra cost for entering that node
+            use_astar: Manhattan heuristic on the abstract graph
+
+        Returns:
+            (path, cost, explored) - path is a list of node ids or None,
+            explored counts abstract nodes expanded
+        """
+        blocked = blocked or set()
+        penalties = penalties or {}
+        if target in blocked:
+            return None, float('inf'), 0
+        if source == target:
+            return [source], 0, 1
+
+        graph = self.graph
+        adjacency = graph.adjacency
+        rows, cols = graph.rows, graph.cols
+        cluster_of = self.cluster_of
+        goal_row, goal_col = rows[target], cols[target]
+        dirty = {cluster_of[n] for n in blocked}
+        dirty.update(cluster_of[n] for n in penalties)
+        scratch = {}
+
+        # Start links: source -> entrances of its cluster (and target if it is in there)
+        source_dist, _ = self._cluster_search(source, blocked, penalties)
+        source_cluster = cluster_of[source]
+        source_links = [(e, source_dist[e]) for e in self.entrances[source_cluster]
+                        if e != source and e in source_dist]
+        if target in source_dist:
+            source_links.append((target, source_dist[target]))
+
+        # Goal links: cost from each cell of the goal cluster to target
+        target_dist, _ = self._cluster_search(target, blocked, penalties, reverse=True)
+        target_cluster = cluster_of[target]
+
+        def h(node):
+            return abs(rows[node] - goal_row) + abs(cols[node] - goal_col) if use_astar else 0
+
+        dist = {source: 0}
+        prev = {source: -1}
+        pq = [(h(source), 0, source)]
+        closed = set()
+        explored = 0
+
+        while pq:
+            f, g, node = heapq.heappop(pq)
+            if node in closed:
+                continue
+            closed.add(node)
+            explored += 1
+
+            if node == target:
+                return self._refine(source, target, prev, blocked, penalties), g, explored
+
+            if node == source:
+                links = list(source_links)
+            else:
+                links = list(self._intra_edges(node, dirty, blocked, penalties, scratch))
+                if cluster_of[node] == target_cluster and node in target_dist:
+                    links.append((target, target_dist[node]))
+            if self.is_entrance[node]:
+                for nb in adjacency[node]:
+                    if cluster_of[nb] != cluster_of[node] and nb not in blocked:
+                        links.append((nb, 1 + penalties.get(nb, 0)))
+
+            for other, cost in links:
+                if other in closed:
+                    continue
+                ng = g + cost
+                if ng < dist.get(other, float('inf')):
+                    dist[other] = ng
+                    prev[other] = node
+                    heapq.heappush(pq, (ng + h(other), ng, other))
+
+        return None, float('inf'), explored
+
+    def _refine(self, source, target, prev, blocked, penalties):
+        """Expand the abstract path cluster by cluster into grid cells."""
+        abstract = []
+        node = target
+        while node != -1:
+            abstract.append(node)
+            node = prev[node]
+        abstract.reverse()
+
+        path = [source]
+        cluster_of = self.cluster_of
+        for a, b in zip(abstract, abstract[1:]):
+            if cluster_of[a] != cluster_of[b]:
+                path.append(b)  # Border crossing between neighboring cells
+                continue
+            _, cell_prev = self._cluster_search(a, blocked, penalties, goal=b)
+            segment = []
+            node = b
+            while node != a:
+                segment.append(node)
+                node = cell_prev[node]
+            path.extend(reversed(segment))
+        return path
@@ -0,0 +1,235 @@
+"""
+Incremental replanning (D* Lite) for auto mode.
+
+Auto mode replans every time ghosts move, but between two calls Pacman
+moves by about one cell and only the ghost penalty footprint changes.
+D* Lite searches backward from the goal and keeps its g / rhs tables across
+calls; cost changes (penalty cells in / out, bombs placed / removed) only
+re-open the vertices next to the changed cells, so replanning work follows
+the size of the change rather than the size of the maze.
+
+Cost model matches DijkstraAlgorithm._search with unit_base=True: entering
+a node costs 1 + penalty, blocked nodes cannot be entered.
+"""
+
+import heapq
+
+
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    D* Lite planner bound to one GridGraph and one goal.
+
+    Attributes:
+        graph: underlying GridGraph
+        goal: goal node id of the current search tree (None before the first plan)
+        last_expanded: vertices expanded by the last plan() call
+        last_changed: cells whose cost changed since the previous call
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.goal = None
+        self.last_expanded = 0
+        self.last_changed = 0
+        self._reset(None)
+
+    def _reset(self, goal):
+        self.goal = goal
+        self._g = {}
+        self._rhs = {}
+        self._queue = []   # heap of (k1, k2, node); stale entries skipped
+        self._keys = {}    # node -> current key while it is on the queue
+        self._km = 0
+        self._last_start = None
+        self._penalties = {}
+        self._blocked = frozenset()
+
+    # ------------------------------------------------------------------
+    # D* Lite core
+    # ------------------------------------------------------------------
+
+    def _h(self, a, b):
+        rows, cols = self.graph.rows, self.graph.cols
+        return abs(rows[a] - rows[b]) + abs(cols[a] - cols[b])
+
+    def _cost_in(self, node):
+        """Cost of entering node (INF when blocked)."""
+        if node in self._blocked:
+            return INF
+        return 1 + self._penalties.get(node, 0)
+
+    def _key(self, node, start):
+        m = min(self._g.get(node, INF), self._rhs.get(node, INF))
+        return (m + self._h(start, node) + self._km, m)
+
+    def _best_rhs(self, node):
+        """rhs = min over successors of (cost of entering it + its g)."""
+        g, blocked, penalties = self._g, self._blocked, self._penalties
+        best = INF
+        for nb in self.graph.adjacency[node]:
+            if nb in blocked:
+                continue
+            c = 1 + penalties.get(nb, 0) + g.get(nb, INF)
+            if c < best:
+                best = c
+        return best
+
+    def _update_vertex(self, node, start):
+        """Put node on the queue with a fresh key if inconsistent, else take it off."""
+        if self._g.get(node, INF) != self._rhs.get(node, INF):
+            key = self._key(node, start)
+            self._keys[node] = key
+            heapq.heappush(self._queue, (key[0], key[1], node))
+        else:
+            self._keys.pop(node, None)
+
+    def _compute_shortest_path(self, start):
+        g, rhs = self._g, self._rhs
+        queue, keys = self._queue, self._keys
+        adjacency = self.graph.adjacency
+        rows, cols = self.graph.rows, self.graph.cols
+        start_row, start_col = rows[start], cols[start]
+        goal, km = self.goal, self._km
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        def update(node):
+            # Inlined _update_vertex (hot path)
+            g_node, rhs_node = g.get(node, INF), rhs.get(node, INF)
+            if g_node != rhs_node:
+                m = g_node if g_node < rhs_node else rhs_node
+                k1 = m + abs(rows[node] - start_row) + abs(cols[node] - start_col) + km
+                keys[node] = (k1, m)
+                heappush(queue, (k1, m, node))
+            else:
+                keys.pop(node, None)
+
+        expanded = 0
+        while queue:
+            k1, k2, node = queue[0]
+            if keys.get(node) != (k1, k2):
+                heappop(queue)  # Stale entry
+                continue
+            g_start, rhs_start = g.get(start, INF), rhs.get(start, INF)
+            m = g_start if g_start < rhs_start else rhs_start
+            if not ((k1, k2) < (m + km, m) or g_start != rhs_start):
+                break
+            heappop(queue)
+            del keys[node]
+            expanded += 1
+
+            g_node, rhs_node = g.get(node, INF), rhs.get(node, INF)
+            m = g_node if g_node < rhs_node else rhs_node
+            new_key = (m + abs(rows[node] - start_row) + abs(cols[node] - start_col) + km, m)
+            if (k1, k2) < new_key:
+                keys[node] = new_key
+                heappush(queue, (new_key[0], new_key[1], node))
+            elif g_node > rhs_node:
+                # Overconsistent: settle g, neighbors may now route through node
+                g[node] = rhs_node
+                through = self._cost_in(node) + rhs_node
+                for nb in adjacency[node]:
+                    if nb != goal and through < rhs.get(nb, INF):
+                        rhs[nb] = through
+                    update(nb)
+            else:
+                # Underconsistent: neighbors that routed through node must look again
+                g[node] = INF
+                through = self._cost_in(node) + g_node
+                for nb in adjacency[node]:
+                    if nb != goal and rhs.get(nb, INF) == through:
+                        rhs[nb] = self._best_rhs(nb)
+                    update(nb)
+                if node != goal:
+                    rhs[node] = self._best_rhs(node)
+                update(node)
+        return expanded
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def plan(self, source, target, blocked=None, penalties=None):
+        """
+        Replan from source to target with the current bombs / ghost penalties.
+
+        Args:
+            blocked: set of node ids that cannot be entered (bombs)
+            penalties: dict node id -> extra cost for entering that node
+
+        Returns:
+            (path, cost) - path is a list of node ids, or None if unreachable
+        """
+        blocked = frozenset(blocked or ())
+        penalties = dict(penalties or {})
+
+        if target != self.goal:
+            self._reset(target)
+            self._blocked = blocked
+            self._penalties = penalties
+            self._rhs[target] = 0
+            self._update_vertex(target, source)
+            self._last_start = source
+            self.last_changed = 0
+        else:
+            # Pacman moved: shift key modifier instead of re-keying the queue
+            self._km += self._h(self._last_start, source)
+            self._last_start = source
+
+            changed = set(blocked.symmetric_difference(self._blocked))
+            old = self._penalties
+            for node, value in penalties.items():
+                if old.get(node) != value:
+                    changed.add(node)
+            for node in old:
+                if node not in penalties:
+                    changed.add(node)
+            old_cost = {node: self._cost_in(node) for node in changed}
+            self._blocked = blocked
+            self._penalties = penalties
+            self.last_changed = len(changed)
+
+            # Entering a changed cell got cheaper / dearer: fix rhs of its neighbors
+            g, rhs = self._g, self._rhs
+            adjacency = self.graph.adjacency
+            for node in changed:
+                c_old, c_new = old_cost[node], self._cost_in(node)
+                g_node = g.get(node, INF)
+                for nb in adjacency[node]:
+                    if nb == target:
+                        continue
+                    if c_new < c_old:
+                        if c_new + g_node < rhs.get(nb, INF):
+                            rhs[nb] = c_new + g_node
+                    elif rhs.get(nb, INF) == c_old + g_node:
+                        rhs[nb] = self._best_rhs(nb)
+                    self._update_vertex(nb, source)
+
+        self.last_expanded = self._compute_shortest_path(source)
+        cost = self._g.get(source, INF)
+        path = self._extract_path(source) if cost < INF else None
+        if path is None:
+            return None, INF
+        return path, cost
+
+    def _extract_path(self, source):
+        """Follow the cheapest successor from source down to the goal."""
+        g = self._g
+        adjacency = self.graph.adjacency
+        path = [source]
+        node = source
+        for _ in range(self.graph.num_nodes):
+            if node == self.goal:
+                return path
+            best, best_cost = -1, INF
+            for nb in adjacency[node]:
+                c = self._cost_in(nb) + g.get(nb, INF)
+                if c < best_cost:
+                    best, best_cost = nb, c
+            if best < 0:
+                return None
+            path.append(best)
+            node = best
+        return None
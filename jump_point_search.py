@@ -0,0 +1,164 @@
+"""
+Jump Point Search (4-connected) for uniform-cost queries.
+
+With unit step costs many shortest paths are symmetric; JPS only puts
+jump points on the open list - cells where a forced neighbor appears or a
+vertical scan spots a horizontal jump point - and scans straight runs in
+between without queueing them. Works on the GridGraph node ids and accepts
+extra blocked cells (bombs, obstacles).
+"""
+
+import heapq
+
+
+class JumpPointSearch:
+    """
+    4-connected JPS over a GridGraph.
+
+    Horizontal moves are the "straight" moves (stop at forced neighbors);
+    vertical moves also probe left / right horizontal jumps at every cell,
+    like diagonal moves in 8-connected JPS.
+
+    Attributes:
+        graph: underlying GridGraph
+        last_scanned: cells touched by jump scans during the last query
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        # Padded id grid (-1 border) so neighbor checks need no bounds tests
+        padded = [[-1] * (graph.width + 2)]
+        for row in graph.cell_ids.tolist():
+            padded.append([-1] + row + [-1])
+        padded.append([-1] * (graph.width + 2))
+        self._cells = padded
+        self.last_scanned = 0
+
+    def shortest_path(self, source, target, blocked=None, use_astar=True):
+        """
+        Unit-cost shortest path between two node ids.
+
+        Args:
+            blocked: set of node ids treated as walls
+            use_astar: Manhattan heuristic on jump points
+
+        Returns:
+            (path, distance, explored) - path is a list of node ids or None,
+            explored is the number of jump points expanded
+        """
+        blocked = blocked or set()
+        self.last_scanned = 0
+        if target in blocked:
+            return None, float('inf'), 0
+        if source == target:
+            return [source], 0, 1
+
+        cells = self._cells
+        graph = self.graph
+        rows, cols = graph.rows, graph.cols
+        goal_r, goal_c = rows[target] + 1, cols[target] + 1
+        scanned = 0
+
+        if blocked:
+            def walkable(r, c):
+                node = cells[r][c]
+                return node >= 0 and node not in blocked
+        else:
+            def walkable(r, c):
+                return cells[r][c] >= 0
+
+        def jump_horizontal(r, c, dc):
+            nonlocal scanned
+            while True:
+                c += dc
+                scanned += 1
+                if not walkable(r, c):
+                    return None
+                if r == goal_r and c == goal_c:
+                    return r, c
+                if (walkable(r - 1, c) and not walkable(r - 1, c - dc)) or \
+                        (walkable(r + 1, c) and not walkable(r + 1, c - dc)):
+                    return r, c
+
+        def jump_vertical(r, c, dr):
+            nonlocal scanned
+            while True:
+                r += dr
+                scanned += 1
+                if not walkable(r, c):
+                    return None
+                if r == goal_r and c == goal_c:
+                    return r, c
+                if (walkable(r, c - 1) and not walkable(r - dr, c - 1)) or \
+                        (walkable(r, c + 1) and not walkable(r - dr, c + 1)):
+                    return r, c
+                if jump_horizontal(r, c, 1) or jump_horizontal(r, c, -1):
+                    return r, c
+
+        start_r, start_c = rows[source] + 1, cols[source] + 1
+        h0 = abs(start_r - goal_r) + abs(start_c - goal_c) if use_astar else 0
+        pq = [(h0, 0, start_r, start_c)]
+        g_scores = {(start_r, start_c): 0}
+        parent = {(start_r, start_c): None}
+        closed = set()
+        explored = 0
+
+        while pq:
+            f, g, r, c = heapq.heappop(pq)
+            if (r, c) in closed:
+                continue
+            closed.add((r, c))
+            explored += 1
+
+            if r == goal_r and c == goal_c:
+                self.last_scanned = scanned
+                return self._emit_path(parent, (r, c)), g, explored
+
+            # Pruned directions: never go back toward the parent
+            prev = parent[(r, c)]
+            if prev is None:
+                directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
+            elif prev[0] == r:
+                dc = 1 if c > prev[1] else -1
+                directions = ((-1, 0), (1, 0), (0, dc))
+            else:
+                dr = 1 if r > prev[0] else -1
+                directions = ((0, -1), (0, 1), (dr, 0))
+
+            for dr, dc in directions:
+                if dr:
+                    point = jump_vertical(r, c, dr)
+                else:
+                    point = jump_horizontal(r, c, dc)
+                if point is None or point in closed:
+                    continue
+                ng = g + abs(point[0] - r) + abs(point[1] - c)
+                if ng < g_scores.get(point, float('inf')):
+                    g_scores[point] = ng
+                    parent[point] = (r, c)
+                    h = abs(point[0] - goal_r) + abs(point[1] - goal_c) if use_astar else 0
+                    heapq.heappush(pq, (ng + h, ng, point[0], point[1]))
+
+        self.last_scanned = scanned
+        return None, float('inf'), explored
+
+    def _emit_path(self, parent, end):
+        """Interpolate the straight runs between consecutive jump points."""
+        cells = self._cells
+        points = []
+        point = end
+        while point is not None:
+            points.append(point)
+            point = parent[point]
+        points.reverse()
+
+        path = [cells[points[0][0]][points[0][1]]]
+        for (r0, c0), (r1, c1) in zip(points, points[1:]):
+            dr = (r1 > r0) - (r1 < r0)
+            dc = (c1 > c0) - (c1 < c0)
+            r, c = r0, c0
+            while (r, c) != (r1, c1):
+                r += dr
+                c += dc
+                path.append(cells[r][c])
+        return path
@@ -0,0 +1,281 @@
+"""
+Junction graph: corridor contraction of the compiled maze.
+
+Generated mazes are mostly 1-wide corridors between junctions. Here every
+cell whose degree is not 2 (junctions and dead ends) becomes a key node and
+every corridor between two key nodes becomes one weighted edge that keeps
+its cell sequence. Unit-cost searches run on the key nodes only and expand
+corridors when the path is emitted.
+"""
+
+import heapq
+
+
+class JunctionGraph:
+    """
+    Contracted view of a GridGraph.
+
+    Attributes:
+        graph: underlying GridGraph
+        is_key: list[bool] per node id - junction / dead end
+        corridors: list of node-id tuples; both endpoints are key nodes
+        corridor_of: corridor id per node id for corridor interiors (-1 for key nodes)
+        corridor_index: position of an interior node inside its corridor
+        edges: dict key -> list of (other_key, weight, corridor_id)
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        n = graph.num_nodes
+        self._adjacency = graph.adjacency
+        self.is_key = [d != 2 for d in graph.degree.tolist()]
+        self.corridors = []
+        self.corridor_of = [-1] * n
+        self.corridor_index = [0] * n
+        self.edges = {}
+
+        for node in range(n):
+            if self.is_key[node]:
+                self._trace_corridors_from(node)
+
+        # Closed loops with no junction at all: promote one cell to a key node
+        for node in range(n):
+            if not self.is_key[node] and self.corridor_of[node] == -1:
+                self.is_key[node] = True
+                self._trace_corridors_from(node)
+
+        self.num_keys = sum(self.is_key)
+
+    def _trace_corridors_from(self, key):
+        """Record every corridor leaving a key node that is not recorded yet."""
+        self.edges.setdefault(key, [])
+        for first in self._adjacency[key]:
+            if self.is_key[first]:
+                if key < first:
+                    self._add_corridor((key, first))
+                continue
+            if self.corridor_of[first] != -1:
+                continue
+            seq = [key, first]
+            prev, cur = key, first
+            while not self.is_key[cur]:
+                a, b = self._adjacency[cur]
+                prev, cur = cur, (a if a != prev else b)
+                seq.append(cur)
+            self._add_corridor(tuple(seq))
+
+    def _add_corridor(self, seq):
+        cid = len(self.corridors)
+        self.corridors.append(seq)
+        for index in range(1, len(seq) - 1):
+            self.corridor_of[seq[index]] = cid
+            self.corridor_index[seq[index]] = index
+        a, b = seq[0], seq[-1]
+        if a != b:  # A loop back to the same key never shortens a path
+            weight = len(seq) - 1
+            self.edges.setdefault(a, []).append((b, weight, cid))
+            self.edges.setdefault(b, []).append((a, weight, cid))
+
+    # ------------------------------------------------------------------
+    # Corridor queries
+    # ------------------------------------------------------------------
+
+    def corridor_id(self, position):
+        """Corridor id of a (row, col) corridor cell, or -1 for junctions / dead ends / walls."""
+        node = self.graph.node_id(position)
+        return self.corridor_of[node] if node >= 0 else -1
+
+    def same_corridor(self, a, b):
+        """True if both cells lie on one corridor (a junction counts for corridors it ends)."""
+        na, nb = self.graph.node_id(a), self.graph.node_id(b)
+        if na < 0 or nb < 0:
+            return False
+        ca, cb = self.corridor_of[na], self.corridor_of[nb]
+        if ca >= 0 and cb >= 0:
+            return ca == cb
+        if ca >= 0:
+            return nb in (self.corridors[ca][0], self.corridors[ca][-1])
+        if cb >= 0:
+            return na in (self.corridors[cb][0], self.corridors[cb][-1])
+        return any(other == nb for other, _, _ in self.edges.get(na, ()))
+
+    # ------------------------------------------------------------------
+    # Abstract search
+    # ------------------------------------------------------------------
+
+    def _blocked_indices(self, blocked):
+        """Map corridor id -> sorted indices of blocked interior cells."""
+        by_corridor = {}
+        for node in blocked:
+            cid = self.corridor_of[node]
+            if cid >= 0:
+                by_corridor.setdefault(cid, []).append(self.corridor_index[node])
+        for indices in by_corridor.values():
+            indices.sort()
+        return by_corridor
+
+    def _links(self, node, blocked, blocked_idx):
+        """
+        How a node attaches to key nodes: list of (key, cost, side).
+        side is None for a key node, 'a' (toward corridor start) or 'b'.
+        """
+        if self.is_key[node]:
+            return [(node, 0, None)]
+        cid = self.corridor_of[node]
+        seq = self.corridors[cid]
+        i = self.corridor_index[node]
+        last = len(seq) - 1
+        idx = blocked_idx.get(cid, ())
+        links = []
+        if seq[0] not in blocked and not any(k < i for k in idx):
+            links.append((seq[0], i, 'a'))
+        if seq[-1] not in blocked and not any(k > i for k in idx):
+            links.append((seq[-1], last - i, 'b'))
+        return links
+
+    def shortest_path(self, source, target, blocked=None, use_astar=True):
+        """
+        Unit-cost shortest path between two node ids on the contracted graph.
+
+        Args:
+            blocked: set of node ids treated as walls (bombs)
+            use_astar: Manhattan heuristic on key nodes (admissible: a
+                corridor is never shorter than its endpoints' Manhattan distance)
+
+        Returns:
+            (path, distance, explored) - path is a list of node ids, or None
+        """
+        blocked = blocked or set()
+        if target in blocked:
+            return None, float('inf'), 0
+        if source in blocked:
+            # Pacman standing on a bomb can still walk off it
+            blocked = set(blocked)
+            blocked.discard(source)
+        if source == target:
+            return [source], 0, 1
+
+        rows, cols = self.graph.rows, self.graph.cols
+        goal_row, goal_col = rows[target], cols[target]
+        blocked_idx = self._blocked_indices(blocked)
+        blocked_corridors = set(blocked_idx)
+
+        best = float('inf')
+        best_key = None
+        # Start and goal inside the same corridor: walk straight along it
+        if not self.is_key[source] and self.corridor_of[source] == self.corridor_of[target] >= 0:
+            i, j = self.corridor_index[source], self.corridor_index[target]
+            lo, hi = min(i, j), max(i, j)
+            if not any(lo < k < hi for k in blocked_idx.get(self.corridor_of[source], ())):
+                best = hi - lo
+
+        goal_links = {}
+        for key, cost, side in self._links(target, blocked, blocked_idx):
+            if key not in goal_links or cost < goal_links[key][0]:
+                goal_links[key] = (cost, side)
+
+        dist = {}
+        prev = {}
+        pq = []
+        for key, cost, side in self._links(source, blocked, blocked_idx):
+            if cost < dist.get(key, float('inf')):
+                dist[key] = cost
+                prev[key] = (-1, side)
+                h = abs(rows[key] - goal_row) + abs(cols[key] - goal_col) if use_astar else 0
+                heapq.heappush(pq, (cost + h, cost, key))
+
+        done = set()
+        explored = 0
+        while pq:
+            f, g, key = heapq.heappop(pq)
+            if f >= best:
+                break
+            if key in done:
+                continue
+            done.add(key)
+            explored += 1
+
+            link = goal_links.get(key)
+            if link is not None and g + link[0] < best:
+                best = g + link[0]
+                best_key = key
+
+            for other, weight, cid in self.edges.get(key, ()):
+                if cid in blocked_corridors or other in blocked or other in done:
+                    continue
+                ng = g + weight
+                if ng < dist.get(other, float('inf')):
+                    dist[other] = ng
+                    prev[other] = (key, cid)
+                    h = abs(rows[other] - goal_row) + abs(cols[other] - goal_col) if use_astar else 0
+                    heapq.heappush(pq, (ng + h, ng, other))
+
+        if best == float('inf'):
+            return None, float('inf'), explored
+        if best_key is None:
+            return self._same_corridor_path(source, target), best, explored
+        return self._emit_path(source, target, best_key, prev, goal_links[best_key][1]), best, explored
+
+    def _same_corridor_path(self, source, target):
+        seq = self.corridors[self.corridor_of[source]]
+        i, j = self.corridor_index[source], self.corridor_index[target]
+        return list(seq[i:j + 1]) if i <= j else list(seq[j:i + 1])[::-1]
+
+    def _emit_path(self, source, target, last_key, prev, goal_side):
+        """Expand the key-node chain back into grid cells."""
+        chain = []
+        key = last_key
+        while True:
+            parent, via = prev[key]
+            chain.append((key, parent, via))
+            if parent == -1:
+                break
+            key = parent
+        chain.reverse()
+
+        # Start -> first key node
+        first_key, _, start_side = chain[0]
+        path = [source]
+        if start_side is not None:
+            seq = self.corridors[self.corridor_of[source]]
+            i = self.corridor_index[source]
+            path.extend(seq[:i][::-1] if start_side == 'a' else seq[i + 1:])
+
+        # Key -> key along corridors
+        for key, parent, cid in chain[1:]:
+            seq = self.corridors[cid]
+            path.extend(seq[1:] if seq[0] == parent else seq[-2::-1])
+
+        # Last key node -> goal
+        if goal_side is not None:
+            seq = self.corridors[self.corridor_of[target]]
+            j = self.corridor_index[target]
+            path.extend(seq[1:j + 1] if goal_side == 'a' else seq[j:-1][::-1])
+        return path
+
+
+if __name__ == "__main__":
+    import random
+    from maze_generator import MazeGenerator
+    from optimality_verifier import bfs_steps
+
+    print("Testing JunctionGraph against BFS (start cell inside the bomb set)...")
+    rng = random.Random(0)
+    checked = mismatches = 0
+    for _ in range(20):
+        maze_gen = MazeGenerator(31, 31)
+        maze_gen.generate_maze()
+        graph = maze_gen.get_graph()
+        junctions = JunctionGraph(graph)
+        for _ in range(50):
+            source, target = rng.randrange(graph.num_nodes), rng.randrange(graph.num_nodes)
+            blocked = {source} | {rng.randrange(graph.num_nodes) for _ in range(4)}
+            blocked.discard(target)
+            nodes, distance, _ = junctions.shortest_path(source, target, blocked)
+            expected = bfs_steps(graph, source, target, blocked)
+            got = distance if nodes is not None else None
+            checked += 1
+            if got != expected or (nodes is not None and len(nodes) - 1 != distance):
+                mismatches += 1
+                print(f"Mismatch {graph.coord(source)} -> {graph.coord(target)}: got {got}, BFS {expected}")
+    print(f"{checked} queries, {mismatches} mismatches")
@@ -1,5 +1,16 @@
+import hashlib
 import random
 import numpy as np
+import config
+from grid_graph import GridGraph
+from distance_oracle import DistanceOracle
+from junction_graph import JunctionGraph
+from jump_point_search import JumpPointSearch
+from hpa_star import HierarchicalPathfinder
+from bidirectional_search import BidirectionalSearch
+from landmarks import LandmarkHeuristic
+from connectivity_index import ConnectivityIndex
+from flow_field import FlowField
 
 class MazeGenerator:
     def __init__(self, width=21, height=21, complexity=0.25):
@@ -10,10 +21,23 @@ class MazeGenerator:
         self.start = None
         self.goal = None
         self.bomb_positions = []  # Grid coordinates (row, col) for bombs
+        self.graph = None  # Compiled GridGraph of the current maze
+        self.maze_version = 0  # Bumped on every new maze (invalidates cached paths)
+        self.distance_oracle = None  # All-pairs distance table (built lazily per maze)
+        self._oracle_graph = None
+        self.junction_graph = None  # Corridor-contracted graph (built lazily per maze)
+        self.jump_point_search = None  # JPS engine over the compiled graph
+        self.hierarchical_pathfinder = None  # HPA* cluster hierarchy for very large mazes
+        self.bidirectional_search = None  # Bidirectional BFS engine
+        self.landmark_heuristic = None  # ALT landmark distance table (built lazily per maze)
+        self.connectivity_index = None  # Articulation points / block-cut tree (built lazily per maze)
+        self.maze_hash = None  # MD5 of the current layout (computed once per maze, used by the search log)
+        self._hash_graph = None
 
     def generate_maze(self):
         # Initialize maze with walls
         self.maze = np.ones((self.height, self.width), dtype=int)
+        self.maze_version += 1
 
         # Generate maze using randomized DFS from single start
         stack = []
@@ -41,6 +65,9 @@ class MazeGenerator:
         self.goal = (self.height - 2, self.width - 2)  # (row, col)
         self.maze[self.goal[0], self.goal[1]] = 0  # Ensure goal is open
 
+        # Compile the finished layout once; all searches run on this graph
+        self.graph = GridGraph(self.maze)
+
         # Generate bomb positions AFTER maze is complete
         self.generate_bomb_positions(max_bombs=5)
 
@@ -87,6 +114,77 @@ class MazeGenerator:
                 neighbors.append((nx, ny))
         return neighbors
 
+    def get_graph(self):
+        """Return the compiled graph of the current maze, rebuilding if the maze was replaced"""
+        if self.graph is None or self.graph.maze is not self.maze:
+            if self.graph is not None:
+                self.maze_version += 1  # Maze replaced outside generate_maze()
+            self.graph = GridGraph(self.maze)
+        return self.graph
+
+    def get_distance_oracle(self):
+        """Return the all-pairs distance oracle for the current maze, or None if disabled / too large"""
+        graph = self.get_graph()
+        if self._oracle_graph is not graph:
+            self._oracle_graph = graph
+            self.distance_oracle = None
+            if getattr(config, 'USE_DISTANCE_ORACLE', True):
+                self.distance_oracle = DistanceOracle.build(graph)
+        return self.distance_oracle
+
+    def get_junction_graph(self):
+        """Return the corridor-contracted JunctionGraph of the current maze"""
+        graph = self.get_graph()
+        if self.junction_graph is None or self.junction_graph.graph is not graph:
+            self.junction_graph = JunctionGraph(graph)
+        return self.junction_graph
+
+    def get_jump_point_search(self):
+        """Return the Jump Point Search engine for the current maze"""
+        graph = self.get_graph()
+        if self.jump_point_search is None or self.jump_point_search.graph is not graph:
+            self.jump_point_search = JumpPointSearch(graph)
+        return self.jump_point_search
+
+    def get_hierarchical_pathfinder(self):
+        """Return the HPA* cluster hierarchy for the current maze"""
+        graph = self.get_graph()
+        if self.hierarchical_pathfinder is None or self.hierarchical_pathfinder.graph is not graph:
+            cluster_size = getattr(config, 'HPA_CLUSTER_SIZE', 16)
+            self.hierarchical_pathfinder = HierarchicalPathfinder(graph, cluster_size)
+        return self.hierarchical_pathfinder
+
+    def get_bidirectional_search(self):
+        """Return the bidirectional BFS engine for the current maze"""
+        graph = self.get_graph()
+        if self.bidirectional_search is None or self.bidirectional_search.graph is not graph:
+            self.bidirectional_search = BidirectionalSearch(graph)
+        return self.bidirectional_search
+
+    def get_landmarks(self):
+        """Return the ALT landmark heuristic for the current maze, or None if disabled"""
+        if not getattr(config, 'USE_LANDMARKS', True):
+            return None
+        graph = self.get_graph()
+        if self.landmark_heuristic is None or self.landmark_heuristic.graph is not graph:
+            self.landmark_heuristic = LandmarkHeuristic(graph, getattr(config, 'LANDMARK_COUNT', 12))
+        return self.landmark_heuristic
+
+    def get_connectivity_index(self):
+        """Return the articulation-point / bridge index of the current maze"""
+        graph = self.get_graph()
+        if self.connectivity_index is None or self.connectivity_index.graph is not graph:
+            self.connectivity_index = ConnectivityIndex(graph)
+        return self.connectivity_index
+
+    def get_maze_hash(self):
+        """Return the MD5 of the current maze layout, hashing it only once per maze"""
+        graph = self.get_graph()
+        if self._hash_graph is not graph:
+            self.maze_hash = hashlib.md5(self.maze.tobytes()).hexdigest()
+            self._hash_graph = graph
+        return self.maze_hash
+
     def is_wall(self, position):
         x, y = position
         if 0 <= x < self.height and 0 <= y < self.width:
@@ -118,128 +216,77 @@ class MazeGenerator:
         Generate valid bomb positions on the maze paths.
         Bombs are stored as grid coordinates (row, col).
         This ensures bombs are ALWAYS valid and synchronized with maze generation.
+
+        A candidate is accepted when start can still reach goal in at most
+        1.5x the bomb-free distance. That only needs a search when the
+        candidate sits on the current start -> goal route: any other candidate
+        leaves that route intact, and articulation cells between start and
+        goal are rejected from the connectivity index.
         """
-        import math
-        
         self.bomb_positions = []
-        
-        # Step 1: Collect ALL valid path positions
-        valid_positions = []
-        for row in range(self.height):
-            for col in range(self.width):
-                # Must be a path (0)
-                if self.maze[row, col] != 0:
-                    continue
-                
-                # Skip start and goal
-                if (row, col) == self.start or (row, col) == self.goal:
-                    continue
-                
-                # Must be at least 5 cells away from start and goal
-                start_dist = math.sqrt((col - self.start[1])**2 + (row - self.start[0])**2)
-                goal_dist = math.sqrt((col - self.goal[1])**2 + (row - self.goal[0])**2)
-                if start_dist <= 5 or goal_dist <= 5:
-                    continue
-                
-                # Check adjacent paths (only 4 directions: up, down, left, right)
-                # Bomb should only be placed at intersections (3+ paths) to avoid blocking corridors
-                path_up = 0 <= row-1 < self.height and self.maze[row-1, col] == 0
-                path_down = 0 <= row+1 < self.height and self.maze[row+1, col] == 0
-                path_left = 0 <= col-1 < self.width and self.maze[row, col-1] == 0
-                path_right = 0 <= col+1 < self.width and self.maze[row, col+1] == 0
-                
-                adjacent_paths = sum([path_up, path_down, path_left, path_right])
-                
-                # STRICT: Only allow bombs at intersections (3 or 4 adjacent paths)
-                # This ensures bombs are never placed in narrow corridors or corners
-                if adjacent_paths < 3:
-                    continue
-                
-                valid_positions.append((row, col))
-        
+        graph = self.get_graph()
+
+        # Step 1: Vectorized candidate filter over the whole grid
+        open_mask = self.maze == 0
+        padded = np.pad(open_mask, 1, constant_values=False).astype(np.int8)
+        degree = padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:]
+        rows, cols = np.indices(self.maze.shape)
+        start_d2 = (rows - self.start[0]) ** 2 + (cols - self.start[1]) ** 2
+        goal_d2 = (rows - self.goal[0]) ** 2 + (cols - self.goal[1]) ** 2
+        # Must be at least 5 cells away from start and goal; STRICT: only at
+        # intersections (3 or 4 adjacent paths) so corridors / corners never get a bomb
+        mask = open_mask & (degree >= 3) & (start_d2 > 25) & (goal_d2 > 25)
+        cand_rows, cand_cols = np.nonzero(mask)
+        valid_positions = list(zip(cand_rows.tolist(), cand_cols.tolist()))
+
         if not valid_positions:
             print("MazeGenerator: No valid positions for bombs")
             return
-        
-        print(f"MazeGenerator: Found {len(valid_positions)} valid bomb positions")
-        
-        # Step 2: Use pathfinding to select bomb positions that don't block the path
-        # Import here to avoid circular dependency
-        try:
-            from dijkstra_algorithm import DijkstraAlgorithm
-            dijkstra = DijkstraAlgorithm(self)
-            
-            # Verify initial path exists
-            initial_path, initial_distance = dijkstra.shortest_path(self.start, self.goal)
-            if not initial_path:
-                print("MazeGenerator: No path from start to goal!")
-                return
-            
-            print(f"MazeGenerator: Initial path length: {initial_distance} steps")
-            
-            # Shuffle and try positions
-            random.shuffle(valid_positions)
-            selected_bombs = []
-            
-            for candidate in valid_positions:
-                if len(selected_bombs) >= max_bombs:
-                    break
-                
-                row, col = candidate
-                
-                # Check distance from goal again
-                goal_dist = math.sqrt((col - self.goal[1])**2 + (row - self.goal[0])**2)
-                if goal_dist <= 5:
-                    continue
-                
-                # Check distance from other bombs
-                too_close = any(
-                    math.sqrt((col - bc)**2 + (row - br)**2) < 5
-                    for br, bc in selected_bombs
-                )
-                if too_close:
-                    continue
-                
-                # Skip if on critical initial path
-                if initial_path and (row, col) in initial_path[:max(3, len(initial_path)//3)]:
+
+        # Step 2: start -> goal route from the goal's distance field
+        initial_path = FlowField(graph, self.goal).path_from(self.start)
+        if not initial_path:
+            print("MazeGenerator: No path from start to goal!")
+            return
+        initial_distance = len(initial_path) - 1
+        max_distance = initial_distance * 1.5
+        protected = set(initial_path[:max(3, len(initial_path) // 3)])  # Critical start of the route
+        critical = set(self.get_connectivity_index().critical_cells(self.start, self.goal))
+
+        random.shuffle(valid_positions)
+        selected_bombs = []
+        current_path = set(initial_path)  # A route that avoids every selected bomb
+        searches = 0
+
+        for candidate in valid_positions:
+            if len(selected_bombs) >= max_bombs:
+                break
+            if candidate in protected or candidate in critical:
+                continue
+
+            # Check distance from other bombs
+            row, col = candidate
+            if any((row - br) ** 2 + (col - bc) ** 2 < 25 for br, bc in selected_bombs):
+                continue
+
+            if candidate in current_path:
+                # Bomb lands on the current route: find the detour
+                searches += 1
+                detour = FlowField(graph, self.goal, selected_bombs + [candidate]).path_from(self.start)
+                if not detour or len(detour) - 1 > max_distance:
                     continue
-                
-                # Test if adding this bomb still allows path to goal
-                # Use shortest_path_with_bomb_avoidance to match runtime behavior
-                temp_bombs = selected_bombs + [(row, col)]
-                path, distance = dijkstra.shortest_path_with_bomb_avoidance(
-                    self.start, self.goal, temp_bombs, bomb_positions_are_grid=True, enable_logging=False
-                )
-                
-                if path and distance <= initial_distance * 1.5:
-                    selected_bombs.append((row, col))
-                    print(f"MazeGenerator: Bomb #{len(selected_bombs)} at Grid({row}, {col}) - Path still exists ({distance} steps)")
-            
-            # Final verification with bomb avoidance
-            if selected_bombs:
-                final_path, final_dist = dijkstra.shortest_path_with_bomb_avoidance(
-                    self.start, self.goal, selected_bombs, bomb_positions_are_grid=True, enable_logging=False
-                )
-                if final_path:
-                    self.bomb_positions = selected_bombs
-                    print(f"MazeGenerator: {len(self.bomb_positions)} bombs generated successfully")
-                    
-                    # Verify each bomb is on a path
-                    for i, (row, col) in enumerate(self.bomb_positions, 1):
-                        maze_value = self.maze[row, col]
-                        if maze_value != 0:
-                            print(f"ERROR: Bomb {i} at ({row}, {col}) is NOT on path! Maze value: {maze_value}")
-                        else:
-                            print(f"   Bomb {i}: Grid({row}, {col}) - On path (maze[{row},{col}]=0)")
-                else:
-                    print("MazeGenerator: Final verification failed - no bombs added")
-                    self.bomb_positions = []
+                current_path = set(detour)
+            selected_bombs.append(candidate)
+
+        # Final verification of the whole set
+        if selected_bombs:
+            final_path = FlowField(graph, self.goal, selected_bombs).path_from(self.start)
+            if final_path and len(final_path) - 1 <= max_distance \
+                    and all(self.maze[row, col] == 0 for row, col in selected_bombs):
+                self.bomb_positions = selected_bombs
+                print(f"MazeGenerator: {len(selected_bombs)} bombs placed from {len(valid_positions)} candidates "
+                      f"(path {initial_distance} -> {len(final_path) - 1} steps, {searches} detour searches)")
             else:
-                print("MazeGenerator: No suitable bomb positions found")
-                
-        except ImportError as e:
-            print(f"MazeGenerator: Cannot import pathfinding, using simple placement: {e}")
-            # Fallback: simple random selection
-            selected = random.sample(valid_positions, min(max_bombs, len(valid_positions)))
-            self.bomb_positions = selected
-            print(f"MazeGenerator: {len(self.bomb_positions)} bombs placed (simple mode)")
+                print("MazeGenerator: Final verification failed - no bombs added")
+        else:
+            print("MazeGenerator: No suitable bomb positions found")
@@ -0,0 +1,180 @@
+"""
+Search metrics registry.
+
+Every public search entry point of DijkstraAlgorithm, AStarAlgorithm and
+BFSUtilities is wrapped with @instrumented, which times the call with
+time.perf_counter_ns() and reports into the shared REGISTRY:
+
+- counters: calls / successes per "<component>.<variant>";
+- histograms: microseconds per call and nodes explored per call, with
+  power-of-two buckets (one int.bit_length() per observation).
+
+Entry points call each other (multi-objective runs the ghost-avoidance
+variant, movement freedom runs a flood fill, ...), so per-variant times are
+inclusive. "top_level_us" only counts calls made from outside any other
+instrumented call; that histogram is the real search time per game call.
+"""
+
+import functools
+import json
+import time
+
+import config
+
+
+class Histogram:
+    """Power-of-two bucketed histogram of non-negative integers."""
+
+    BUCKETS = 48
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        value = int(value)
+        self.counts[min(value.bit_length(), self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the q-quantile (an upper bound)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min((1 << bucket) - 1, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+        }
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms.
+
+    Attributes:
+        enabled: when False, @instrumented calls skip all bookkeeping
+        counters: dict name -> int
+        histograms: dict name -> Histogram
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self._depth = 0  # Nesting level of instrumented calls in progress
+        self._started_ns = time.perf_counter_ns()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value)
+
+    def record_query(self, key, elapsed_ns, nodes_explored=None, success=True, top_level=False):
+        """One completed search call of variant key ("<component>.<variant>")."""
+        us = elapsed_ns // 1000
+        self.count(key + '.calls')
+        if success:
+            self.count(key + '.successes')
+        self.observe(key + '.us', us)
+        if nodes_explored is not None:
+            self.observe(key + '.nodes_explored', nodes_explored)
+        if top_level:
+            self.observe('top_level_us', us)
+
+    def snapshot(self):
+        """Plain-dict copy of every counter and histogram summary."""
+        return {
+            'elapsed_s': (time.perf_counter_ns() - self._started_ns) / 1e9,
+            'counters': dict(sorted(self.counters.items())),
+            'histograms': {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+        }
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+        self._started_ns = time.perf_counter_ns()
+
+    def to_json(self, filepath=None, indent=2):
+        """Snapshot as a JSON string, also written to filepath when given."""
+        text = json.dumps(self.snapshot(), indent=indent)
+        if filepath:
+            with open(filepath, 'w') as f:
+                f.write(text)
+        return text
+
+
+REGISTRY = MetricsRegistry(enabled=getattr(config, 'ENABLE_SEARCH_METRICS', True))
+
+
+def _found(result):
+    """Default success test: a (path, ...) tuple with a path, or any truthy result."""
+    if isinstance(result, tuple):
+        return bool(result) and result[0] is not None
+    return bool(result)
+
+
+def instrumented(component, variant=None, nodes=None, counter=None, success=_found, registry=None):
+    """
+    Decorator reporting a method's calls into the registry.
+
+    Args:
+        component: 'dijkstra', 'astar', 'bfs', ...
+        variant: name of the query kind (defaults to the method name)
+        nodes: callable(self) -> nodes explored by the call, read afterwards
+        counter: callable(self) -> cumulative nodes-explored counter; the
+            call reports how much it grew (use instead of nodes)
+        success: callable(result) -> bool
+    """
+    def decorate(method):
+        key = f"{component}.{variant or method.__name__}"
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            reg = registry or REGISTRY
+            if not reg.enabled:
+                return method(self, *args, **kwargs)
+            before = counter(self) if counter is not None else 0
+            reg._depth += 1
+            t0 = time.perf_counter_ns()
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - t0
+                reg._depth -= 1
+            if counter is not None:
+                explored = counter(self) - before
+            else:
+                explored = nodes(self) if nodes is not None else None
+            reg.record_query(key, elapsed, explored, success(result), top_level=reg._depth == 0)
+            return result
+        return wrapper
+    return decorate
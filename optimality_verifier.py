@@ -0,0 +1,139 @@
+"""
+Sampled background optimality check.
+
+Re-running a BFS after every search would double its cost, so completed
+unit-cost queries are sampled (a configurable fraction, spread evenly by
+an accumulator rather than a random draw) and handed to a daemon worker
+thread that re-solves them with BFS on the same compiled graph. The graph
+of a maze is never mutated, so the worker can read it without locking.
+
+The submitting side never blocks: if the worker has fallen behind and the
+queue is full, the sample is skipped and counted.
+"""
+
+import queue
+import threading
+from collections import deque
+
+
+class OptimalityVerifier:
+    """
+    Background BFS re-check of a sample of search results.
+
+    Attributes:
+        sample_rate: fraction of submitted queries that are checked (0..1)
+        submitted / sampled / skipped / verified / mismatches: counters
+        mismatch_log: last mismatch records (dicts), newest last
+    """
+
+    def __init__(self, sample_rate=0.02, queue_size=64, on_mismatch=None):
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.on_mismatch = on_mismatch  # Called from the worker thread with each mismatch record
+        self.submitted = 0
+        self.sampled = 0
+        self.skipped = 0
+        self.verified = 0
+        self.mismatches = 0
+        self.mismatch_log = deque(maxlen=100)
+        self._credit = 0.0
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._worker = None
+
+    def submit(self, graph, path, blocked=None, kind='SUCCESSFUL_PATH'):
+        """
+        Offer a completed query for checking: its (row, col) path from start
+        to goal and the node ids the search treated as walls. Returns True if
+        the query was queued.
+        """
+        self.submitted += 1
+        self._credit += self.sample_rate
+        if self._credit < 1.0 or not path:
+            return False
+        self._credit -= 1.0
+        self.sampled += 1
+        try:
+            self._jobs.put_nowait((graph, path, frozenset(blocked or ()), kind))
+        except queue.Full:
+            self.skipped += 1
+            return False
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, daemon=True)
+            self._worker.start()
+        return True
+
+    def wait(self):
+        """Block until every queued check has run."""
+        self._jobs.join()
+
+    def stats(self):
+        return {
+            'sample_rate': self.sample_rate,
+            'submitted': self.submitted,
+            'sampled': self.sampled,
+            'skipped': self.skipped,
+            'verified': self.verified,
+            'mismatches': self.mismatches,
+            'pending': self._jobs.qsize(),
+        }
+
+    def _work(self):
+        while True:
+            graph, path, blocked, kind = self._jobs.get()
+            try:
+                self._check(graph, [graph.node_id(pos) for pos in path], blocked, kind)
+            except Exception as e:
+                print(f"OptimalityVerifier error: {e}")
+            finally:
+                self._jobs.task_done()
+
+    def _check(self, graph, path_ids, blocked, kind):
+        source, target = path_ids[0], path_ids[-1]
+        reported = len(path_ids) - 1
+
+        # The path itself must be a walk of open, unblocked, adjacent cells
+        adjacency = graph.adjacency
+        valid = min(path_ids) >= 0 and all(
+            b in adjacency[a] and b not in blocked for a, b in zip(path_ids, path_ids[1:]))
+
+        expected = bfs_steps(graph, source, target, blocked)
+        self.verified += 1
+        if valid and expected == reported:
+            return
+        self.mismatches += 1
+        record = {
+            'kind': kind,
+            'start': graph.coord(source),
+            'goal': graph.coord(target),
+            'reported_steps': reported,
+            'bfs_steps': expected,
+            'path_valid': valid,
+        }
+        self.mismatch_log.append(record)
+        print(f"Optimality mismatch ({kind}): {record['start']} -> {record['goal']} "
+              f"reported {reported}, BFS {expected}, valid={valid}")
+        if self.on_mismatch is not None:
+            self.on_mismatch(record)
+
+
+def bfs_steps(graph, source, target, blocked=()):
+    """Fewest steps from source to target avoiding blocked node ids (source may be blocked), or None."""
+    if source == target:
+        return 0
+    if target in blocked:
+        return None
+    adjacency = graph.adjacency
+    seen = {source}
+    frontier = [source]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for node in frontier:
+            for nb in adjacency[node]:
+                if nb == target:
+                    return depth
+                if nb not in seen and nb not in blocked:
+                    seen.add(nb)
+                    next_frontier.append(nb)
+        frontier = next_frontier
+    return None
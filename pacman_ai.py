@@ -1,7 +1,7 @@
 import pygame
 import random
-import math
 import config
+from wavefront import distance_field
 
 
 class PacmanAI:
@@ -117,7 +117,7 @@ class PacmanAI:
         self.distance_map_ttl_ms = 120
         self._distance_map_origin = None
         self._distance_map_time = 0
-        self._distance_map = {}
+        self._distance_map = None  # Mảng int16 (height, width), -1 = không tới được
 
         # Giới hạn tần suất các kiểm tra nặng
         self.nearby_check_interval_ms = 90
@@ -318,7 +318,7 @@ class PacmanAI:
             score += 15
         
         # 4. Same corridor bonus
-        if pacman_pos[0] == ghost_pos[0] or pacman_pos[1] == ghost_pos[1]:
+        if self._is_same_corridor(pacman_pos, ghost_pos):
             score += 10
         
         # 5. Blocking path penalty
@@ -1071,7 +1071,7 @@ class PacmanAI:
             score += 25  # Tăng từ 15 lên 25
         
         # 3. Same corridor factor - INCREASED for head-on collision risk
-        if ghost_row == pacman_row or ghost_col == pacman_col:
+        if self._is_same_corridor((pacman_row, pacman_col), (ghost_row, ghost_col)):
             score += 35  # Tăng từ 25 lên 35 - cùng hành lang rất nguy hiểm
         
         # 4. Predictive movement factor - ENHANCED
@@ -1135,35 +1135,17 @@ class PacmanAI:
         ))
 
     def _get_distance_map(self, origin_pos):
-        """Tiền tính bản đồ khoảng cách BFS quanh gốc để giảm chi phí BFS cho từng ma."""
+        """Tiền tính trường khoảng cách BFS (mảng int16) quanh gốc để giảm chi phí BFS cho từng ma."""
         current_time = pygame.time.get_ticks()
         if (self._distance_map_origin == origin_pos and
             current_time - self._distance_map_time <= self.distance_map_ttl_ms):
             return self._distance_map
 
-        from collections import deque
-        origin_row, origin_col = origin_pos
-        radius = self.distance_map_radius
-        bomb_blockers = set(self.game.get_bomb_grid_positions()) if hasattr(self.game, 'get_bomb_grid_positions') else set()
+        bomb_blockers = self.game.get_bomb_grid_positions() if hasattr(self.game, 'get_bomb_grid_positions') else set()
 
-        dist_map = {origin_pos: 0}
-        queue = deque([(origin_row, origin_col, 0)])
-
-        while queue:
-            row, col, d = queue.popleft()
-            if d >= radius:
-                continue
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                ncol, nrow = col + dx, row + dy
-                npos = (nrow, ncol)
-                if npos in dist_map:
-                    continue
-                if bomb_blockers and npos in bomb_blockers:
-                    continue
-                if not self.game.is_valid_position(ncol, nrow):
-                    continue
-                dist_map[npos] = d + 1
-                queue.append((nrow, ncol, d + 1))
+        # Bom coi như tường; giới hạn bán kính distance_map_radius
+        graph = self.game.maze_gen.get_graph()
+        dist_map = distance_field(graph, [origin_pos], self.distance_map_radius, bomb_blockers)
 
         self._distance_map_origin = origin_pos
         self._distance_map_time = current_time
@@ -1174,12 +1156,16 @@ class PacmanAI:
         """Tra khoảng cách từ bản đồ đã cache khi có thể."""
         if start_pos != self._distance_map_origin:
             return None
-        if not self._distance_map:
+        if self._distance_map is None:
             return None
         # Loại nhanh nếu khoảng cách Manhattan quá xa
         if abs(start_pos[0] - end_pos[0]) + abs(start_pos[1] - end_pos[1]) > self.distance_map_radius:
             return None
-        return self._distance_map.get(end_pos)
+        row, col = end_pos
+        if not (0 <= row < self._distance_map.shape[0] and 0 <= col < self._distance_map.shape[1]):
+            return None
+        d = int(self._distance_map[row, col])
+        return d if d >= 0 else None
 
     def _count_escape_routes(self, row, col):
         """Đếm số lối thoát khả dụng từ vị trí hiện tại, bỏ qua ghost eyes"""
@@ -2034,6 +2020,15 @@ class PacmanAI:
                 
         return valid_directions >= 3
 
+    def _is_same_corridor(self, pos1, pos2):
+        """
+        Hai ô (row, col) có nằm trên cùng một hành lang không.
+        Dùng corridor id của JunctionGraph (O(1)); nếu tắt thì quay về so sánh cùng hàng/cột.
+        """
+        if getattr(config, 'USE_JUNCTION_GRAPH', True):
+            return self.game.maze_gen.get_junction_graph().same_corridor(pos1, pos2)
+        return pos1[0] == pos2[0] or pos1[1] == pos2[1]
+
     def _calculate_turn_safety_score(self, turn_row, turn_col):
         """Tính điểm an toàn của một ngã rẽ"""
         score = 10  # Điểm cơ bản
@@ -2141,6 +2136,25 @@ class PacmanAI:
         
         return is_behind
 
+    def _candidate_paths(self, pacman_pos, targets, **kwargs):
+        """
+        Đường từ pacman_pos tới từng target qua một lần shortest_paths_many.
+        Nếu batch lỗi thì tính lại từng target riêng, target lỗi nhận
+        (None, inf, {}) thay vì bỏ cả vòng.
+        """
+        dijkstra = self.game.dijkstra
+        try:
+            return dijkstra.shortest_paths_many([pacman_pos] * len(targets), targets, **kwargs)
+        except Exception:
+            pass
+        results = []
+        for target in targets:
+            try:
+                results.extend(dijkstra.shortest_paths_many([pacman_pos], [target], **kwargs))
+            except Exception:
+                results.append((None, float('inf'), {}))
+        return results
+
     def _is_dead_end(self, col, row):
         """Kiểm tra xem vị trí có phải là dead end không - cải thiện để tránh kẹt, bỏ qua ghost eyes"""
         if not self.game.is_valid_position_ignore_eyes(col, row):
@@ -2182,7 +2196,7 @@ class PacmanAI:
         """
         Tính khoảng cách đường đi THỰC TẾ bằng BFS (không phải Manhattan distance)
         Trả về None nếu không có đường đi hoặc quá xa
-        CACHED để tối ưu performance
+        Dùng distance oracle của level nếu có, nếu không thì BFS có CACHE
         """
         from collections import deque
 
@@ -2191,6 +2205,12 @@ class PacmanAI:
         if not hasattr(self, 'path_distance_cache_time'):
             self.path_distance_cache_time = {}
 
+        # Bảng khoảng cách all-pairs của level: tra O(1), không cần BFS
+        oracle = self.game.maze_gen.get_distance_oracle()
+        if oracle is not None:
+            dist = oracle.distance(start_pos, end_pos)
+            return dist if dist is not None and dist <= max_distance else None
+
         cache_key = (start_pos, end_pos, max_distance)
         cached = self._cache_get(self.path_distance_cache, self.path_distance_cache_time, cache_key, self.cache_ttl_ms)
         if cached is not None:
@@ -2203,14 +2223,26 @@ class PacmanAI:
             self._cache_set(self.path_distance_cache, self.path_distance_cache_time, cache_key, map_dist, self.cache_ttl_ms)
             return map_dist
         
-        queue = deque([(start_pos, 0)])
-        visited = {start_pos}
+        if start_pos == end_pos:
+            self._cache_set(self.path_distance_cache, self.path_distance_cache_time, cache_key, 0, self.cache_ttl_ms)
+            return 0
+
+        # BFS giới hạn trên đồ thị đã biên dịch (node id nguyên)
+        graph = self.game.maze_gen.get_graph()
+        source = graph.node_id(start_pos)
+        target = graph.node_id(end_pos)
+        if source < 0 or target < 0:
+            return None
+
+        adjacency = graph.adjacency
+        queue = deque([(source, 0)])
+        visited = {source}
         
         while queue:
-            (row, col), dist = queue.popleft()
+            node, dist = queue.popleft()
             
             # Tìm thấy đích - cache kết quả
-            if (row, col) == end_pos:
+            if node == target:
                 self._cache_set(self.path_distance_cache, self.path_distance_cache_time, cache_key, dist, self.cache_ttl_ms)
                 return dist
             
@@ -2218,15 +2250,11 @@ class PacmanAI:
             if dist >= max_distance:
                 continue
             
-            # Kiểm tra 4 hướng
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                new_col, new_row = col + dx, row + dy
-                new_pos = (new_row, new_col)
-                
-                if (new_pos not in visited and 
-                    self.game.is_valid_position(new_col, new_row)):
-                    visited.add(new_pos)
-                    queue.append((new_pos, dist + 1))
+            # Kiểm tra các ô kề
+            for nb in adjacency[node]:
+                if nb not in visited:
+                    visited.add(nb)
+                    queue.append((nb, dist + 1))
         
         # Không tìm thấy đường đi - cache kết quả
         return None
@@ -2443,9 +2471,9 @@ class PacmanAI:
         detection_methods['proximity'] = distance <= 2
         
         # Phương pháp 4: Cùng hành lang
-        same_row = ghost_row == pacman_row
-        same_col = ghost_col == pacman_col
-        detection_methods['corridor'] = same_row or same_col
+        detection_methods['corridor'] = self._is_same_corridor(
+            (pacman_row, pacman_col), (ghost_row, ghost_col)
+        )
         
         # Phương pháp 5: DỰ ĐOÁN - Va chạm trong tương lai
         detection_methods['predictive'] = self._predictive_collision_check(
@@ -2742,6 +2770,7 @@ class PacmanAI:
                 # Tìm tất cả các vị trí trong bán kính 15 ô
                 all_positions = []
                 for radius in range(8, 16):  # Bắt đầu từ 8 ô để đảm bảo an toàn
+                    candidates = []
                     for dr in range(-radius, radius + 1):
                         for dc in range(-radius, radius + 1):
                             if abs(dr) + abs(dc) == radius:  # Chỉ check vị trí ở exact radius
@@ -2762,19 +2791,19 @@ class PacmanAI:
                                         is_dead_end = self._is_dead_end(new_pos[1], new_pos[0])  # col, row for _is_dead_end
                                         
                                         if not is_dead_end:
-                                            # Thử tìm đường đi bằng ghost avoidance algorithm
-                                            try:
-                                                path, cost = self.game.dijkstra.shortest_path_with_ghost_avoidance(
-                                                    pacman_pos, new_pos, ghost_positions, avoidance_radius=4
-                                                )
-                                                
-                                                if path and len(path) > 1:
-                                                    # Tính final score: khoảng cách an toàn + khả năng di chuyển
-                                                    safety_score = min_ghost_dist + (10 / len(path))  # Ưu tiên đường ngắn
-                                                    all_positions.append((new_pos, safety_score, path, cost))
-                                            except Exception as e:
-                                                # Bỏ qua vị trí này nếu pathfinding lỗi
-                                                pass
+                                            candidates.append((new_pos, min_ghost_dist))
+                    
+                    # Tìm đường ghost avoidance cho cả vòng bán kính bằng một cây tìm kiếm chung
+                    if candidates:
+                        results = self._candidate_paths(
+                            pacman_pos, [pos for pos, _ in candidates],
+                            ghost_positions=ghost_positions, avoidance_radius=4
+                        )
+                        for (new_pos, min_ghost_dist), (path, cost, _) in zip(candidates, results):
+                            if path and len(path) > 1:
+                                # Tính final score: khoảng cách an toàn + khả năng di chuyển
+                                safety_score = min_ghost_dist + (10 / len(path))  # Ưu tiên đường ngắn
+                                all_positions.append((new_pos, safety_score, path, cost))
                     
                     # Nếu tìm được đủ vị trí an toàn, stop
                     if len(all_positions) >= 5:
@@ -2795,8 +2824,10 @@ class PacmanAI:
             search_radius = 12  # Tăng search radius
             
             # Find safe positions in expanding radius
+            bomb_grid = self.game.get_bomb_grid_positions() if hasattr(self.game, 'dijkstra') else set()
             for radius in range(6, search_radius + 1):  # Bắt đầu từ 6 ô
                 safe_positions = []
+                candidates = []
                 
                 for dr in range(-radius, radius + 1):
                     for dc in range(-radius, radius + 1):
@@ -2817,18 +2848,17 @@ class PacmanAI:
                             if min_ghost_dist >= 5:  # Tăng khoảng cách an toàn từ 3 lên 5
                                 # Kiểm tra không phải dead end
                                 if not self._is_dead_end(new_pos[1], new_pos[0]):
-                                    # Thử tìm đường đi bằng pathfinding với tránh bom
-                                    if hasattr(self.game, 'dijkstra'):
-                                        try:
-                                            # CRITICAL: Phải dùng shortest_path_with_bomb_avoidance để tránh bom!
-                                            bomb_grid = self.game.get_bomb_grid_positions()
-                                            path, distance = self.game.dijkstra.shortest_path_with_bomb_avoidance(
-                                                pacman_pos, new_pos, bomb_grid, enable_logging=False
-                                            )
-                                            if path and distance < float('inf'):
-                                                safe_positions.append((new_pos, min_ghost_dist, distance))
-                                        except Exception:
-                                            pass
+                                    candidates.append((new_pos, min_ghost_dist))
+                
+                # Thử tìm đường đi với tránh bom cho cả vòng (bom coi như tường)
+                if candidates and hasattr(self.game, 'dijkstra'):
+                    # CRITICAL: Phải tránh bom - bom là obstacles của mọi query
+                    results = self._candidate_paths(
+                        pacman_pos, [pos for pos, _ in candidates], obstacles=bomb_grid
+                    )
+                    for (new_pos, min_ghost_dist), (path, distance, _) in zip(candidates, results):
+                        if path and distance < float('inf'):
+                            safe_positions.append((new_pos, min_ghost_dist, distance))
                 
                 # Chọn vị trí an toàn nhất trong bán kính hiện tại
                 if safe_positions:
@@ -249,6 +249,10 @@ class PacmanGame:
         else:
             print("Cảnh báo: Không tạo được mê cung phù hợp cho Pacman")
 
+        # Dựng bảng khoảng cách all-pairs một lần cho level (None nếu mê cung quá lớn)
+        self.maze_gen.get_distance_oracle()
+        self.maze_gen.get_junction_graph()
+
     def validate_pacman_layout(self):
         """Đảm bảo mê cung phù hợp để chơi Pacman"""
         # Check if start position is valid
@@ -2543,6 +2547,17 @@ class PacmanGame:
             # METHOD 1: Try path avoiding BOTH bombs AND ghosts
             if ghost_positions:
                 avoidance_radius = getattr(config, 'GHOST_AVOIDANCE_RADIUS', 5)
+                if getattr(config, 'USE_SPACE_TIME_ASTAR', True):
+                    # Space-time A*: tránh vị trí ma DỰ ĐOÁN theo từng bước, không cần validate/replan
+                    path, distance = self.dijkstra.shortest_path_space_time(
+                        pacman_pos, self.auto_target, self.get_predicted_ghost_data(), bomb_grid,
+                        avoidance_radius, allow_wait=False
+                    )
+                    if path and distance < float('inf'):
+                        self.auto_path = path
+                        return
+
+                # Dự đoán không còn đường an toàn: penalty tĩnh quanh ma (D* Lite)
                 path, distance = self.dijkstra.shortest_path_with_ghost_and_bomb_avoidance(
                     pacman_pos, self.auto_target, ghost_positions, bomb_grid, avoidance_radius
                 )
@@ -2587,17 +2602,21 @@ class PacmanGame:
         # Lấy vị trí bom theo toạ độ lưới
         bomb_grid = self.get_bomb_grid_positions()
         
-        # Kiểm tra tình trạng bom chặn đường trước khi tính toán
-        if bomb_grid:
-            is_blocked, blockage_level, alternatives = self.dijkstra.check_bomb_blockage_status(
-                pacman_pos, self.current_goal, bomb_grid
-            )
-            
+        # Flow field tới goal: tính một lần cho mỗi bố cục bom, sau đó chỉ đi theo hướng
+        try:
+            field = self.dijkstra.get_flow_field(self.current_goal, bomb_grid)
+            path = field.path_from(pacman_pos)
+            if path and len(path) > 1:
+                self.shortest_path = path
+                return
             # Hiển thị cảnh báo đặc biệt cho complete blockage (rate limited)
-            if blockage_level == 'COMPLETE_BLOCKAGE':
+            if bomb_grid and self.dijkstra.get_flow_field(self.current_goal).path_from(pacman_pos) is None:
                 if not hasattr(self, '_last_blockage_warning') or pygame.time.get_ticks() - self._last_blockage_warning > 2000:
                     print("Pacman bị bom bao vây!")
                     self._last_blockage_warning = pygame.time.get_ticks()
+        except Exception:
+            # Nếu flow field gặp lỗi, fallback xuống A*
+            pass
         
         # Ưu tiên A* cho đường đến goal (nhanh hơn) với bom là obstacles
         try:
@@ -2639,18 +2658,15 @@ class PacmanGame:
         # Lấy vị trí bom theo toạ độ lưới
         bomb_grid = self.get_bomb_grid_positions()
         
-        # Kiểm tra bomb blockage cho đường đến exit gate
-        if bomb_grid:
-            is_blocked, blockage_level, alternatives = self.dijkstra.check_bomb_blockage_status(
-                pacman_pos, exit_goal, bomb_grid
-            )
+        try:
+            # Flow field từ exit (tính lại chỉ khi bom thay đổi): đi theo hướng, không cần search
+            path = self.dijkstra.get_flow_field(exit_goal, bomb_grid).path_from(pacman_pos)
             
-            if blockage_level == 'COMPLETE_BLOCKAGE':
+            # Kiểm tra bomb blockage cho đường đến exit gate
+            if path is None and bomb_grid and self.dijkstra.get_flow_field(exit_goal).path_from(pacman_pos) is None:
                 print("Lối thoát bị bom chặn!")
-        
-        try:
-            path, distance = self.dijkstra.shortest_path_with_bomb_avoidance(pacman_pos, exit_goal, bomb_grid)
-            if path and distance < float('inf'):
+            
+            if path and len(path) > 1:
                 self.shortest_path = path
             else:
                 self.shortest_path = []
@@ -3383,7 +3399,7 @@ class PacmanGame:
                                 break
 
     def find_alternative_path_to_goal(self):
-        """ENHANCED Tìm đường khác đến goal khi đường hiện tại không an toàn - multiple safety algorithms"""
+        """Tìm đường khác đến goal khi đường hiện tại không an toàn - một lần space-time A* tránh ma dự đoán"""
         if not self.current_goal:
             return False
             
@@ -3392,92 +3408,35 @@ class PacmanGame:
         
         print(f"Tìm đường khác từ {pacman_pos} → {goal_pos}")
         
-        # Lấy ghost positions và directions để predict movement
-        ghost_positions = []
-        ghost_data = []
-        for g in self.ghosts:
-            if not g.get('scared', False):
-                ghost_pos = (int(g['pos'][1]), int(g['pos'][0]))
-                ghost_positions.append(ghost_pos)
-                ghost_data.append({
-                    'pos': ghost_pos,
-                    'direction': g.get('direction', [0, 0]),
-                    'speed': 1  # Assume 1 block per step
-                })
-        
-        # Thử nhiều chiến lược tìm đường, ưu tiên độ an toàn
-        strategies = [
-            ("max_safety", 8),    # Maximum avoidance radius
-            ("moderate_safety", 6), # Moderate avoidance  
-            ("min_safety", 4),    # Minimum viable avoidance
-            ("emergency", 2)      # Emergency path
-        ]
-        
-        for strategy_name, avoidance_radius in strategies:
-            try:
-                print(f"Thử chiến lược '{strategy_name}' với radius {avoidance_radius}")
-                
-                # Use enhanced ghost avoidance pathfinding
-                path, distance = self.dijkstra.shortest_path_with_ghost_avoidance(
-                    pacman_pos, goal_pos, ghost_positions, 
-                    avoidance_radius=avoidance_radius
-                )
-                
-                if path and len(path) > 1:
-                    # KIỂM TRA AN TOÀN BỔ SUNG: Đảm bảo đường không đi qua vị trí ma được dự đoán
-                    if self._validate_path_against_predicted_ghosts(path, ghost_data):
-                        self.auto_path = path
-                        self.auto_target = goal_pos
-                        print(f"{strategy_name}: {len(path)} bước")
-                        return True
-                    else:
-                        print(f"{strategy_name} bị ma chặn")
-                        continue
-                        
-            except Exception as e:
-                print(f"Lỗi với chiến lược {strategy_name}: {e}")
-                continue
-        
+        # Ma được mô phỏng theo hướng đi + chính sách di chuyển ngay trong lúc tìm (ô, t):
+        # đường trả về đã tránh vị trí ma dự đoán, không cần thử nhiều bán kính rồi kiểm tra lại
+        try:
+            # Thêm penalty tĩnh quanh ma như calculate_auto_path: ngoài horizon dự đoán vẫn tránh xa ma
+            path, distance = self.dijkstra.shortest_path_space_time(
+                pacman_pos, goal_pos, self.get_predicted_ghost_data(),
+                self.get_bomb_grid_positions() if self.bombs_enabled else None,
+                getattr(config, 'GHOST_AVOIDANCE_RADIUS', 5), allow_wait=False
+            )
+        except Exception as e:
+            print(f"Lỗi tìm đường space-time: {e}")
+            return False
+
+        if path and len(path) > 1:
+            self.auto_path = path
+            self.auto_target = goal_pos
+            print(f"space-time: {len(path)} bước")
+            return True
+
         print("Không tìm được đường an toàn")
         return False
-    
-    def _validate_path_against_predicted_ghosts(self, path, ghost_data):
-        """Xác nhận đường đi không cắt qua vị trí ma dự đoán"""
-        if not path or len(path) <= 1:
-            return False
-            
-        # Dự đoán vị trí ma trong vài bước tới
-        max_prediction_steps = min(10, len(path))
-        
-        for step in range(max_prediction_steps):
-            if step >= len(path):
-                break
-                
-            path_pos = path[step]
-            
-            # So khớp với vị trí ma được dự đoán tại bước này
-            for ghost in ghost_data:
-                ghost_pos = ghost['pos']
-                ghost_dir = ghost['direction']
-                ghost_speed = ghost['speed']
-                
-                # Dự đoán vị trí ma ở bước này
-                predicted_ghost_row = ghost_pos[0] + (ghost_dir[1] * step * ghost_speed)
-                predicted_ghost_col = ghost_pos[1] + (ghost_dir[0] * step * ghost_speed)
-                predicted_ghost_pos = (predicted_ghost_row, predicted_ghost_col)
-                
-                # Kiểm tra xung đột giữa đường đi và vị trí ma dự đoán
-                if path_pos == predicted_ghost_pos:
-                    print(f"Path position {path_pos} conflicts with predicted ghost at step {step}")
-                    return False
-                
-                # Check if too close (adjacent)
-                distance = abs(path_pos[0] - predicted_ghost_pos[0]) + abs(path_pos[1] - predicted_ghost_pos[1])
-                if distance <= 1:
-                    print(f"Path too close to predicted ghost at step {step}: distance {distance}")
-                    return False
-        
-        return True
+
+    def get_predicted_ghost_data(self):
+        """Vị trí (row, col) + hướng [dx, dy] của các ma nguy hiểm, dùng để dự đoán đường đi của ma"""
+        return [
+            {'pos': (int(g['pos'][1]), int(g['pos'][0])), 'direction': g.get('direction', [0, 0])}
+            for g in self.ghosts
+            if not g.get('scared', False) and not g.get('eaten', False)
+        ]
 
     def find_goal_first(self):
         """GOAL-ONLY selection - Chỉ đi đến đích, không ăn dots/pellets"""
@@ -3693,6 +3652,15 @@ class PacmanGame:
                 if distance <= 5 and self._has_line_of_sight((start[1], start[0]), ghost_pos):  # start[1], start[0] vì start là (col, row)
                     dangerous_ghosts.append(ghost_pos)
         
+        # Không có ma nguy hiểm: bước tiếp theo đọc thẳng từ flow field của goal
+        if not dangerous_ghosts:
+            try:
+                step = self.dijkstra.get_flow_field((goal[1], goal[0])).next_step((start[1], start[0]))
+            except Exception:
+                step = None
+            if step is not None:
+                return [step[1], step[0]]  # (d_row, d_col) -> [dx, dy]
+        
         # BFS với ghost avoidance cho ma nguy hiểm
         queue = deque([(start, [])])
         visited = {start}
@@ -0,0 +1,105 @@
+"""
+Bounded LRU cache for unit-cost shortest paths.
+
+Entries are keyed on (maze version, start, goal, obstacle fingerprint).
+The maze version is bumped by MazeGenerator.generate_maze(), so a new level
+never sees paths from the previous one. A miss can still be answered from
+a cached path to the same goal under the same obstacles when it passes
+through the new start: any suffix of a shortest path is itself shortest.
+"""
+
+from collections import OrderedDict
+
+
+class PathCache:
+    """
+    LRU path cache with hit / miss statistics.
+
+    Values are tuples of (row, col) (or None for "unreachable"); lookups
+    return fresh lists so callers may consume them freely.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._entries = OrderedDict()  # key -> (path tuple or None, {cell: index})
+        self._by_goal = {}  # (goal, fingerprint) -> set of keys, for suffix reuse
+        self._version = None
+        self.hits = 0
+        self.suffix_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def fingerprint(obstacles):
+        """Order-independent, hashable fingerprint of an obstacle set."""
+        return frozenset(obstacles) if obstacles else frozenset()
+
+    def _check_version(self, version):
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def get(self, version, start, goal, fingerprint):
+        """
+        Look up a path.
+
+        Returns:
+            (hit, path) - path is a list of (row, col), or None when the goal
+            was cached as unreachable
+        """
+        self._check_version(version)
+        key = (start, goal, fingerprint)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, (list(entry[0]) if entry[0] is not None else None)
+
+        # Suffix reuse: a cached path to the same goal that runs through start
+        for other in self._by_goal.get((goal, fingerprint), ()):
+            path, index = self._entries[other]
+            i = index.get(start) if index else None
+            if i is not None:
+                self._entries.move_to_end(other)
+                self.suffix_hits += 1
+                return True, list(path[i:])
+
+        self.misses += 1
+        return False, None
+
+    def put(self, version, start, goal, fingerprint, path):
+        """Store a path (or None for unreachable) and evict the least recently used entry if full."""
+        self._check_version(version)
+        key = (start, goal, fingerprint)
+        if path is None:
+            self._entries[key] = (None, None)
+        else:
+            path = tuple(path)
+            self._entries[key] = (path, {cell: i for i, cell in enumerate(path)})
+            self._by_goal.setdefault((goal, fingerprint), set()).add(key)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.capacity:
+            old_key, _ = self._entries.popitem(last=False)
+            keys = self._by_goal.get(old_key[1:])
+            if keys is not None:
+                keys.discard(old_key)
+                if not keys:
+                    del self._by_goal[old_key[1:]]
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_goal.clear()
+
+    def stats(self):
+        lookups = self.hits + self.suffix_hits + self.misses
+        return {
+            'hits': self.hits,
+            'suffix_hits': self.suffix_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'capacity': self.capacity,
+            'hit_rate': (self.hits + self.suffix_hits) / lookups if lookups else 0.0,
+        }
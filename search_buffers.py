@@ -0,0 +1,60 @@
+"""
+Preallocated per-maze search arrays with generation stamping.
+
+The grid kernels used to allocate fresh dist / prev dicts and a visited set
+on every query; in auto mode hundreds of small searches per second turned
+that into steady allocation and GC work. SearchBuffers holds one slot per
+node id for the whole maze and is reused by every query:
+
+- begin() bumps a generation counter instead of clearing anything;
+- seen[n] == generation means dist[n] / prev[n] were written by the
+  current query (otherwise they are leftovers and read as "unreached");
+- closed[n] == generation means n has been expanded in the current query.
+
+The arrays are plain lists: CPython reads a list slot without boxing, which
+makes them faster per access than array.array or NumPy scalars.
+"""
+
+
+class SearchBuffers:
+    """
+    Reusable dist / prev / seen / closed slots for one GridGraph.
+
+    Attributes:
+        graph: GridGraph the buffers are sized for
+        generation: id of the query in progress (stamps written by it)
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        n = graph.num_nodes
+        self.dist = [0] * n
+        self.prev = [-1] * n
+        self.seen = [0] * n
+        self.closed = [0] * n
+        self.generation = 0
+
+    def begin(self, source):
+        """Start a query from source: O(1) reset. Returns the new generation."""
+        self.generation += 1
+        self.dist[source] = 0
+        self.prev[source] = -1
+        self.seen[source] = self.generation
+        return self.generation
+
+    def trace(self, node):
+        """Walk prev back from node and return start->node ids."""
+        prev = self.prev
+        path = []
+        while node != -1:
+            path.append(node)
+            node = prev[node]
+        path.reverse()
+        return path
+
+    @staticmethod
+    def for_graph(buffers, graph):
+        """buffers if they belong to graph, else new buffers sized for it."""
+        if buffers is None or buffers.graph is not graph:
+            buffers = SearchBuffers(graph)
+        return buffers
@@ -0,0 +1,145 @@
+"""
+Bounded search log.
+
+Successful searches used to append a full record (the whole path plus an
+MD5 of the entire maze) to an unbounded list on every call. A SearchLog
+keeps compact records in a fixed-capacity ring buffer instead:
+
+- the maze hash is computed once per maze by the caller and passed in;
+- only every `sample_every`-th successful search is recorded (errors are
+  always recorded);
+- paths are dropped unless `keep_paths` is set or the record type is in
+  `path_kinds` (the plain SUCCESSFUL_PATH records read by
+  get_training_data keep theirs by default);
+- timestamps are raw time.time() floats, formatted only when written.
+
+flush() hands the records added since the previous flush to a background
+writer thread that appends them to a JSONL file, so serialization and disk
+I/O never run inside a game frame.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class SearchLog:
+    """
+    Ring buffer of compact search records.
+
+    Attributes:
+        records: deque (maxlen=capacity) of record dicts, oldest first
+        seen: successful searches offered to record()
+        dropped: records overwritten before they were flushed
+    """
+
+    def __init__(self, capacity=2048, sample_every=1, keep_paths=False, path_kinds=()):
+        self.capacity = capacity
+        self.sample_every = max(1, int(sample_every))
+        self.keep_paths = keep_paths
+        self.path_kinds = frozenset(path_kinds)  # Record types that keep their path regardless of keep_paths
+        self.records = deque(maxlen=capacity)
+        self.seen = 0
+        self.dropped = 0
+        self._seq = 0  # Sequence number of the last record
+        self._flushed_seq = 0  # Last sequence number handed to the writer
+        self._lock = threading.Lock()  # Records may also arrive from the optimality verifier thread
+        self._writes = None  # queue.Queue of (filepath, records) for the writer thread
+        self._writer = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _append(self, record):
+        record['time'] = time.time()
+        with self._lock:
+            if len(self.records) == self.capacity and self.records[0]['seq'] > self._flushed_seq:
+                self.dropped += 1
+            self._seq += 1
+            record['seq'] = self._seq
+            self.records.append(record)
+
+    def record(self, kind, start, goal, path, distance, nodes_explored, computation_time_ms, maze_hash, **extra):
+        """Record a successful search (subject to sampling). Returns True if it was kept."""
+        self.seen += 1
+        if self.seen % self.sample_every:
+            return False
+        record = {
+            'type': kind,
+            'maze_hash': maze_hash,
+            'start': start,
+            'goal': goal,
+            'distance': distance,
+            'path_length': len(path),
+            'nodes_explored': nodes_explored,
+            'computation_time_ms': computation_time_ms,
+        }
+        if self.keeps_path(kind):
+            record['path'] = path
+        record.update(extra)
+        self._append(record)
+        return True
+
+    def keeps_path(self, kind):
+        """True if records of this type store their full path."""
+        return self.keep_paths or kind in self.path_kinds
+
+    def record_error(self, error_type, error_data):
+        """Record an error (never sampled out)."""
+        self._append({'type': 'ERROR', 'error_type': error_type, 'error_data': error_data})
+
+    def entries(self, kind=None):
+        """Records currently in the buffer (optionally of one type), oldest first."""
+        with self._lock:
+            if kind is None:
+                return list(self.records)
+            return [r for r in self.records if r['type'] == kind]
+
+    def flush(self, filepath, session_id=None, wait=False):
+        """
+        Append the records added since the last flush to a JSONL file on the
+        writer thread. Returns the number of records queued.
+        """
+        with self._lock:
+            batch = [r for r in self.records if r['seq'] > self._flushed_seq]
+            if batch:
+                self._flushed_seq = batch[-1]['seq']
+        if batch:
+            if self._writer is None or not self._writer.is_alive():
+                self._writes = queue.Queue()
+                self._writer = threading.Thread(target=self._write_loop, args=(self._writes,), daemon=True)
+                self._writer.start()
+            self._writes.put((filepath, session_id, batch))
+        if wait:
+            self.wait()
+        return len(batch)
+
+    def wait(self):
+        """Block until every queued flush has been written."""
+        if self._writes is not None:
+            self._writes.join()
+
+    @staticmethod
+    def _write_loop(writes):
+        while True:
+            filepath, session_id, batch = writes.get()
+            try:
+                directory = os.path.dirname(filepath)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(filepath, 'a') as f:
+                    for record in batch:
+                        line = dict(record)
+                        line['timestamp'] = datetime.fromtimestamp(line.pop('time')).isoformat()
+                        if session_id is not None:
+                            line['session_id'] = session_id
+                        f.write(json.dumps(line, default=str))
+                        f.write('\n')
+            except OSError as e:
+                print(f"SearchLog flush error: {e}")
+            finally:
+                writes.task_done()
@@ -0,0 +1,178 @@
+"""
+Space-time A* against predicted ghost trajectories.
+
+Ghost avoidance used to search on a static penalty blob around each ghost
+and then check the finished path against the predicted ghost positions,
+replanning with another radius whenever the check failed. Here the
+prediction goes into the search itself:
+
+- ReservationTable rolls every ghost forward with the same policy as
+  PacmanGame.get_smart_direction (keep going straight whenever possible,
+  otherwise any non-reversing turn, reverse only in a dead end) and
+  records, for each Pacman step t up to a horizon, the cells a ghost may
+  occupy (plus a safety margin).
+- space_time_astar() searches states (cell, t). A move into a reserved
+  cell at tick t, or through a ghost coming the other way, is not allowed.
+  Past the horizon the prediction is meaningless, so t is capped there and
+  the search continues as plain A* on cells.
+
+A path returned this way is collision-free against the prediction by
+construction; no validate/replan loop is needed.
+"""
+
+import heapq
+
+
+class ReservationTable:
+    """
+    Cells predicted to be occupied by ghosts, per Pacman step.
+
+    Attributes:
+        horizon: number of Pacman steps covered (ticks 0 .. horizon - 1)
+        cells: list per tick of node-id sets Pacman must not be in (margin included)
+        core: list per tick of node-id sets a ghost may actually be on
+    """
+
+    def __init__(self, horizon, cells, core):
+        self.horizon = horizon
+        self.cells = cells
+        self.core = core
+
+    @classmethod
+    def from_ghosts(cls, graph, ghosts, horizon=12, margin=1, speed_ratio=0.75):
+        """
+        Args:
+            ghosts: iterable of dicts with 'pos' (row, col) and 'direction'
+                [dx, dy] (game convention: dx is the column step); an optional
+                'speed' gives ghost cells per Pacman step
+            speed_ratio: default ghost cells per Pacman step
+                (config.GHOST_SPEED / config.PACMAN_SPEED)
+        """
+        adjacency = graph.adjacency
+        core = [set() for _ in range(horizon)]
+        for ghost in ghosts:
+            source = graph.node_id(ghost['pos'])
+            if source < 0:
+                continue
+            dx, dy = ghost.get('direction') or (0, 0)
+            ratio = ghost.get('speed', speed_ratio)
+            ghost_steps = int(horizon * ratio) + 2
+            reach = _roll_forward(graph, source, (int(dy), int(dx)), ghost_steps)
+            for t in range(horizon):
+                # A ghost between two cells at tick t may be on either of them
+                low = int(t * ratio)
+                for k in range(low, min(low + 2, len(reach))):
+                    core[t] |= reach[k]
+
+        cells = core
+        if margin > 0:
+            cells = []
+            for nodes in core:
+                ring = set(nodes)
+                frontier = nodes
+                for _ in range(margin):
+                    frontier = {nb for n in frontier for nb in adjacency[n]} - ring
+                    ring |= frontier
+                cells.append(ring)
+        return cls(horizon, cells, core)
+
+
+def _roll_forward(graph, source, direction, steps):
+    """Sets of node ids a ghost may occupy after 0..steps-1 of its own moves."""
+    rows, cols = graph.rows, graph.cols
+    node_id = graph.node_id
+    states = {(source, direction)}
+    reach = [{source}]
+    for _ in range(steps - 1):
+        next_states = set()
+        for node, (dr, dc) in states:
+            row, col = rows[node], cols[node]
+            straight = node_id((row + dr, col + dc)) if (dr or dc) else -1
+            if straight >= 0:
+                next_states.add((straight, (dr, dc)))  # Momentum bonus outweighs every other score
+                continue
+            options = [(nb, (rows[nb] - row, cols[nb] - col)) for nb in graph.adjacency[node]]
+            turns = [(nb, d) for nb, d in options if d != (-dr, -dc)]
+            next_states.update(turns or options)  # Reverse only in a dead end
+        states = next_states
+        reach.append({node for node, _ in states})
+    return reach
+
+
+def space_time_astar(graph, source, target, table, bounds, blocked=None, node_penalty=None,
+                     allow_wait=True, max_nodes=None):
+    """
+    A* over (node, t) states against a ReservationTable.
+
+    Every move (or wait, when allow_wait) costs 1 plus node_penalty of the
+    cell entered. bounds is a consistent lower bound per node id. Without
+    allow_wait the path is also kept simple: a state never re-enters a cell
+    already on its own prefix, so no cell repeats (dodging back and forth
+    would break followers that locate Pacman with list.index()).
+
+    Returns:
+        (nodes, cost, explored) - nodes is the list of node ids per Pacman
+        step (a repeated node is a wait), or None when no collision-free
+        path exists (or max_nodes ran out)
+    """
+    if source < 0 or target < 0:
+        return None, float('inf'), 0
+    adjacency = graph.adjacency
+    horizon = table.horizon
+    cells, core = table.cells, table.core
+    blocked = blocked or ()
+
+    start = (source, 0)
+    g_values = {start: 0}
+    prev = {start: None}
+    # Cells on the path to each state (allow_wait=False only). Past the
+    # horizon states are (node, horizon) and cannot repeat along one chain,
+    # so the set stops growing there and is shared with the parent.
+    on_path = None if allow_wait else {start: frozenset((source,))}
+    closed = set()
+    pq = [(bounds[source], 0, 0, source)]
+    explored = 0
+
+    while pq:
+        f, g, t, node = heapq.heappop(pq)
+        state = (node, t)
+        if state in closed:
+            continue
+        closed.add(state)
+        explored += 1
+
+        if node == target:
+            nodes = []
+            while state is not None:
+                nodes.append(state[0])
+                state = prev[state]
+            nodes.reverse()
+            return nodes, g, explored
+
+        if max_nodes is not None and explored >= max_nodes:
+            break
+
+        nt = t + 1 if t < horizon else horizon
+        ban = cells[nt] if nt < horizon else None
+        moves = adjacency[node] + (node,) if allow_wait else adjacency[node]
+        visited = on_path[state] if on_path is not None else ()
+        for nb in moves:
+            if nb in blocked or nb in visited:
+                continue
+            if ban is not None:
+                if nb in ban:
+                    continue
+                if nb in core[t] and node in core[nt]:
+                    continue  # Head-on swap with a ghost
+            next_state = (nb, nt)
+            if next_state in closed:
+                continue
+            ng = g + 1 + (node_penalty[nb] if node_penalty is not None else 0)
+            if ng < g_values.get(next_state, float('inf')):
+                g_values[next_state] = ng
+                prev[next_state] = state
+                if on_path is not None:
+                    on_path[next_state] = visited if t == horizon else visited | {nb}
+                heapq.heappush(pq, (ng + bounds[nb], ng, nt, nb))
+
+    return None, float('inf'), explored
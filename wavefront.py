@@ -0,0 +1,157 @@
+"""
+Whole-maze BFS distance fields as int16 arrays.
+
+Two engines fill the same (height, width) array (UNREACHED for walls and
+cells not reached within the radius):
+
+- 'wavefront': the frontier is a boolean mask; each BFS layer is four array
+  shifts OR-ed together and masked against walls / obstacles / visited
+  cells. One layer costs a handful of NumPy ops whatever its size, which
+  pays off on open grids with wide frontiers.
+- 'graph': level-synchronous BFS over GridGraph node ids, with only the
+  reached cells scattered into the array at the end. Generated mazes are 1-wide
+  corridors, so a layer is usually 1-2 cells and the number of layers is
+  close to the number of cells; this engine is the faster one there.
+
+config.DISTANCE_FIELD_ENGINE picks the engine for distance_field().
+"""
+
+import numpy as np
+
+import config
+
+
+UNREACHED = -1
+
+
+def field_dtype(graph):
+    """int16 while every distance fits, int32 for huge mazes."""
+    return np.int16 if graph.num_nodes <= np.iinfo(np.int16).max else np.int32
+
+
+def distance_field(graph, sources, max_radius=None, obstacles=None, engine=None):
+    """
+    Multi-source BFS distance field for a compiled maze.
+
+    Args:
+        graph: GridGraph of the maze
+        sources: iterable of (row, col); each starts at distance 0
+        max_radius: stop expanding after this many layers (None = whole maze)
+        obstacles: iterable of (row, col) treated as walls (bombs)
+        engine: 'graph' or 'wavefront' (defaults to config.DISTANCE_FIELD_ENGINE)
+
+    Returns:
+        (height, width) int array of distances, UNREACHED where not reached
+    """
+    if engine is None:
+        engine = getattr(config, 'DISTANCE_FIELD_ENGINE', 'graph')
+    if engine == 'wavefront':
+        mask = None
+        if obstacles:
+            mask = np.zeros((graph.height, graph.width), dtype=bool)
+            for row, col in obstacles:
+                if 0 <= row < graph.height and 0 <= col < graph.width:
+                    mask[row, col] = True
+        return wavefront_distances(graph.cell_ids >= 0, sources, max_radius, mask, field_dtype(graph))
+
+    dist = _graph_bfs(graph, sources, max_radius, obstacles)
+
+    # Scatter only the reached nodes into the grid
+    field = np.full((graph.height, graph.width), UNREACHED, dtype=field_dtype(graph))
+    if dist:
+        nodes = np.fromiter(dist.keys(), dtype=np.int64, count=len(dist))
+        field.flat[graph.flat_index[nodes]] = np.fromiter(dist.values(), dtype=np.int64, count=len(dist))
+    return field
+
+
+def distance_dict(graph, sources, max_radius=None, obstacles=None, engine=None):
+    """
+    Same distances as distance_field() as {(row, col): distance}.
+    The graph engine builds the dict straight from the BFS, so small-radius
+    fills never touch the whole grid.
+    """
+    if engine is None:
+        engine = getattr(config, 'DISTANCE_FIELD_ENGINE', 'graph')
+    if engine == 'wavefront':
+        return field_to_dict(distance_field(graph, sources, max_radius, obstacles, engine))
+    rows, cols = graph.rows, graph.cols
+    return {(rows[node], cols[node]): d
+            for node, d in _graph_bfs(graph, sources, max_radius, obstacles).items()}
+
+
+def _graph_bfs(graph, sources, max_radius, obstacles):
+    """Level-synchronous BFS over node ids -> {node id: distance}."""
+    blocked = graph.ids_for(obstacles)
+    adjacency = graph.adjacency
+    dist = {}
+    frontier = []
+    for pos in sources:
+        node = graph.node_id(pos)
+        if node >= 0 and node not in dist:
+            dist[node] = 0
+            frontier.append(node)
+
+    depth = 0
+    while frontier:
+        if max_radius is not None and depth >= max_radius:
+            break
+        depth += 1
+        next_frontier = []
+        for node in frontier:
+            for nb in adjacency[node]:
+                if nb not in dist and nb not in blocked:
+                    dist[nb] = depth
+                    next_frontier.append(nb)
+        frontier = next_frontier
+    return dist
+
+
+def field_to_dict(field):
+    """{(row, col): distance} for every reached cell of a distance field."""
+    rows, cols = np.nonzero(field >= 0)
+    return dict(zip(zip(rows.tolist(), cols.tolist()), field[rows, cols].tolist()))
+
+
+def wavefront_distances(walkable, sources, max_radius=None, obstacles=None, dtype=np.int16):
+    """
+    Multi-source BFS distance field, vectorized over the whole grid.
+
+    Args:
+        walkable: bool array (height, width), True for open cells
+        sources: iterable of (row, col); each starts at distance 0
+        max_radius: stop expanding after this many layers (None = whole maze)
+        obstacles: optional bool array of extra blocked cells (bombs); a
+            source standing on an obstacle still expands
+        dtype: integer dtype of the result
+
+    Returns:
+        int16 array (height, width) of distances, UNREACHED where not reached
+    """
+    walkable = np.asarray(walkable, dtype=bool)
+    height, width = walkable.shape
+    free = walkable if obstacles is None else walkable & ~np.asarray(obstacles, dtype=bool)
+
+    dist = np.full((height, width), UNREACHED, dtype=dtype)
+    frontier = np.zeros((height, width), dtype=bool)
+    for row, col in sources:
+        if 0 <= row < height and 0 <= col < width and walkable[row, col]:
+            frontier[row, col] = True
+    dist[frontier] = 0
+    unvisited = free & ~frontier
+
+    layer = np.empty_like(frontier)
+    depth = 0
+    while frontier.any():
+        if max_radius is not None and depth >= max_radius:
+            break
+        depth += 1
+        layer.fill(False)
+        layer[1:, :] |= frontier[:-1, :]
+        layer[:-1, :] |= frontier[1:, :]
+        layer[:, 1:] |= frontier[:, :-1]
+        layer[:, :-1] |= frontier[:, 1:]
+        layer &= unvisited
+        dist[layer] = depth
+        unvisited &= ~layer
+        frontier, layer = layer, frontier
+    return dist